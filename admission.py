@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Load-Based Admission Control
+Turns transcriptions away with 429 before the server saturates, rather than letting latency run away
+Watches audio seconds in flight, the decode queue and recognizer concurrency; Retry-After follows the recent drain rate
+"""
+
+import os
+import math
+import time
+import threading
+from collections import deque
+
+DEFAULT_MAX_AUDIO_SECONDS = 7200.0
+DEFAULT_MAX_DECODE_QUEUE = 32
+DEFAULT_MAX_RECOGNIZER_CALLS = 64
+DEFAULT_MAX_RETRY_AFTER = 120
+FALLBACK_RETRY_AFTER = 5      # before any transcription has finished to measure the drain rate
+DRAIN_WINDOW_SECONDS = 60.0
+
+class Overloaded(Exception):
+    """Raised when admitting a transcription would push a load signal over its limit"""
+
+    def __init__(self, message, reason, retry_after):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class Ticket:
+    """Audio seconds held in an AdmissionController until release()"""
+
+    def __init__(self, controller, cost):
+        self.controller = controller
+        self.cost = cost
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller._release(self.cost)
+
+class AdmissionController:
+    """Admits transcriptions while every load signal is under its limit
+
+    Audio seconds in flight are counted here, from admit() to release();
+    the decode queue depth and recognizer calls in flight are read through
+    the probes given, so each server can point them at its own queues. A
+    limit of 0 turns that signal off. A transcription longer than the whole
+    audio limit is still admitted onto an otherwise idle server.
+
+    Retry-After is how long the excess should take to drain at the rate
+    transcriptions finished over the last minute: excess audio seconds
+    over audio seconds finished per second, or excess queued jobs and
+    recognizer calls over jobs finished per second.
+    """
+
+    def __init__(self, max_audio_seconds=DEFAULT_MAX_AUDIO_SECONDS, max_decode_queue=DEFAULT_MAX_DECODE_QUEUE,
+                 max_recognizer_calls=DEFAULT_MAX_RECOGNIZER_CALLS, decode_queue_depth=None, recognizer_calls=None,
+                 max_retry_after=DEFAULT_MAX_RETRY_AFTER):
+        self.max_audio_seconds = max_audio_seconds
+        self.max_decode_queue = max_decode_queue
+        self.max_recognizer_calls = max_recognizer_calls
+        self.decode_queue_depth = decode_queue_depth or (lambda: 0)
+        self.recognizer_calls = recognizer_calls or (lambda: 0)
+        self.max_retry_after = max_retry_after
+        self._lock = threading.Lock()
+        self._finished = deque()  # (monotonic time, audio seconds) of recent releases
+        self._started = time.monotonic()
+        self.audio_seconds = 0.0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = {"audio_seconds": 0, "decode_queue": 0, "recognizer_calls": 0}
+
+    def check(self):
+        """Fail fast, before an upload is read, if the server is already at a limit; raises Overloaded"""
+        with self._lock:
+            self._refuse(self._overload(0.0))
+
+    def admit(self, cost):
+        """Hold cost audio seconds if the load allows; returns a Ticket, raises Overloaded"""
+        with self._lock:
+            self._refuse(self._overload(cost))
+            self.audio_seconds += cost
+            self.in_flight += 1
+            self.admitted += 1
+        return Ticket(self, cost)
+
+    def _overload(self, cost):
+        """(reason, excess) for the first signal over its limit with cost added, else None (lock held)
+
+        cost 0 asks whether the server is at a limit already.
+        """
+        depth = self.decode_queue_depth()
+        if self.max_decode_queue and depth >= self.max_decode_queue:
+            return "decode_queue", depth - self.max_decode_queue + 1
+        calls = self.recognizer_calls()
+        if self.max_recognizer_calls and calls >= self.max_recognizer_calls:
+            return "recognizer_calls", calls - self.max_recognizer_calls + 1
+        if self.max_audio_seconds and self.in_flight:
+            excess = self.audio_seconds + cost - self.max_audio_seconds
+            if excess > 0 or (not cost and excess >= 0):
+                return "audio_seconds", max(excess, 1.0)
+        return None
+
+    def _refuse(self, overload):
+        """Raise Overloaded for an (reason, excess) from _overload, counting it (lock held)"""
+        if overload is None:
+            return
+        reason, excess = overload
+        self.rejected[reason] += 1
+        retry_after = self._retry_after(reason, excess)
+        raise Overloaded(f"Server overloaded ({reason.replace('_', ' ')} at limit); retry in {retry_after}s",
+                         reason, retry_after)
+
+    def _retry_after(self, reason, excess):
+        """Whole seconds for `excess` to drain at the recent rate, within 1..max_retry_after (lock held)"""
+        audio_rate, job_rate = self._drain_rates()
+        rate = audio_rate if reason == "audio_seconds" else job_rate
+        seconds = excess / rate if rate else FALLBACK_RETRY_AFTER
+        return int(min(max(math.ceil(seconds), 1), self.max_retry_after))
+
+    def _drain_rates(self):
+        """(audio seconds, transcriptions) finished per second over the drain window (lock held)"""
+        now = time.monotonic()
+        while self._finished and self._finished[0][0] < now - DRAIN_WINDOW_SECONDS:
+            self._finished.popleft()
+        span = max(min(DRAIN_WINDOW_SECONDS, now - self._started), 1.0)
+        return sum(cost for _, cost in self._finished) / span, len(self._finished) / span
+
+    def _release(self, cost):
+        with self._lock:
+            self.audio_seconds = max(self.audio_seconds - cost, 0.0)
+            self.in_flight -= 1
+            self._finished.append((time.monotonic(), cost))
+
+    def stats(self):
+        """Limits, current load, drain rates and counters, for load balancers polling /health"""
+        with self._lock:
+            overload = self._overload(0.0)
+            audio_rate, job_rate = self._drain_rates()
+            return {
+                "accepting": overload is None,
+                "limiting": overload[0] if overload else None,
+                "retry_after": self._retry_after(*overload) if overload else None,
+                "limits": {
+                    "audio_seconds": self.max_audio_seconds,
+                    "decode_queue": self.max_decode_queue,
+                    "recognizer_calls": self.max_recognizer_calls,
+                },
+                "current": {
+                    "audio_seconds": round(self.audio_seconds, 1),
+                    "decode_queue": self.decode_queue_depth(),
+                    "recognizer_calls": self.recognizer_calls(),
+                },
+                "drain": {
+                    "audio_seconds_per_second": round(audio_rate, 3),
+                    "transcriptions_per_second": round(job_rate, 3),
+                },
+                "in_flight": self.in_flight,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+            }
+
+def create_admission_controller(decode_queue_depth=None, recognizer_calls=None):
+    """Build an admission controller from environment configuration
+
+    decode_queue_depth() and recognizer_calls() report the server's own
+    queue of transcriptions waiting to decode and its recognizer calls in flight.
+
+    ADMISSION_MAX_AUDIO_SECONDS     audio seconds admitted and not yet finished (default 7200, 0 off)
+    ADMISSION_MAX_DECODE_QUEUE      transcriptions waiting to start decoding (default 32, 0 off)
+    ADMISSION_MAX_RECOGNIZER_CALLS  recognizer requests in flight, retries included (default 64, 0 off)
+    ADMISSION_MAX_RETRY_AFTER       largest Retry-After sent, in seconds (default 120)
+    """
+    return AdmissionController(
+        max_audio_seconds=float(os.environ.get("ADMISSION_MAX_AUDIO_SECONDS", DEFAULT_MAX_AUDIO_SECONDS)),
+        max_decode_queue=int(os.environ.get("ADMISSION_MAX_DECODE_QUEUE", DEFAULT_MAX_DECODE_QUEUE)),
+        max_recognizer_calls=int(os.environ.get("ADMISSION_MAX_RECOGNIZER_CALLS", DEFAULT_MAX_RECOGNIZER_CALLS)),
+        decode_queue_depth=decode_queue_depth,
+        recognizer_calls=recognizer_calls,
+        max_retry_after=int(os.environ.get("ADMISSION_MAX_RETRY_AFTER", DEFAULT_MAX_RETRY_AFTER)),
+    )
@@ -43,6 +43,77 @@ class AudioAPIClient:
         except Exception as e:
             return {"error": f"Unexpected error: {str(e)}"}
 
+    def transcribe_files(self, file_paths, language="auto", parallelism=None):
+        """Transcribe several audio files in one /transcribe/batch request"""
+        missing = [path for path in file_paths if not os.path.exists(path)]
+        if missing:
+            return {"error": f"File not found: {', '.join(missing)}"}
+
+        handles = []
+        try:
+            for path in file_paths:
+                handles.append(open(path, 'rb'))
+            files = [("files", (os.path.basename(path), handle)) for path, handle in zip(file_paths, handles)]
+            data = {"language": language}
+            if parallelism:
+                data["parallelism"] = parallelism
+
+            response = requests.post(
+                f"{self.base_url}/transcribe/batch",
+                files=files,
+                data=data
+            )
+
+            return response.json()
+
+        except requests.exceptions.RequestException as e:
+            return {"error": f"API request failed: {str(e)}"}
+        except Exception as e:
+            return {"error": f"Unexpected error: {str(e)}"}
+        finally:
+            for handle in handles:
+                handle.close()
+
+    def transcribe_resumable(self, file_path, language="auto", chunk_bytes=8 * 1024 * 1024, retries=5):
+        """Transcribe a large file through a resumable upload session, resuming after dropped chunks"""
+        if not os.path.exists(file_path):
+            return {"error": f"File not found: {file_path}"}
+
+        try:
+            size = os.path.getsize(file_path)
+            session = requests.post(
+                f"{self.base_url}/uploads",
+                json={"filename": os.path.basename(file_path), "language": language,
+                      "size": size, "early_decode": True}
+            ).json()
+            if not session.get("success"):
+                return session
+            upload_url = f"{self.base_url}{session['upload_url']}"
+
+            offset = 0
+            failures = 0
+            with open(file_path, 'rb') as audio_file:
+                while offset < size:
+                    audio_file.seek(offset)
+                    try:
+                        response = requests.patch(upload_url, data=audio_file.read(chunk_bytes),
+                                                  headers={"Upload-Offset": str(offset)})
+                        offset = int(response.headers["Upload-Offset"])
+                    except (requests.exceptions.RequestException, KeyError):
+                        failures += 1
+                        if failures > retries:
+                            raise
+                        # Ask the server how much arrived and continue from there
+                        offset = int(requests.head(upload_url).headers["Upload-Offset"])
+
+            response = requests.post(f"{upload_url}/finalize", params={"wait": 1})
+            return response.json()
+
+        except requests.exceptions.RequestException as e:
+            return {"error": f"API request failed: {str(e)}"}
+        except Exception as e:
+            return {"error": f"Unexpected error: {str(e)}"}
+
 def demo_api_usage():
     """Demonstrate API usage"""
     print("🎤 Audio-to-Text API Client Demo")
@@ -76,19 +147,32 @@ def demo_api_usage():
     ]
     
     for file_path in example_files:
-        if os.path.exists(file_path):
-            print(f"\n📁 Processing: {file_path}")
-            result = client.transcribe_file(file_path, "auto")
-            
-            if result.get("success"):
-                print(f"✅ Success!")
-                print(f"   Text: {result['text']}")
-                print(f"   Language: {result['language']}")
-                print(f"   Confidence: {result['confidence']}")
-            else:
-                print(f"❌ Failed: {result.get('error', 'Unknown error')}")
-        else:
+        if not os.path.exists(file_path):
             print(f"⏭️  Skipping {file_path} (file not found)")
+    available_files = [file_path for file_path in example_files if os.path.exists(file_path)]
+    if not available_files:
+        return
+
+    # One batch request instead of a request per file
+    print(f"\n📁 Processing {len(available_files)} files in one batch request...")
+    batch = client.transcribe_files(available_files, "auto")
+    if not batch.get("success"):
+        print(f"❌ Failed: {batch.get('error', 'Unknown error')}")
+        return
+
+    for result in batch["results"]:
+        print(f"\n📁 {result['filename']}")
+        if result["success"]:
+            print(f"✅ Success!")
+            print(f"   Text: {result['text']}")
+            print(f"   Language: {result['language']}")
+            print(f"   Confidence: {result['confidence']}")
+        else:
+            print(f"❌ Failed: {result.get('error', 'Unknown error')}")
+
+    summary = batch["summary"]
+    print(f"\n📊 Summary: {summary['successful']}/{summary['total']} files successfully transcribed "
+          f"in {summary['processing_time']}s")
 
 def show_integration_examples():
     """Show integration examples for different languages"""
@@ -6,29 +6,99 @@ Upload audio files and get text transcriptions via HTTP API
 """
 
 import os
-import tempfile
-import uuid
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, g, request, jsonify, render_template_string, url_for
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import speech_recognition as sr
-from pydub import AudioSegment
-import io
+from recognizer_backend import create_backend
+from language_probe import probe_languages, AUTO_LANGUAGES
+from language_priors import create_language_priors
+from transcript_cache import create_cache
+from audio_io import decode_audio_with_stats, file_extension, normalization_target
+from audio_format import probe_audio
+from audio_chunking import audio_duration, transcribe_in_chunks, DEFAULT_CHUNK_SECONDS, DEFAULT_CHUNK_WORKERS
+from transcription_jobs import create_job_manager, execute_job, Job, TranscriptionError, JobQueueFull, COMPLETED
+from metrics import MetricsRegistry
+from voice_activity import prefilter
+from upload_sessions import create_upload_store
+from decoder_pool import create_decoder_pool
+from memory_budget import create_memory_budget, audio_footprint, BudgetTimeout
+from job_scheduler import job_cost, priority_class
+from admission import create_admission_controller, Overloaded
+from concurrent.futures import ThreadPoolExecutor
+import json
+import shutil
+import hashlib
+import tempfile
+import time
+import queue
 import traceback
 from datetime import datetime
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+# Uploads up to this size are kept in memory while they wait for their job; larger ones are spooled to disk
+app.config['UPLOAD_SPOOL_BYTES'] = int(float(os.environ.get('UPLOAD_SPOOL_MB', 4)) * 1024 * 1024)
+app.config['CHUNK_SECONDS'] = float(os.environ.get('CHUNK_SECONDS', DEFAULT_CHUNK_SECONDS))  # 0 disables chunking
+app.config['CHUNK_WORKERS'] = int(os.environ.get('CHUNK_WORKERS', DEFAULT_CHUNK_WORKERS))
+app.config['MAX_CHUNK_WORKERS'] = int(os.environ.get('MAX_CHUNK_WORKERS', 8))
+app.config['BATCH_WORKERS'] = int(os.environ.get('BATCH_WORKERS', 4))  # files processed at once per batch
+app.config['MAX_BATCH_WORKERS'] = int(os.environ.get('MAX_BATCH_WORKERS', 8))
+app.config['MAX_BATCH_FILES'] = int(os.environ.get('MAX_BATCH_FILES', 50))
+# Canonical format uploads are normalized to before recognition (AUDIO_SAMPLE_RATE=0 keeps the source rate)
+app.config['AUDIO_SAMPLE_RATE'], app.config['AUDIO_SAMPLE_WIDTH'] = normalization_target()
+app.config['COALESCE_REQUESTS'] = os.environ.get('COALESCE_REQUESTS', '1').lower() not in ('0', 'false', 'no')
+app.config['VAD_ENABLED'] = os.environ.get('VAD_ENABLED', '1').lower() not in ('0', 'false', 'no')
+app.config['MAX_AUDIO_SECONDS'] = float(os.environ.get('MAX_AUDIO_SECONDS', 0))  # by header duration, 0 disables
+
+# Metrics exposed at /metrics
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram("http_request_duration_seconds", "Time to produce an HTTP response",
+                                    ("endpoint", "status"))
+requests_in_flight = metrics.gauge("http_requests_in_flight", "Requests currently being handled", ("endpoint",))
+upload_seconds = metrics.histogram("upload_read_seconds", "Time to read an uploaded file into memory")
+decode_seconds = metrics.histogram("audio_decode_seconds", "Time to decode an upload to PCM", ("format",))
+recognizer_seconds = metrics.histogram("recognizer_request_seconds", "Recognizer round-trip time",
+                                       ("language", "outcome"))
+autodetect_probes = metrics.histogram("autodetect_probes", "Recognizer requests made per auto-detect",
+                                      buckets=(1, 2, 3, 4))
+audio_seconds = metrics.histogram("audio_processed_seconds", "Duration of decoded audio per transcription",
+                                  buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
+audio_pcm_bytes = metrics.histogram("audio_pcm_bytes", "Decoded PCM size per upload before and after normalization",
+                                    ("stage",), buckets=(1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8, 5e8))
+vad_saved_seconds = metrics.histogram("vad_saved_seconds", "Audio seconds the voice-activity filter kept from the recognizer",
+                                      buckets=(0, 0.5, 1, 2, 5, 10, 30, 60, 300))
+coalesced_requests = metrics.counter("coalesced_requests", "Requests that joined an identical in-flight transcription",
+                                     ("endpoint",))
+vad_rejected = metrics.counter("vad_rejected", "Uploads rejected locally as containing no speech")
+autodetect_probes_avoided = metrics.counter("autodetect_probes_avoided",
+                                            "Auto-detect probes skipped because the learned likeliest language won")
+queue_wait_seconds = metrics.histogram("scheduler_queue_wait_seconds",
+                                       "Time a transcription waited to be scheduled, by priority class",
+                                       ("queue", "priority"),
+                                       buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
+
+admission_rejected = metrics.counter("admission_rejected", "Transcriptions turned away with 429 by admission control",
+                                     ("reason",))
+
+def observe_queue_wait(queue_name):
+    """Scheduler on_dispatch callback recording each entry's wait under queue_name"""
+    return lambda entry: queue_wait_seconds.observe(entry.waited, queue=queue_name, priority=entry.priority)
 
 # Enable CORS for all routes
-CORS(app, origins=['*'], methods=['GET', 'POST', 'OPTIONS'], allow_headers=['Content-Type'])
+CORS(app, origins=['*'], methods=['GET', 'HEAD', 'POST', 'PATCH', 'DELETE', 'OPTIONS'],
+     allow_headers=['Content-Type', 'Upload-Offset', 'X-Client-Id', 'X-API-Key'], expose_headers=['Upload-Offset'])
 
 # Audio file converter class
 class AudioAPIConverter:
     def __init__(self):
         self.recognizer = sr.Recognizer()
-        self.supported_formats = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg'}
+        self.backend = create_backend()
+        self.cache = create_cache()
+        self.language_priors = create_language_priors()
+        self.decoder = create_decoder_pool()  # None decodes on the request's own thread
+        self.supported_formats = {'.wav', '.mp3', '.m4a', '.flac', '.aac', '.ogg', '.aiff', '.aif'}
     
     def is_audio_file(self, filename):
         """Check if file is a supported audio format"""
@@ -40,54 +110,124 @@ class AudioAPIConverter:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            # Handle different audio formats
-            if file_path.lower().endswith('.wav'):
-                with sr.AudioFile(file_path) as source:
-                    audio_data = self.recognizer.record(source)
-                return audio_data
-            else:
-                # Convert other formats to WAV using pydub
-                audio = AudioSegment.from_file(file_path)
-                
-                # Create temporary WAV file
-                temp_wav = f"temp_{uuid.uuid4().hex}.wav"
-                audio.export(temp_wav, format="wav")
-                
-                # Load with speech_recognition
-                with sr.AudioFile(temp_wav) as source:
-                    audio_data = self.recognizer.record(source)
-                
-                # Clean up temporary file
-                if os.path.exists(temp_wav):
-                    os.remove(temp_wav)
-                
-                return audio_data
+            return self.decode(file_path, None)[0]
                 
         except Exception as e:
             raise Exception(f"Error loading audio file: {str(e)}")
     
-    def transcribe_audio(self, audio_data, language="auto"):
-        """Transcribe audio data to text"""
+    def load_audio_stream(self, stream, filename, info=None):
+        """Decode and normalize an uploaded stream in memory; returns (audio_data, normalization stats)"""
         try:
+            return self.decode(stream, filename, info)
+        except Exception as e:
+            raise Exception(f"Error loading audio file: {str(e)}")
+
+    def decode(self, source, filename, info=None):
+        """Decode a path or stream at the configured rate and width, in the decoder pool when there is one
+
+        info is the source's probe_audio result when the caller already has it.
+        """
+        decode = self.decoder.decode if self.decoder else decode_audio_with_stats
+        return decode(source, filename, sample_rate=app.config['AUDIO_SAMPLE_RATE'],
+                      sample_width=app.config['AUDIO_SAMPLE_WIDTH'], info=info)
+    
+    def transcribe_audio(self, audio_data, language="auto", chunk_seconds=None, workers=None, on_progress=None,
+                         on_segment=None, client=None):
+        """Transcribe audio data to text, reusing cached transcripts
+
+        Recordings longer than chunk_seconds are split at silences and the
+        chunks are transcribed concurrently on up to `workers` threads;
+        on_progress(finished, total) and on_segment(segment) are called as
+        chunks complete. client picks the learned auto-detect order.
+        """
+        if chunk_seconds and audio_duration(audio_data) > chunk_seconds:
+            return self.transcribe_chunked(audio_data, language, chunk_seconds, workers,
+                                           on_segment=on_segment, on_progress=on_progress, client=client)
+
+        cache_key = self.cache.make_key(audio_data, language)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            result = dict(cached, cached=True)
             if language == "auto":
-                # Try both languages and return the first successful result
-                for lang in ["en-IN", "hi-IN"]:
-                    try:
-                        text = self.recognizer.recognize_google(audio_data, language=lang)
-                        return {
-                            "text": text,
-                            "language": lang,
-                            "confidence": "high"
-                        }
-                    except sr.UnknownValueError:
-                        continue
-                    except sr.RequestError:
-                        continue
-                
-                return None
+                result["detection"] = {"winner": cached["language"], "probes": []}
+            return result
+
+        result = self.recognize_audio(audio_data, language, client)
+        if result:
+            self.cache.put(cache_key, {
+                "text": result["text"],
+                "language": result["language"],
+                "confidence": result["confidence"]
+            })
+        return result
+
+    def transcribe_chunked(self, audio_data, language, chunk_seconds, workers=None, on_segment=None,
+                           on_progress=None, client=None):
+        """Transcribe a long recording chunk by chunk and stitch the results"""
+        stitched = transcribe_in_chunks(
+            audio_data,
+            lambda chunk: self.transcribe_audio(chunk, language, client=client),
+            max_chunk_seconds=chunk_seconds,
+            workers=workers or DEFAULT_CHUNK_WORKERS,
+            on_segment=on_segment,
+            on_progress=on_progress
+        )
+        segments = stitched["segments"]
+        if not stitched["text"]:
+            errors = [segment["error"] for segment in segments if segment["error"]]
+            if errors and len(errors) == len(segments):
+                raise Exception(errors[0])
+            return None
+
+        return {
+            "text": stitched["text"],
+            "language": language if language != "auto" else stitched["language"],
+            "confidence": "high",
+            "segments": segments
+        }
+
+    def recognize_audio(self, audio_data, language="auto", client=None):
+        """Send audio data to the recognizer"""
+        try:
+            if language == "auto":
+                # Probe in the order learned for this client; the preferred success wins
+                detection = probe_languages(self.backend, audio_data, AUTO_LANGUAGES,
+                                            priors=self.language_priors, client=client)
+                for probe in detection["probes"]:
+                    if probe["latency_ms"] is not None:
+                        recognizer_seconds.observe(probe["latency_ms"] / 1000.0, language=probe["language"],
+                                                   outcome=probe["status"])
+                autodetect_probes.observe(sum(1 for probe in detection["probes"]
+                                              if probe["status"] not in ("cancelled", "skipped")))
+                autodetect_probes_avoided.inc(sum(1 for probe in detection["probes"] if probe["status"] == "skipped"))
+                if detection["text"] is None:
+                    errors = [probe["error"] for probe in detection["probes"] if probe["status"] == "error"]
+                    if errors:
+                        raise sr.RequestError(errors[0])
+                    return None
+
+                return {
+                    "text": detection["text"],
+                    "language": detection["language"],
+                    "confidence": "high",
+                    "detection": {
+                        "winner": detection["language"],
+                        "lead": detection["lead"],
+                        "probes": detection["probes"]
+                    }
+                }
             else:
                 # Use specified language
-                text = self.recognizer.recognize_google(audio_data, language=language)
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    text = self.backend.recognize(audio_data, language)
+                    outcome = "recognized"
+                except sr.UnknownValueError:
+                    outcome = "no_speech"
+                    raise
+                finally:
+                    recognizer_seconds.observe(time.perf_counter() - started, language=language, outcome=outcome)
                 return {
                     "text": text,
                     "language": language,
@@ -97,12 +237,17 @@ class AudioAPIConverter:
         except sr.UnknownValueError:
             return None
         except sr.RequestError as e:
-            raise Exception(f"Speech recognition service error: {str(e)}")
+            raise TranscriptionError(f"Speech recognition service error: {str(e)}", "RECOGNIZER_UNAVAILABLE", 503)
         except Exception as e:
             raise Exception(f"Transcription error: {str(e)}")
 
-# Initialize converter
+# Initialize converter and the background executor that runs transcriptions
 converter = AudioAPIConverter()
+jobs = create_job_manager(on_dispatch=observe_queue_wait("jobs"))
+memory = create_memory_budget()
+uploads = create_upload_store(decoder=converter.decoder)
+admission = create_admission_controller(decode_queue_depth=lambda: len(jobs.scheduler),
+                                        recognizer_calls=lambda: converter.backend.in_flight)
 
 @app.route('/')
 def home():
@@ -144,11 +289,42 @@ def home():
                     <li><code>language</code> - Language code: en-IN, hi-IN, or auto (optional, default: auto)</li>
                 </ul>
             </div>
-            
+
+            <div class="endpoint">
+                <span class="method">POST</span> <code>/transcribe/stream</code>
+                <p>Same parameters as <code>/transcribe</code>; streams <code>received</code>, <code>decoded</code>, one <code>segment</code> per recognized chunk and a final <code>result</code> (or <code>error</code>) as NDJSON, or as Server-Sent Events with <code>Accept: text/event-stream</code>.</p>
+            </div>
+
+            <div class="endpoint">
+                <span class="method">POST</span> <code>/transcribe/batch</code>
+                <p>Upload several audio files in one request; they are transcribed concurrently.</p>
+                <strong>Parameters:</strong>
+                <ul>
+                    <li><code>files</code> - Audio files (repeat the field for each file)</li>
+                    <li><code>language</code> - Applied to every file (optional, default: auto)</li>
+                    <li><code>parallelism</code> - Files processed at once (optional, default: {{ batch_workers }}, max: {{ max_batch_workers }})</li>
+                </ul>
+            </div>
+
+            <div class="endpoint">
+                <span class="method">POST</span> <code>/jobs</code>
+                <p>Same parameters as <code>/transcribe</code>, but returns a <code>job_id</code> immediately (202) while the audio is processed in the background.</p>
+            </div>
+
+            <div class="endpoint">
+                <span class="method">GET</span> <code>/jobs/&lt;job_id&gt;</code>
+                <p>Job status (<code>queued</code>, <code>running</code>, <code>completed</code>, <code>failed</code>), progress and, once finished, the result or error.</p>
+            </div>
+
             <div class="endpoint">
                 <span class="method">GET</span> <code>/health</code>
                 <p>Check API health status.</p>
             </div>
+
+            <div class="endpoint">
+                <span class="method">GET</span> <code>/metrics</code>
+                <p>Per-stage latency histograms and in-flight requests in Prometheus text format.</p>
+            </div>
             
             <h2>🎯 Supported Audio Formats</h2>
             <div>
@@ -164,7 +340,7 @@ def home():
             <div class="upload-form">
                 <form id="uploadForm" enctype="multipart/form-data">
                     <label for="audioFile">Select Audio File:</label><br>
-                    <input type="file" id="audioFile" name="file" accept=".wav,.mp3,.m4a,.flac,.aac,.ogg" required><br>
+                    <input type="file" id="audioFile" name="file" accept=".wav,.mp3,.m4a,.flac,.aac,.ogg,.aiff,.aif" required><br>
                     
                     <label for="language">Language:</label><br>
                     <select id="language" name="language">
@@ -218,26 +394,61 @@ print(result["text"])</code></pre>
                 formData.append('file', fileInput.files[0]);
                 formData.append('language', languageInput.value);
                 
-                resultDiv.innerHTML = '⏳ Processing...';
+                resultDiv.innerHTML = '⏳ Uploading...';
                 resultDiv.style.display = 'block';
-                
+
                 try {
-                    const response = await fetch('/transcribe', {
+                    // Stream events so segments show up as soon as they are recognized
+                    const response = await fetch('/transcribe/stream', {
                         method: 'POST',
                         body: formData
                     });
-                    
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        resultDiv.innerHTML = `
-                            <h4>✅ Transcription Result:</h4>
-                            <p><strong>Text:</strong> ${result.text}</p>
-                            <p><strong>Language:</strong> ${result.language}</p>
-                            <p><strong>Confidence:</strong> ${result.confidence}</p>
-                        `;
-                    } else {
+
+                    if (!response.ok) {
+                        const result = await response.json();
                         resultDiv.innerHTML = `<h4>❌ Error:</h4><p>${result.error}</p>`;
+                        return;
+                    }
+
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    const segments = [];
+                    let status = '';
+                    let buffered = '';
+
+                    const render = (footer) => {
+                        const lines = segments.filter(s => s && s.text).map(s => `<p>[${s.start.toFixed(1)}s] ${s.text}</p>`);
+                        resultDiv.innerHTML = `<p>${status}</p>${lines.join('')}${footer || ''}`;
+                    };
+
+                    while (true) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffered += decoder.decode(value, { stream: true });
+                        const lines = buffered.split('\\n');
+                        buffered = lines.pop();
+                        for (const line of lines.filter(l => l.trim())) {
+                            const event = JSON.parse(line);
+                            if (event.event === 'received') {
+                                status = `⏳ Uploaded ${event.filename}, decoding...`;
+                            } else if (event.event === 'decoded') {
+                                status = `⏳ Decoded ${event.duration.toFixed(1)}s of audio, transcribing...`;
+                            } else if (event.event === 'segment') {
+                                segments[event.index] = event;
+                            } else if (event.event === 'result') {
+                                status = '<h4>✅ Transcription Result:</h4>';
+                                render(`
+                                    <p><strong>Text:</strong> ${event.text}</p>
+                                    <p><strong>Language:</strong> ${event.language}</p>
+                                    <p><strong>Confidence:</strong> ${event.confidence}</p>
+                                `);
+                                continue;
+                            } else if (event.event === 'error') {
+                                resultDiv.innerHTML = `<h4>❌ Error:</h4><p>${event.error}</p>`;
+                                continue;
+                            }
+                            render();
+                        }
                     }
                 } catch (error) {
                     resultDiv.innerHTML = `<h4>❌ Error:</h4><p>${error.message}</p>`;
@@ -247,107 +458,710 @@ print(result["text"])</code></pre>
     </body>
     </html>
     """
-    return render_template_string(html_template)
+    return render_template_string(html_template, batch_workers=app.config['BATCH_WORKERS'],
+                                  max_batch_workers=app.config['MAX_BATCH_WORKERS'])
+
+@app.before_request
+def start_request_metrics():
+    """Count the request as in flight and start its timer"""
+    g.request_started = time.perf_counter()
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    requests_in_flight.inc(endpoint=g.metrics_endpoint)
+
+@app.after_request
+def record_request_metrics(response):
+    """Observe request latency by endpoint and status"""
+    if "request_started" in g:
+        request_seconds.observe(time.perf_counter() - g.request_started, endpoint=g.metrics_endpoint,
+                                status=response.status_code)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if "metrics_endpoint" in g:
+        requests_in_flight.dec(endpoint=g.metrics_endpoint)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        "status": "healthy",
+    return jsonify(health_status())
+
+def health_status():
+    """Health report shared by the Flask and asyncio servers"""
+    return {
+        "status": "healthy" if converter.backend.healthy() else "degraded",
         "service": "Audio-to-Text API",
         "timestamp": datetime.now().isoformat(),
         "supported_formats": list(converter.supported_formats),
-        "supported_languages": ["en-IN", "hi-IN", "auto"]
-    })
+        "supported_languages": ["en-IN", "hi-IN", "auto"],
+        "recognizer": converter.backend.stats(),
+        "cache": converter.cache.stats(),
+        "languages": converter.language_priors.stats(),
+        "decoder": converter.decoder.stats() if converter.decoder else None,
+        "jobs": jobs.stats(),
+        "uploads": uploads.stats(),
+        "memory": memory.stats(),
+        "admission": admission.stats()
+    }
+
+def parse_chunking_options(form):
+    """Read chunk_seconds and workers from a request form, applying server defaults and limits"""
+    try:
+        chunk_seconds = float(form.get('chunk_seconds', app.config['CHUNK_SECONDS']))
+        workers = int(form.get('workers', app.config['CHUNK_WORKERS']))
+    except (TypeError, ValueError):
+        raise ValueError("chunk_seconds must be a number and workers an integer")
+
+    if chunk_seconds < 0:
+        raise ValueError("chunk_seconds must be 0 (no chunking) or positive")
+    if chunk_seconds and chunk_seconds < 5:
+        raise ValueError("chunk_seconds must be at least 5")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    return chunk_seconds, min(workers, app.config['MAX_CHUNK_WORKERS'])
+
+def error_response(message, code, status):
+    """JSON error body in the API's usual shape"""
+    return jsonify({
+        "success": False,
+        "error": message,
+        "code": code
+    }), status
+
+def overloaded_body(error):
+    """JSON body for a transcription turned away by admission control (counted in admission_rejected)"""
+    admission_rejected.inc(reason=error.reason)
+    return {"success": False, "error": str(error), "code": "OVERLOADED", "retry_after": error.retry_after}
+
+def overloaded_response(error):
+    """429 with Retry-After for an Overloaded error"""
+    response = jsonify(overloaded_body(error))
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+def request_client_id(headers=None):
+    """Who sent the request, for per-client language statistics
+
+    Taken from the X-Client-Id header, else a hash of the X-API-Key header
+    (so keys are never stored), else None for anonymous traffic. headers
+    defaults to the current Flask request's.
+    """
+    headers = request.headers if headers is None else headers
+    client = headers.get('X-Client-Id', '').strip()
+    if client:
+        return client[:128]
+    api_key = headers.get('X-API-Key', '').strip()
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return None
+
+def parse_transcription_options(form, headers=None):
+    """Validate language and chunking fields; raises TranscriptionError"""
+    # Get language parameter
+    language = form.get('language', 'auto')
+    if language not in ['en-IN', 'hi-IN', 'auto']:
+        raise TranscriptionError("Invalid language. Use: en-IN, hi-IN, or auto", "INVALID_LANGUAGE", 400)
+
+    # Get chunking parameters for long recordings
+    try:
+        chunk_seconds, workers = parse_chunking_options(form)
+    except ValueError as e:
+        raise TranscriptionError(str(e), "INVALID_CHUNKING", 400)
+
+    return {"language": language, "chunk_seconds": chunk_seconds, "workers": workers,
+            "client": request_client_id(headers)}
+
+def check_audio_filename(filename, info=None):
+    """Reject a missing file name, or an unsupported format unless the header was recognized; raises TranscriptionError"""
+    # Check if file is selected
+    if filename == '':
+        raise TranscriptionError("No file selected", "EMPTY_FILE", 400)
+
+    # Check file format (a recognized header wins over a wrong or missing extension)
+    if info is None and not converter.is_audio_file(filename):
+        raise TranscriptionError(
+            f"Unsupported file format. Supported: {', '.join(converter.supported_formats)}",
+            "UNSUPPORTED_FORMAT", 400
+        )
+
+def inspect_audio(source, filename):
+    """Sniff an upload's container and check its header before any decoding; returns AudioInfo or None
+
+    None means the bytes were not recognized and the extension decided.
+    Raises TranscriptionError for an unsupported format, a header without
+    a usable sample rate or channel count, or audio over MAX_AUDIO_SECONDS.
+    """
+    info = probe_audio(source)
+    check_audio_filename(filename, info)
+    if info is None:
+        return None
+    if info.sample_rate is not None and not (info.sample_rate > 0 and info.channels):
+        raise TranscriptionError(f"Invalid {info.container} header: no sample rate or channels", "INVALID_AUDIO", 400)
+    limit = app.config['MAX_AUDIO_SECONDS']
+    if limit and info.duration is not None and info.duration > limit:
+        raise TranscriptionError(f"Audio is {info.duration:.0f}s long. Maximum is {limit:g}s",
+                                 "AUDIO_TOO_LONG", 400)
+    return info
+
+def spool_upload():
+    """Empty spool file for an upload: in memory up to UPLOAD_SPOOL_BYTES, on disk beyond"""
+    return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_BYTES'])
+
+def upload_size(upload):
+    """Bytes in an upload's spool file"""
+    position = upload.tell()
+    size = upload.seek(0, os.SEEK_END)
+    upload.seek(position)
+    return size
+
+def upload_digest(upload):
+    """SHA-256 hex digest of an upload, read a block at a time"""
+    digest = hashlib.sha256()
+    position = upload.tell()
+    upload.seek(0)
+    for block in iter(lambda: upload.read(1024 * 1024), b""):
+        digest.update(block)
+    upload.seek(position)
+    return digest.hexdigest()
+
+def read_audio_upload(file):
+    """Check one uploaded file and copy it into a spool file that outlives the request"""
+    with upload_seconds.time():
+        upload = spool_upload()
+        shutil.copyfileobj(file.stream, upload, 64 * 1024)
+        upload.seek(0)
+    return {"upload": upload, "filename": file.filename, "audio": inspect_audio(upload, file.filename)}
+
+def transcription_cost(options):
+    """Scheduling cost of a transcription in audio seconds: header duration, else estimated from the upload size"""
+    upload = options.get("upload")
+    return job_cost(options.get("audio"), upload_size(upload) if upload is not None else options.get("size"))
+
+def job_metadata(options):
+    """Job metadata for a transcription: safe filename, language, priority class and the header info if recognized"""
+    metadata = {"filename": secure_filename(options["filename"]), "language": options["language"],
+                "priority": priority_class(transcription_cost(options))}
+    if options.get("audio") is not None:
+        metadata["audio"] = options["audio"].to_dict()
+    return metadata
+
+def parse_upload():
+    """Validate the uploaded file and form fields of a transcription request
+
+    Returns the keyword arguments for run_transcription. Raises TranscriptionError.
+    """
+    # Check if file was uploaded
+    if 'file' not in request.files:
+        raise TranscriptionError("No file uploaded", "NO_FILE", 400)
+
+    options = parse_transcription_options(request.form)
+    options.update(read_audio_upload(request.files['file']))
+    return options
+
+def shift_segment(segment, offset):
+    """Segment with start/end moved from trimmed-audio time back to upload time"""
+    if not offset:
+        return segment
+    return dict(segment, start=round(segment["start"] + offset, 3), end=round(segment["end"] + offset, 3))
+
+def run_transcription(job, upload, filename, language, chunk_seconds, workers, client=None, on_event=None,
+                      decode=None, audio=None, size=None):
+    """Decode and transcribe one upload on a job worker; returns the response body
+
+    on_event(name, data), if given, receives "decoded" and "segment" events
+    as they happen (used by the streaming endpoint). decode, if given,
+    replaces decoding `upload` and returns (audio_data, normalization stats).
+    audio is the upload's header info from inspect_audio, and size the
+    byte count of an upload that only arrives through decode.
+    """
+    with reserve_audio_memory(upload, audio, size):
+        audio_data, decoded = decode_upload(job, upload, filename, decode, audio)
+        return transcribe_decoded(job, audio_data, decoded, filename, language, chunk_seconds, workers, client,
+                                  on_event)
+
+def reserve_audio_memory(upload, audio=None, size=None):
+    """Hold room in the memory budget for one transcription; raises TranscriptionError if none frees up in time
+
+    Uploads spooled to disk, and upload sessions (upload None, size their
+    byte count), only count for what decoding them produces; their size
+    still sizes that estimate when the header gave no duration.
+    """
+    if upload is not None:
+        size = upload_size(upload)
+        resident = size if size <= app.config['UPLOAD_SPOOL_BYTES'] else 0
+    else:
+        size, resident = size or 0, 0
+    footprint = audio_footprint(size, audio, app.config['AUDIO_SAMPLE_RATE'], app.config['AUDIO_SAMPLE_WIDTH'],
+                                resident_bytes=resident)
+    try:
+        return memory.reserve(footprint)
+    except BudgetTimeout as e:
+        raise TranscriptionError(f"Server busy: audio memory budget full ({e})", "MEMORY_BUSY", 503)
+
+def decode_upload(job, upload, filename, decode=None, audio=None):
+    """Decoding stage of run_transcription; returns (audio_data, decode info for the "decoded" event)"""
+    try:
+        # Decode straight from the in-memory upload (no temp files)
+        job.update(stage="decoding", progress=0.05)
+        started = time.perf_counter()
+        if decode is not None:
+            audio_data, normalization = decode()
+        else:
+            audio_data, normalization = converter.load_audio_stream(upload, filename, audio)
+        container = audio.container if audio else file_extension(filename).lstrip('.')
+        decode_seconds.observe(time.perf_counter() - started, format=container)
+        if not audio_data:
+            raise TranscriptionError("Failed to load audio file", "AUDIO_LOAD_ERROR", 500)
+        duration = audio_duration(audio_data)
+        audio_seconds.observe(duration)
+        audio_pcm_bytes.observe(normalization["bytes_before"], stage="source")
+        audio_pcm_bytes.observe(normalization["bytes_after"], stage="normalized")
+        decoded = {"duration": round(duration, 3), "decode_ms": round((time.perf_counter() - started) * 1000, 1),
+                   "container": container, "normalization": normalization}
+    except TranscriptionError:
+        raise
+    except Exception as e:
+        app.logger.error(f"Transcription error: {str(e)}\n{traceback.format_exc()}")
+        raise
+    return audio_data, decoded
+
+def transcribe_decoded(job, audio_data, decoded, filename, language, chunk_seconds, workers, client=None,
+                       on_event=None):
+    """Silence filtering and recognition stage of run_transcription; returns the response body"""
+    emit = on_event or (lambda name, data: None)
+    vad = None
+    offset = 0.0
+    try:
+        # Reject speech-free audio and trim leading/trailing silence before any recognizer call
+        if app.config['VAD_ENABLED']:
+            trimmed, activity = prefilter(audio_data)
+            vad = activity.to_dict()
+            vad_saved_seconds.observe(activity.saved_seconds)
+            decoded["vad"] = vad
+            if trimmed is None:
+                vad_rejected.inc()
+                emit("decoded", decoded)
+                raise TranscriptionError("No speech detected in the audio", "NO_SPEECH_DETECTED", 422)
+            audio_data, offset = trimmed, activity.start
+        emit("decoded", decoded)
+
+        # Transcribe audio; chunked recordings advance progress chunk by chunk
+        job.update(stage="transcribing", progress=0.2)
+        result = converter.transcribe_audio(
+            audio_data, language, chunk_seconds, workers, client=client,
+            on_progress=lambda finished, total: job.update(progress=0.2 + 0.8 * finished / total),
+            on_segment=lambda segment: emit("segment", shift_segment(segment, offset))
+        )
+        if result and "segments" not in result:
+            # Unchunked audio arrives as a single segment
+            emit("segment", shift_segment({"index": 0, "start": 0.0, "end": round(audio_duration(audio_data), 3),
+                                           "text": result["text"], "language": result["language"],
+                                           "error": None}, offset))
+    except TranscriptionError:
+        raise
+    except Exception as e:
+        app.logger.error(f"Transcription error: {str(e)}\n{traceback.format_exc()}")
+        raise
+
+    if not result:
+        raise TranscriptionError("Could not understand the audio content", "NO_SPEECH_DETECTED", 422)
+
+    response = {
+        "text": result["text"],
+        "language": result["language"],
+        "confidence": result["confidence"],
+        "filename": secure_filename(filename),
+        "timestamp": datetime.now().isoformat()
+    }
+    if "detection" in result:
+        response["detection"] = result["detection"]
+    if result.get("cached"):
+        response["cached"] = True
+    if "segments" in result:
+        response["segments"] = [shift_segment(segment, offset) for segment in result["segments"]]
+    response["normalization"] = decoded["normalization"]
+    if vad:
+        response["vad"] = vad
+    return response
+
+def coalesce_key(options, digest=None):
+    """Single-flight key: identical audio bytes transcribed with identical settings
+
+    digest is the upload's SHA-256 hex digest when the caller already has it.
+    """
+    digest = digest or upload_digest(options["upload"])
+    return (digest, options["language"], options["chunk_seconds"])
+
+def admitted(controller, cost, submit):
+    """Run submit() -> (job, joined) under an admission ticket for cost audio seconds; raises Overloaded
+
+    The ticket is held until the job finishes, or given back at once when
+    the request joined a job that was already admitted.
+    """
+    ticket = controller.admit(cost)
+    try:
+        job, joined = submit()
+    except BaseException:
+        ticket.release()
+        raise
+    if joined:
+        ticket.release()
+    else:
+        job.add_done_callback(lambda job: ticket.release())
+    return job, joined
+
+def submit_transcription():
+    """Validate the current request and queue it as a background job; returns (job, joined)
+
+    While an identical upload is still being transcribed the request joins
+    that job instead of decoding and recognizing the same audio again.
+    Raises Overloaded before the upload is read if the server is at a
+    load limit, or after if this upload would take it over one.
+    """
+    admission.check()
+    options = parse_upload()
+    work = lambda job: run_transcription(job, **options)
+    metadata = job_metadata(options)
+    cost = transcription_cost(options)
+    if not app.config['COALESCE_REQUESTS']:
+        return admitted(admission, cost, lambda: (jobs.submit(work, options["client"], cost, **metadata), False))
+
+    job, joined = admitted(admission, cost, lambda: jobs.submit_or_join(coalesce_key(options), work,
+                                                                         options["client"], cost, **metadata))
+    if joined:
+        coalesced_requests.inc(endpoint=request.endpoint)
+    return job, joined
 
 @app.route('/transcribe', methods=['POST'])
 def transcribe_audio():
-    """Main transcription endpoint"""
+    """Main transcription endpoint (waits for its background job to finish)"""
     try:
-        # Check if file was uploaded
-        if 'file' not in request.files:
-            return jsonify({
-                "success": False,
-                "error": "No file uploaded",
-                "code": "NO_FILE"
-            }), 400
-        
-        file = request.files['file']
-        
-        # Check if file is selected
-        if file.filename == '':
-            return jsonify({
-                "success": False,
-                "error": "No file selected",
-                "code": "EMPTY_FILE"
-            }), 400
-        
-        # Get language parameter
-        language = request.form.get('language', 'auto')
-        if language not in ['en-IN', 'hi-IN', 'auto']:
-            return jsonify({
-                "success": False,
-                "error": "Invalid language. Use: en-IN, hi-IN, or auto",
-                "code": "INVALID_LANGUAGE"
-            }), 400
-        
-        # Check file format
-        if not converter.is_audio_file(file.filename):
-            return jsonify({
-                "success": False,
-                "error": f"Unsupported file format. Supported: {', '.join(converter.supported_formats)}",
-                "code": "UNSUPPORTED_FORMAT"
-            }), 400
-        
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}_{filename}")
-        
-        try:
-            file.save(temp_path)
-            
-            # Load and transcribe audio
-            audio_data = converter.load_audio_file(temp_path)
-            
-            if not audio_data:
-                return jsonify({
-                    "success": False,
-                    "error": "Failed to load audio file",
-                    "code": "AUDIO_LOAD_ERROR"
-                }), 500
-            
-            # Transcribe audio
-            result = converter.transcribe_audio(audio_data, language)
-            
-            if result:
-                return jsonify({
-                    "success": True,
-                    "text": result["text"],
-                    "language": result["language"],
-                    "confidence": result["confidence"],
-                    "filename": filename,
-                    "timestamp": datetime.now().isoformat()
-                })
-            else:
-                return jsonify({
-                    "success": False,
-                    "error": "Could not understand the audio content",
-                    "code": "NO_SPEECH_DETECTED"
-                }), 422
-        
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-    
+        job, joined = submit_transcription()
+        job.wait()
+        jobs.discard(job.id)
+
+        if job.status == COMPLETED:
+            response = dict(success=True, **job.result)
+            if joined:
+                response.update(filename=secure_filename(request.files['file'].filename), coalesced=True)
+            return jsonify(response)
+        return error_response(job.error["error"], job.error["code"], job.error["status"])
+
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
     except Exception as e:
         app.logger.error(f"Transcription error: {str(e)}\n{traceback.format_exc()}")
-        return jsonify({
-            "success": False,
-            "error": f"Internal server error: {str(e)}",
-            "code": "INTERNAL_ERROR"
-        }), 500
+        return error_response(f"Internal server error: {str(e)}", "INTERNAL_ERROR", 500)
+
+def format_event(name, data, sse):
+    """Serialize one stream event as a Server-Sent Event or an NDJSON line"""
+    if sse:
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps(dict(event=name, **data)) + "\n"
+
+@app.route('/transcribe/stream', methods=['POST'])
+def transcribe_stream():
+    """Transcription endpoint that streams progress events and segments as they happen
+
+    Sends NDJSON by default, or Server-Sent Events when the client accepts
+    text/event-stream (or passes ?format=sse).
+    """
+    sse = (request.args.get('format') == 'sse' or
+           request.accept_mimetypes.best_match(['application/x-ndjson', 'text/event-stream']) == 'text/event-stream')
+    events = queue.Queue()
+
+    def emit(name, data):
+        events.put((name, data))
+
+    def work(job):
+        try:
+            result = run_transcription(job, on_event=emit, **options)
+            emit("result", dict(success=True, **result))
+            return result
+        except TranscriptionError as e:
+            emit("error", {"success": False, "error": str(e), "code": e.code})
+            raise
+        except Exception as e:
+            emit("error", {"success": False, "error": f"Internal server error: {str(e)}", "code": "INTERNAL_ERROR"})
+            raise
+        finally:
+            events.put(None)
+
+    try:
+        admission.check()
+        options = parse_upload()
+        metadata = job_metadata(options)
+        received = {"filename": metadata["filename"], "bytes": upload_size(options["upload"]),
+                    "audio": metadata.get("audio")}
+        cost = transcription_cost(options)
+        job, _ = admitted(admission, cost, lambda: (jobs.submit(work, options["client"], cost, **metadata), False))
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+
+    def generate():
+        yield format_event("received", dict(received, job_id=job.id), sse)
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield format_event(event[0], event[1], sse)
+        jobs.discard(job.id)
+
+    return Response(generate(), mimetype='text/event-stream' if sse else 'application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def parse_parallelism(form):
+    """Read the batch parallelism field, applying the server default and limit"""
+    try:
+        parallelism = int(form.get('parallelism', app.config['BATCH_WORKERS']))
+    except (TypeError, ValueError):
+        raise TranscriptionError("parallelism must be an integer", "INVALID_PARALLELISM", 400)
+    if parallelism < 1:
+        raise TranscriptionError("parallelism must be at least 1", "INVALID_PARALLELISM", 400)
+    return min(parallelism, app.config['MAX_BATCH_WORKERS'])
+
+def batch_entry(index, job):
+    """Per-file entry of a batch response"""
+    entry = {
+        "index": index,
+        "filename": job.metadata["filename"],
+        "success": job.status == COMPLETED,
+        "processing_time": round(job.finished_at - job.started_at, 3)
+    }
+    if job.status == COMPLETED:
+        entry.update(job.result)
+    else:
+        entry.update(error=job.error["error"], code=job.error["code"])
+    return entry
+
+@app.route('/transcribe/batch', methods=['POST'])
+def transcribe_batch():
+    """Transcribe many uploaded files concurrently in one request"""
+    started = time.perf_counter()
+    try:
+        admission.check()
+        files = request.files.getlist('files') + request.files.getlist('file')
+        if not files:
+            raise TranscriptionError("No files uploaded", "NO_FILE", 400)
+        if len(files) > app.config['MAX_BATCH_FILES']:
+            raise TranscriptionError(
+                f"Too many files. Maximum per batch is {app.config['MAX_BATCH_FILES']}",
+                "TOO_MANY_FILES", 400
+            )
+        options = parse_transcription_options(request.form)
+        parallelism = parse_parallelism(request.form)
+        # Files are inspected one by one as they run, so the batch is costed by its size
+        ticket = admission.admit(job_cost(size=request.content_length))
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    # A bad file fails its own entry, not the whole batch
+    def work(file):
+        return lambda job: run_transcription(job, **read_audio_upload(file), **options)
+
+    batch = [Job(str(index), {"filename": secure_filename(file.filename)}) for index, file in enumerate(files)]
+    try:
+        with ThreadPoolExecutor(max_workers=min(parallelism, len(files)), thread_name_prefix="batch") as executor:
+            list(executor.map(execute_job, batch, [work(file) for file in files]))
+    finally:
+        ticket.release()
+
+    results = [batch_entry(index, job) for index, job in enumerate(batch)]
+    successful = sum(1 for entry in results if entry["success"])
+    return jsonify({
+        "success": True,
+        "results": results,
+        "summary": {
+            "total": len(results),
+            "successful": successful,
+            "failed": len(results) - successful,
+            "parallelism": min(parallelism, len(files)),
+            "processing_time": round(time.perf_counter() - started, 3)
+        }
+    })
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a transcription and return its job id right away"""
+    try:
+        job, joined = submit_transcription()
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+
+    response = {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for('get_job', job_id=job.id)
+    }
+    if joined:
+        response["coalesced"] = True
+    return jsonify(response), 202
+
+def parse_upload_size(fields):
+    """Optional declared total size of a chunked upload"""
+    size = fields.get('size')
+    if size in (None, ''):
+        return None
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise TranscriptionError("size must be an integer number of bytes", "INVALID_UPLOAD", 400)
+    if size <= 0:
+        raise TranscriptionError("size must be positive", "INVALID_UPLOAD", 400)
+    return size
+
+def upload_status(session, status=200):
+    """Session state as JSON, with the offset also in the Upload-Offset header"""
+    response = jsonify(dict(success=True, upload_url=url_for('upload_session', upload_id=session.id),
+                            **session.to_dict()))
+    response.headers['Upload-Offset'] = str(session.offset)
+    return response, status
+
+def open_upload_session(fields, headers=None):
+    """Validate POST /uploads fields and create the session; raises TranscriptionError"""
+    filename = fields.get('filename', '')
+    if not filename:
+        raise TranscriptionError("filename is required", "INVALID_UPLOAD", 400)
+    check_audio_filename(filename)
+    options = parse_transcription_options(fields, headers)
+    early_decode = str(fields.get('early_decode', '')).lower() in ('1', 'true', 'yes')
+    return uploads.create(filename, options, parse_upload_size(fields), early_decode)
+
+def finish_upload(session):
+    """Finalize a session and check the header of what arrived; returns (decode, header info)
+
+    A session whose bytes fail inspect_audio is discarded.
+    """
+    decode = uploads.finalize(session)
+    try:
+        return decode, inspect_audio(session.path, session.filename)
+    except TranscriptionError:
+        uploads.discard(session)
+        raise
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Start a resumable chunked upload (for recordings too large or links too flaky for /transcribe)"""
+    try:
+        admission.check()
+        session = open_upload_session(request.get_json(silent=True) or request.form)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    return upload_status(session, 201)
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def upload_session(upload_id):
+    """Current offset of an upload (HEAD returns just the Upload-Offset header)"""
+    session = uploads.get(upload_id)
+    if session is None:
+        return error_response("Upload not found or expired", "UPLOAD_NOT_FOUND", 404)
+    return upload_status(session)
+
+@app.route('/uploads/<upload_id>', methods=['PATCH'])
+def append_upload(upload_id):
+    """Append the request body at the offset given in the Upload-Offset header"""
+    session = uploads.get(upload_id)
+    if session is None:
+        return error_response("Upload not found or expired", "UPLOAD_NOT_FOUND", 404)
+    try:
+        offset = int(request.headers.get('Upload-Offset', request.args.get('offset', '')))
+    except ValueError:
+        return error_response("Upload-Offset header is required", "INVALID_UPLOAD", 400)
+    try:
+        uploads.append(session, offset, request.stream)
+    except TranscriptionError as e:
+        response, status = error_response(str(e), e.code, e.status)
+        response.headers['Upload-Offset'] = str(session.offset)
+        return response, status
+    return upload_status(session)
+
+@app.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Abandon an upload and delete what was received"""
+    session = uploads.get(upload_id)
+    if session is None:
+        return error_response("Upload not found or expired", "UPLOAD_NOT_FOUND", 404)
+    uploads.discard(session)
+    return jsonify({"success": True, "upload_id": upload_id, "deleted": True})
+
+@app.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Finish an upload and transcribe it as a background job
+
+    Answers 202 with the job (poll /jobs/<id>), or with ?wait=1 waits and
+    answers like /transcribe.
+    """
+    session = uploads.get(upload_id)
+    if session is None:
+        return error_response("Upload not found or expired", "UPLOAD_NOT_FOUND", 404)
+    try:
+        admission.check()
+        decode, audio = finish_upload(session)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    options = dict(session.options, filename=session.filename, audio=audio, size=session.offset)
+    cost = transcription_cost(options)
+    work = lambda job: run_transcription(
+        job, None, session.filename, decode=lambda: decode(app.config['AUDIO_SAMPLE_RATE'],
+                                                           app.config['AUDIO_SAMPLE_WIDTH']),
+        audio=audio, size=session.offset, **session.options)
+    try:
+        job, _ = admitted(admission, cost, lambda: (jobs.submit(work, session.options.get("client"), cost,
+                                                                **job_metadata(options)), False))
+    except Overloaded as e:
+        uploads.reopen(session)
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        uploads.reopen(session)
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+    job.add_done_callback(lambda job: uploads.discard(session))
+
+    if request.args.get('wait', '').lower() in ('1', 'true', 'yes'):
+        job.wait()
+        jobs.discard(job.id)
+        if job.status == COMPLETED:
+            return jsonify(dict(success=True, **job.result))
+        return error_response(job.error["error"], job.error["code"], job.error["status"])
+
+    return jsonify({
+        "success": True,
+        "upload_id": upload_id,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for('get_job', job_id=job.id)
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, progress and (once finished) the result of a job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return error_response("Job not found or expired", "JOB_NOT_FOUND", 404)
+    return jsonify(dict(success=True, **job.to_dict()))
 
 @app.errorhandler(413)
 def file_too_large(error):
@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+"""
+Asyncio Audio-to-Text API Server
+The routes and responses of app.py on aiohttp: an idle or slow connection costs a coroutine, not a thread
+Decoding runs on a bounded executor and recognition is admitted through scheduled slots
+"""
+
+import os
+import io
+import time
+import asyncio
+import hashlib
+import argparse
+import functools
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from werkzeug.utils import secure_filename
+import app as api
+from transcription_jobs import Job, TranscriptionError, JobQueueFull, COMPLETED, execute_job_async
+from job_scheduler import create_scheduler, job_cost
+from admission import create_admission_controller, AdmissionController, Overloaded
+
+DEFAULT_DECODE_CONCURRENCY = os.cpu_count() or 4
+DEFAULT_RECOGNIZE_CONCURRENCY = 16
+UPLOAD_BLOCK_BYTES = 64 * 1024
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Expose-Headers": "Upload-Offset",
+}
+CORS_PREFLIGHT_HEADERS = dict(CORS_HEADERS, **{
+    "Access-Control-Allow-Methods": "GET, HEAD, POST, PATCH, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Upload-Offset, X-Client-Id, X-API-Key",
+})
+
+class ScheduledSlots:
+    """A fixed number of slots handed to waiters in FairScheduler order rather than arrival order
+
+    Every acquire goes through the scheduler, even one that finds a slot
+    free, so each client is charged for all the audio it sends through.
+    """
+
+    def __init__(self, count, scheduler):
+        self.free = count
+        self.scheduler = scheduler
+
+    async def acquire(self, client=None, cost=None):
+        """Wait for a slot; client and cost (audio seconds) set the place in line"""
+        future = asyncio.get_running_loop().create_future()
+        entry = self.scheduler.push(future, client, cost)
+        self._grant()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just before the cancellation landed
+            else:
+                self.scheduler.remove(entry)
+            raise
+
+    def release(self):
+        self.free += 1
+        self._grant()
+
+    def _grant(self):
+        """Wake the next waiters while slots are free, skipping any that gave up"""
+        while self.free:
+            entry = self.scheduler.pop()
+            if entry is None:
+                return
+            if not entry.item.done():
+                self.free -= 1
+                entry.item.set_result(None)
+
+class TranscriptionPipeline:
+    """Runs the decode and recognition stages of app.run_transcription off the event loop
+
+    Each stage has its own thread pool and ScheduledSlots of the same size
+    in front of it, so work waiting for a slot queues as coroutines
+    (visible in stats) instead of inside the executor, threads are only
+    ever busy with real work, and waiting transcriptions are let in
+    shortest first and fairly across clients (see job_scheduler).
+
+    The audio memory reservation is taken before the decode stage, on a pool
+    of its own: a transcription waiting for memory must not sit in a decode
+    slot that a transcription already holding memory needs to finish.
+    """
+
+    def __init__(self, decode_concurrency=DEFAULT_DECODE_CONCURRENCY,
+                 recognize_concurrency=DEFAULT_RECOGNIZE_CONCURRENCY):
+        self.decode_concurrency = decode_concurrency
+        self.recognize_concurrency = recognize_concurrency
+        self.decode_executor = ThreadPoolExecutor(max_workers=decode_concurrency, thread_name_prefix="async-decode")
+        self.reserve_executor = ThreadPoolExecutor(max_workers=decode_concurrency, thread_name_prefix="async-reserve")
+        self.recognize_executor = ThreadPoolExecutor(max_workers=recognize_concurrency,
+                                                     thread_name_prefix="async-recognize")
+        self.decode_slots = ScheduledSlots(decode_concurrency, create_scheduler(api.observe_queue_wait("decode")))
+        self.recognize_slots = ScheduledSlots(recognize_concurrency,
+                                              create_scheduler(api.observe_queue_wait("recognize")))
+        self.waiting = {"memory": 0, "decode": 0, "recognize": 0}
+        self.active = {"decode": 0, "recognize": 0}
+
+    async def _in_stage(self, stage, slots, executor, function, *args, client=None, cost=None):
+        """Wait for a slot in a stage, then run function(*args) on its executor"""
+        self.waiting[stage] += 1
+        try:
+            await slots.acquire(client, cost)
+        finally:
+            self.waiting[stage] -= 1
+        self.active[stage] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(function, *args))
+        finally:
+            self.active[stage] -= 1
+            slots.release()
+
+    async def decode(self, function, *args, client=None, cost=None):
+        """Run a blocking decode-side call (decoding, spooling upload chunks) in the decode stage"""
+        return await self._in_stage("decode", self.decode_slots, self.decode_executor, function, *args,
+                                    client=client, cost=cost)
+
+    async def reserve_memory(self, options):
+        """Wait for room in the audio memory budget outside the stages; returns the Reservation
+
+        Waiters are served in arrival order by the budget itself. A
+        reservation granted after the caller was cancelled is released.
+        """
+        pending = self.reserve_executor.submit(api.reserve_audio_memory, options.get("upload"),
+                                               options.get("audio"), options.get("size"))
+        self.waiting["memory"] += 1
+        try:
+            return await asyncio.wrap_future(pending)
+        except asyncio.CancelledError:
+            pending.add_done_callback(
+                lambda pending: pending.cancelled() or pending.exception() or pending.result().release())
+            raise
+        finally:
+            self.waiting["memory"] -= 1
+
+    async def run(self, job, options, on_event=None, decode=None):
+        """Decode then transcribe one upload within the audio memory budget; returns the /transcribe response body"""
+        client, cost = options.get("client"), api.transcription_cost(options)
+        reservation = await self.reserve_memory(options)
+        try:
+            audio_data, decoded = await self.decode(api.decode_upload, job, options.get("upload"),
+                                                    options["filename"], decode, options.get("audio"),
+                                                    client=client, cost=cost)
+            return await self._in_stage(
+                "recognize", self.recognize_slots, self.recognize_executor, api.transcribe_decoded,
+                job, audio_data, decoded, options["filename"], options["language"], options["chunk_seconds"],
+                options["workers"], client, on_event, client=client, cost=cost
+            )
+        finally:
+            reservation.release()
+
+    def stats(self):
+        return {
+            "decode_concurrency": self.decode_concurrency,
+            "recognize_concurrency": self.recognize_concurrency,
+            "waiting": dict(self.waiting),
+            "active": dict(self.active),
+            "scheduler": {"decode": self.decode_slots.scheduler.stats(),
+                          "recognize": self.recognize_slots.scheduler.stats()},
+        }
+
+    def shutdown(self):
+        self.reserve_executor.shutdown(wait=False)
+        self.decode_executor.shutdown(wait=False)
+        self.recognize_executor.shutdown(wait=False)
+
+pipeline_key = web.AppKey("pipeline", TranscriptionPipeline)
+tasks_key = web.AppKey("tasks", set)
+admission_key = web.AppKey("admission", AdmissionController)
+
+def error_response(message, code, status, headers=None):
+    """JSON error body in the API's usual shape"""
+    return web.json_response({"success": False, "error": message, "code": code}, status=status, headers=headers)
+
+def overloaded_response(error):
+    """429 with Retry-After for an Overloaded error"""
+    return web.json_response(api.overloaded_body(error), status=429, headers={"Retry-After": str(error.retry_after)})
+
+def job_error_response(job):
+    return error_response(job.error["error"], job.error["code"], job.error["status"])
+
+async def wait_for_job(job):
+    """Wait for a job to finish without parking a thread on it"""
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def resolve():
+        if not done.done():
+            done.set_result(None)
+
+    job.add_done_callback(lambda job: loop.call_soon_threadsafe(resolve))
+    await done
+
+def spawn(app, coroutine):
+    """Run a coroutine in the background, keeping a reference until it finishes"""
+    task = asyncio.ensure_future(coroutine)
+    app[tasks_key].add(task)
+    task.add_done_callback(app[tasks_key].discard)
+    return task
+
+async def read_form(request):
+    """Stream a multipart/form-data body into fields and in-memory files
+
+    Returns (fields, files) where files is a list of (field name, filename,
+    spool file, SHA-256 hex digest). Files stay in memory up to
+    UPLOAD_SPOOL_BYTES as in app.py, and the digest used for coalescing is
+    computed as the bytes arrive.
+    """
+    limit = api.app.config['MAX_CONTENT_LENGTH']
+    if request.content_length and request.content_length > limit:
+        raise web.HTTPRequestEntityTooLarge(max_size=limit, actual_size=request.content_length)
+    if not request.content_type.startswith("multipart/"):
+        raise TranscriptionError("No file uploaded", "NO_FILE", 400)
+
+    fields, files = {}, []
+    received = 0
+    started = time.perf_counter()
+    reader = await request.multipart()
+    async for part in reader:
+        if part.filename is None:
+            fields[part.name] = await part.text()
+            continue
+        buffer, digest = api.spool_upload(), hashlib.sha256()
+        while True:
+            block = await part.read_chunk(UPLOAD_BLOCK_BYTES)
+            if not block:
+                break
+            received += len(block)
+            if received > limit:
+                raise web.HTTPRequestEntityTooLarge(max_size=limit, actual_size=received)
+            buffer.write(block)
+            digest.update(block)
+        buffer.seek(0)
+        files.append((part.name, part.filename, buffer, digest.hexdigest()))
+    api.upload_seconds.observe(time.perf_counter() - started)
+    return fields, files
+
+async def read_upload(request):
+    """Validate a single-file transcription request; returns (run_transcription options, digest)
+
+    Raises Overloaded without reading the body if the server is at a load limit.
+    """
+    request.app[admission_key].check()
+    fields, files = await read_form(request)
+    upload = next((item for item in files if item[0] == 'file'), None)
+    if upload is None:
+        raise TranscriptionError("No file uploaded", "NO_FILE", 400)
+    _, filename, buffer, digest = upload
+    options = api.parse_transcription_options(fields, request.headers)
+    options.update(upload=buffer, filename=filename, audio=api.inspect_audio(buffer, filename))
+    return options, digest
+
+def submit_transcription(request, options, digest=None, decode=None, on_event=None, work=None):
+    """Register a job for an upload and drive it on the pipeline; returns (job, joined)
+
+    Identical uploads join the in-flight job when coalescing is on and a
+    digest is given, as in app.submit_transcription. Raises Overloaded if
+    the upload would take the server over a load limit.
+    """
+    metadata = api.job_metadata(options)
+    key = api.coalesce_key(options, digest) if digest and api.app.config['COALESCE_REQUESTS'] else None
+    job, joined = api.admitted(request.app[admission_key], api.transcription_cost(options),
+                               lambda: api.jobs.admit(key, **metadata))
+    if joined:
+        return job, True
+
+    pipeline = request.app[pipeline_key]
+    work = work or (lambda job: pipeline.run(job, options, on_event, decode))
+
+    async def drive():
+        try:
+            await execute_job_async(job, work)
+        finally:
+            api.jobs.finish(job)
+
+    spawn(request.app, drive())
+    return job, False
+
+async def home(request):
+    """API documentation page (the same page app.py serves)"""
+    with api.app.app_context():
+        html = api.home()
+    return web.Response(text=html, content_type="text/html")
+
+async def metrics_endpoint(request):
+    """Prometheus scrape endpoint"""
+    return web.Response(body=api.metrics.render().encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+async def health_check(request):
+    """Health check endpoint, plus the pipeline's stage occupancy and this server's admission control"""
+    return web.json_response(dict(api.health_status(), server="asyncio",
+                                  pipeline=request.app[pipeline_key].stats(),
+                                  admission=request.app[admission_key].stats()))
+
+async def transcribe_audio(request):
+    """Main transcription endpoint (waits for its job without holding a thread)"""
+    try:
+        options, digest = await read_upload(request)
+        job, joined = submit_transcription(request, options, digest)
+        if joined:
+            api.coalesced_requests.inc(endpoint='transcribe_audio')
+        await wait_for_job(job)
+        api.jobs.discard(job.id)
+
+        if job.status == COMPLETED:
+            response = dict(success=True, **job.result)
+            if joined:
+                response.update(filename=secure_filename(options["filename"]), coalesced=True)
+            return web.json_response(response)
+        return job_error_response(job)
+
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+
+async def transcribe_stream(request):
+    """Transcription endpoint that streams progress events and segments as they happen
+
+    Sends NDJSON by default, or Server-Sent Events when the client accepts
+    text/event-stream (or passes ?format=sse).
+    """
+    accept = request.headers.get("Accept", "")
+    sse = request.query.get('format') == 'sse' or ("text/event-stream" in accept
+                                                   and "application/x-ndjson" not in accept)
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    pipeline = request.app[pipeline_key]
+
+    def emit(name, data):
+        events.put_nowait((name, data))
+
+    def emit_threadsafe(name, data):
+        loop.call_soon_threadsafe(emit, name, data)
+
+    async def work(job):
+        try:
+            result = await pipeline.run(job, options, on_event=emit_threadsafe)
+            emit("result", dict(success=True, **result))
+            return result
+        except TranscriptionError as e:
+            emit("error", {"success": False, "error": str(e), "code": e.code})
+            raise
+        except Exception as e:
+            emit("error", {"success": False, "error": f"Internal server error: {str(e)}", "code": "INTERNAL_ERROR"})
+            raise
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, None)  # after any events still in flight
+
+    try:
+        options, _ = await read_upload(request)
+        received = {"filename": secure_filename(options["filename"]), "bytes": api.upload_size(options["upload"]),
+                    "audio": options["audio"].to_dict() if options["audio"] else None}
+        job, _ = submit_transcription(request, options, work=work)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+
+    response = web.StreamResponse(headers=dict(CORS_HEADERS, **{
+        "Content-Type": "text/event-stream" if sse else "application/x-ndjson",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    }))
+    await response.prepare(request)
+    await response.write(api.format_event("received", dict(received, job_id=job.id), sse).encode("utf-8"))
+    while True:
+        event = await events.get()
+        if event is None:
+            break
+        await response.write(api.format_event(event[0], event[1], sse).encode("utf-8"))
+    api.jobs.discard(job.id)
+    await response.write_eof()
+    return response
+
+async def transcribe_batch(request):
+    """Transcribe many uploaded files concurrently in one request"""
+    started = time.perf_counter()
+    admission = request.app[admission_key]
+    try:
+        admission.check()
+        fields, files = await read_form(request)
+        files = [item for item in files if item[0] in ('files', 'file')]
+        if not files:
+            raise TranscriptionError("No files uploaded", "NO_FILE", 400)
+        if len(files) > api.app.config['MAX_BATCH_FILES']:
+            raise TranscriptionError(
+                f"Too many files. Maximum per batch is {api.app.config['MAX_BATCH_FILES']}",
+                "TOO_MANY_FILES", 400
+            )
+        options = api.parse_transcription_options(fields, request.headers)
+        parallelism = min(api.parse_parallelism(fields), len(files))
+        ticket = admission.admit(sum(job_cost(size=api.upload_size(buffer)) for _, _, buffer, _ in files))
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    pipeline = request.app[pipeline_key]
+    slots = asyncio.Semaphore(parallelism)
+
+    # A bad file fails its own entry, not the whole batch
+    def work(filename, buffer):
+        async def run(job):
+            async with slots:
+                audio = api.inspect_audio(buffer, filename)
+                return await pipeline.run(job, dict(options, upload=buffer, filename=filename, audio=audio))
+        return run
+
+    batch = [Job(str(index), {"filename": secure_filename(filename)}) for index, (_, filename, _, _) in enumerate(files)]
+    try:
+        await asyncio.gather(*(execute_job_async(job, work(filename, buffer))
+                               for job, (_, filename, buffer, _) in zip(batch, files)))
+    finally:
+        ticket.release()
+
+    results = [api.batch_entry(index, job) for index, job in enumerate(batch)]
+    successful = sum(1 for entry in results if entry["success"])
+    return web.json_response({
+        "success": True,
+        "results": results,
+        "summary": {
+            "total": len(results),
+            "successful": successful,
+            "failed": len(results) - successful,
+            "parallelism": parallelism,
+            "processing_time": round(time.perf_counter() - started, 3)
+        }
+    })
+
+async def create_job(request):
+    """Queue a transcription and return its job id right away"""
+    try:
+        options, digest = await read_upload(request)
+        job, joined = submit_transcription(request, options, digest)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+
+    response = {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}"
+    }
+    if joined:
+        api.coalesced_requests.inc(endpoint='create_job')
+        response["coalesced"] = True
+    return web.json_response(response, status=202)
+
+async def get_job(request):
+    """Status, progress and (once finished) result of a background job"""
+    job = api.jobs.get(request.match_info['job_id'])
+    if job is None:
+        return error_response("Job not found or expired", "JOB_NOT_FOUND", 404)
+    return web.json_response(dict(success=True, **job.to_dict()))
+
+def upload_status(session, status=200):
+    """Session state as JSON, with the offset also in the Upload-Offset header"""
+    return web.json_response(dict(success=True, upload_url=f"/uploads/{session.id}", **session.to_dict()),
+                             status=status, headers={"Upload-Offset": str(session.offset)})
+
+def find_upload(request):
+    session = api.uploads.get(request.match_info['upload_id'])
+    if session is None:
+        raise TranscriptionError("Upload not found or expired", "UPLOAD_NOT_FOUND", 404)
+    return session
+
+async def create_upload(request):
+    """Start a resumable chunked upload"""
+    try:
+        request.app[admission_key].check()
+        if request.content_type == "application/json":
+            fields = await request.json()
+        else:
+            fields = await request.post()
+        session = await request.app[pipeline_key].decode(api.open_upload_session, fields, request.headers)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except ValueError:
+        return error_response("Request body is not valid JSON", "INVALID_UPLOAD", 400)
+    return upload_status(session, 201)
+
+async def upload_session(request):
+    """Current offset of an upload (HEAD returns just the Upload-Offset header)"""
+    try:
+        return upload_status(find_upload(request))
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+
+async def append_upload(request):
+    """Append the request body at the offset given in the Upload-Offset header
+
+    The chunk is read in full before it is written, so a chunk cut short by
+    a dropped connection is discarded and resent whole.
+    """
+    try:
+        session = find_upload(request)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    try:
+        offset = int(request.headers.get('Upload-Offset', request.query.get('offset', '')))
+    except ValueError:
+        return error_response("Upload-Offset header is required", "INVALID_UPLOAD", 400)
+    chunk = await request.read()
+    try:
+        await request.app[pipeline_key].decode(api.uploads.append, session, offset, io.BytesIO(chunk))
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status, headers={"Upload-Offset": str(session.offset)})
+    return upload_status(session)
+
+async def delete_upload(request):
+    """Abandon an upload and delete what was received"""
+    try:
+        session = find_upload(request)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    await request.app[pipeline_key].decode(api.uploads.discard, session)
+    return web.json_response({"success": True, "upload_id": session.id, "deleted": True})
+
+async def finalize_upload(request):
+    """Finish an upload and transcribe it as a background job (?wait=1 waits like /transcribe)"""
+    try:
+        session = find_upload(request)
+        request.app[admission_key].check()
+        decode, audio = await request.app[pipeline_key].decode(api.finish_upload, session)
+    except TranscriptionError as e:
+        return error_response(str(e), e.code, e.status)
+    except Overloaded as e:
+        return overloaded_response(e)
+    try:
+        options = dict(session.options, filename=session.filename, audio=audio, size=session.offset)
+        job, _ = submit_transcription(request, options, decode=lambda: decode(
+            api.app.config['AUDIO_SAMPLE_RATE'], api.app.config['AUDIO_SAMPLE_WIDTH']))
+    except Overloaded as e:
+        api.uploads.reopen(session)
+        return overloaded_response(e)
+    except JobQueueFull as e:
+        api.uploads.reopen(session)
+        return error_response(f"Server busy: {e}", "QUEUE_FULL", 503)
+    job.add_done_callback(lambda job: api.uploads.discard(session))
+
+    if request.query.get('wait', '').lower() in ('1', 'true', 'yes'):
+        await wait_for_job(job)
+        api.jobs.discard(job.id)
+        if job.status == COMPLETED:
+            return web.json_response(dict(success=True, **job.result))
+        return job_error_response(job)
+
+    return web.json_response({
+        "success": True,
+        "upload_id": session.id,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}"
+    }, status=202)
+
+@web.middleware
+async def cors(request, handler):
+    """Answer CORS preflights and allow any origin, as flask_cors does for app.py"""
+    if request.method == "OPTIONS":
+        return web.Response(headers=CORS_PREFLIGHT_HEADERS)
+    response = await handler(request)
+    if not response.prepared:
+        response.headers.update(CORS_HEADERS)
+    return response
+
+@web.middleware
+async def request_metrics(request, handler):
+    """Request latency and in-flight metrics by route, plus JSON bodies for HTTP errors"""
+    resource = request.match_info.route.resource
+    endpoint = resource.canonical if resource is not None else "unmatched"
+    started = time.perf_counter()
+    api.requests_in_flight.inc(endpoint=endpoint)
+    try:
+        response = await handler(request)
+    except web.HTTPRequestEntityTooLarge:
+        response = error_response(f"File too large. Maximum size is "
+                                  f"{api.app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)}MB.", "FILE_TOO_LARGE", 413)
+    except web.HTTPNotFound:
+        response = error_response("Endpoint not found", "NOT_FOUND", 404)
+    except web.HTTPException:
+        raise
+    except ConnectionResetError:
+        response = web.Response(status=400)  # client went away mid-upload; nobody reads this, as with Werkzeug
+    except Exception as e:
+        api.app.logger.error(f"Transcription error: {str(e)}\n{traceback.format_exc()}")
+        response = error_response(f"Internal server error: {str(e)}", "INTERNAL_ERROR", 500)
+    finally:
+        api.requests_in_flight.dec(endpoint=endpoint)
+    api.request_seconds.observe(time.perf_counter() - started, endpoint=endpoint, status=response.status)
+    return response
+
+def create_app(decode_concurrency=None, recognize_concurrency=None):
+    """Build the aiohttp application
+
+    ASYNC_DECODE_CONCURRENCY     uploads decoded at once (default: CPU count)
+    ASYNC_RECOGNIZE_CONCURRENCY  transcriptions in the recognition stage at once (default 16)
+    """
+    app = web.Application(middlewares=[cors, request_metrics], client_max_size=api.app.config['MAX_CONTENT_LENGTH'])
+    pipeline = app[pipeline_key] = TranscriptionPipeline(
+        decode_concurrency or int(os.environ.get("ASYNC_DECODE_CONCURRENCY", DEFAULT_DECODE_CONCURRENCY)),
+        recognize_concurrency or int(os.environ.get("ASYNC_RECOGNIZE_CONCURRENCY", DEFAULT_RECOGNIZE_CONCURRENCY)),
+    )
+    # Admission control as in app.py, with the decode queue being this pipeline's
+    app[admission_key] = create_admission_controller(decode_queue_depth=lambda: pipeline.waiting["decode"],
+                                                     recognizer_calls=lambda: api.converter.backend.in_flight)
+    app[tasks_key] = set()
+    app.router.add_get('/', home)
+    app.router.add_get('/metrics', metrics_endpoint)
+    app.router.add_get('/health', health_check)
+    app.router.add_post('/transcribe', transcribe_audio)
+    app.router.add_post('/transcribe/stream', transcribe_stream)
+    app.router.add_post('/transcribe/batch', transcribe_batch)
+    app.router.add_post('/jobs', create_job)
+    app.router.add_get('/jobs/{job_id}', get_job)
+    app.router.add_post('/uploads', create_upload)
+    app.router.add_get('/uploads/{upload_id}', upload_session)
+    app.router.add_patch('/uploads/{upload_id}', append_upload)
+    app.router.add_delete('/uploads/{upload_id}', delete_upload)
+    app.router.add_post('/uploads/{upload_id}/finalize', finalize_upload)
+
+    async def shutdown(app):
+        app[pipeline_key].shutdown()
+    app.on_cleanup.append(shutdown)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio-to-Text REST API on asyncio (aiohttp)")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=5000, help="Port (default: 5000)")
+    args = parser.parse_args()
+
+    print("🎤 Starting Audio-to-Text REST API (asyncio)...")
+    print(f"📊 API Documentation: http://localhost:{args.port}")
+    print(f"🔗 Health Check: http://localhost:{args.port}/health")
+    print(f"📤 Upload Endpoint: http://localhost:{args.port}/transcribe")
+    print("-" * 50)
+    web.run_app(create_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Silence-Aware Chunking
+Splits long recordings at pauses into bounded-length chunks
+Transcribes the chunks concurrently and stitches them back together in order
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import speech_recognition as sr
+from voice_activity import FRAME_MS, frame_rms
+
+DEFAULT_CHUNK_SECONDS = 30.0
+DEFAULT_CHUNK_WORKERS = 4
+
+MIN_CHUNK_FRACTION = 0.5   # never cut before half of the target chunk length
+SILENCE_BELOW_DB = 16      # frames this far below the average level count as silence
+
+class AudioChunk:
+    """A slice of a recording with its position in the original"""
+
+    def __init__(self, index, start, end, audio_data):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.audio_data = audio_data
+
+def audio_duration(audio_data):
+    """Length of sr.AudioData in seconds"""
+    return len(audio_data.frame_data) / float(audio_data.sample_rate * audio_data.sample_width)
+
+def choose_cut(levels, first, last, threshold):
+    """Pick the frame to cut at between first and last (inclusive)
+
+    Prefers the middle of the longest silent run; falls back to the quietest
+    frame when the window has no silence at all.
+    """
+    best_run = None  # (length, start)
+    run_start = None
+    for i in range(first, last + 1):
+        if levels[i] <= threshold:
+            if run_start is None:
+                run_start = i
+            length = i - run_start + 1
+            if best_run is None or length >= best_run[0]:
+                best_run = (length, run_start)
+        else:
+            run_start = None
+
+    if best_run is not None:
+        length, start = best_run
+        return start + length // 2
+    return min(range(first, last + 1), key=lambda i: levels[i])
+
+def split_on_silence(audio_data, max_chunk_seconds=DEFAULT_CHUNK_SECONDS):
+    """Split sr.AudioData into chunks of at most max_chunk_seconds, cutting at pauses"""
+    duration = audio_duration(audio_data)
+    if not max_chunk_seconds or duration <= max_chunk_seconds:
+        return [AudioChunk(0, 0.0, duration, audio_data)]
+
+    levels = frame_rms(audio_data).tolist()  # a list: choose_cut walks it frame by frame
+    average = sum(levels) / len(levels) if levels else 0
+    threshold = average * 10 ** (-SILENCE_BELOW_DB / 20.0)
+
+    frame_seconds = FRAME_MS / 1000.0
+    max_frames = max(1, int(max_chunk_seconds / frame_seconds))
+    min_frames = max(1, int(max_frames * MIN_CHUNK_FRACTION))
+
+    cuts = []
+    cursor = 0
+    while len(levels) - cursor > max_frames:
+        cut = choose_cut(levels, cursor + min_frames, cursor + max_frames - 1, threshold)
+        cuts.append(cut)
+        cursor = cut
+
+    # Convert frame cuts to byte offsets aligned to whole samples
+    frame_bytes = int(audio_data.sample_rate * frame_seconds) * audio_data.sample_width
+    bounds = [0] + [cut * frame_bytes for cut in cuts] + [len(audio_data.frame_data)]
+    bytes_per_second = float(audio_data.sample_rate * audio_data.sample_width)
+
+    chunks = []
+    for index, (start, end) in enumerate(zip(bounds, bounds[1:])):
+        chunk_audio = sr.AudioData(audio_data.frame_data[start:end], audio_data.sample_rate,
+                                   audio_data.sample_width)
+        chunks.append(AudioChunk(index, start / bytes_per_second, end / bytes_per_second, chunk_audio))
+    return chunks
+
+def transcribe_in_chunks(audio_data, transcribe_chunk, max_chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                         workers=DEFAULT_CHUNK_WORKERS, on_segment=None, on_progress=None):
+    """Split audio at silences and transcribe the chunks on a bounded thread pool
+
+    transcribe_chunk(audio_data) returns {"text", "language", ...} or None and
+    may raise; a failing chunk is recorded with its error instead of
+    aborting the others. on_segment, if given, is called with each segment
+    as soon as it is recognized (completion order); on_progress, if given,
+    is called with (finished, total) chunk counts.
+
+    Returns {"text", "language", "segments"} with segments in audio order.
+    """
+    chunks = split_on_silence(audio_data, max_chunk_seconds)
+    segments = [None] * len(chunks)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks))),
+                            thread_name_prefix="chunk") as executor:
+        futures = {executor.submit(transcribe_chunk, chunk.audio_data): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            error = None
+            try:
+                result = future.result()
+            except Exception as e:
+                result, error = None, str(e)
+
+            segment = {
+                "index": chunk.index,
+                "start": round(chunk.start, 3),
+                "end": round(chunk.end, 3),
+                "text": result["text"] if result else None,
+                "language": result["language"] if result else None,
+                "error": error,
+            }
+            segments[chunk.index] = segment
+            if on_segment:
+                on_segment(segment)
+            if on_progress:
+                on_progress(sum(1 for s in segments if s is not None), len(segments))
+
+    languages = Counter(segment["language"] for segment in segments if segment["language"])
+    return {
+        "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+        "language": languages.most_common(1)[0][0] if languages else None,
+        "segments": segments,
+    }
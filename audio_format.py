@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Audio Container Sniffing
+Identifies an audio file from its leading bytes instead of its extension (RIFF/WAVE, fLaC, FORM/AIFF, OggS, ID3/MPEG, ftyp, ADTS)
+Reads sample rate, channel count and duration from the header, so they are known before any decoding
+"""
+
+import os
+import struct
+
+# Enough for every header parsed here, including an MP3's Xing frame after a modest ID3 tag
+HEADER_BYTES = 64 * 1024
+
+# Containers audio_io reads without ffmpeg or PyAV (plain PCM)
+NATIVE_CONTAINERS = {"wav", "aiff"}
+
+# Containers with their usual extensions, for reporting a mislabeled upload
+CONTAINER_EXTENSIONS = {
+    "wav": (".wav", ".wave"),
+    "flac": (".flac",),
+    "aiff": (".aiff", ".aif", ".aifc"),
+    "ogg": (".ogg", ".oga", ".opus"),
+    "mp3": (".mp3",),
+    "mp4": (".m4a", ".mp4", ".aac"),
+    "aac": (".aac",),
+}
+
+MPEG_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+MPEG_BITRATES = {  # kbit/s by (MPEG-1?, layer)
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MPEG_BITRATES[(False, 3)] = MPEG_BITRATES[(False, 2)]
+ADTS_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350)
+
+class AudioInfo:
+    """What an audio file's header says about it; fields the header does not carry are None
+
+    data_offset and data_size locate the raw PCM of native containers.
+    """
+
+    def __init__(self, container, codec=None, sample_rate=None, channels=None, sample_width=None, duration=None,
+                 data_offset=None, data_size=None, big_endian=False):
+        self.container = container
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.duration = duration
+        self.data_offset = data_offset
+        self.data_size = data_size
+        self.big_endian = big_endian
+
+    @property
+    def native(self):
+        """True when audio_io can read the PCM itself"""
+        return (self.container in NATIVE_CONTAINERS and self.codec == "pcm" and self.sample_width in (1, 2, 3, 4)
+                and bool(self.sample_rate) and bool(self.channels))
+
+    def to_dict(self):
+        return {
+            "container": self.container,
+            "codec": self.codec,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+        }
+
+class ByteSource:
+    """Random access to a path, a bytes-like object or a seekable stream, leaving a stream where it was"""
+
+    def __init__(self, source):
+        self._file = None
+        self._buffer = None
+        self._stream = None
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, "rb")
+            self.size = os.fstat(self._file.fileno()).st_size
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self._buffer = memoryview(source)
+            self.size = len(self._buffer)
+        elif hasattr(source, "getbuffer"):
+            self._buffer = source.getbuffer()
+            self.size = len(self._buffer)
+        else:
+            self._stream = source
+            self._start = source.tell()
+            self.size = source.seek(0, os.SEEK_END) - self._start
+            source.seek(self._start)
+
+    def read_at(self, offset, size):
+        if offset < 0 or offset >= self.size:
+            return b""
+        if self._buffer is not None:
+            return bytes(self._buffer[offset:offset + size])
+        handle = self._file or self._stream
+        base = 0 if self._file else self._start
+        handle.seek(base + offset)
+        return handle.read(size)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._stream is not None:
+            self._stream.seek(self._start)
+        if self._buffer is not None:
+            self._buffer.release()
+
+def skip_id3(header):
+    """Length of a leading ID3v2 tag (0 when there is none)"""
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)  # syncsafe integer
+    return 10 + size + (10 if header[5] & 0x10 else 0)
+
+def sniff_container(header):
+    """Container name from a file's leading bytes, or None when it is not a recognized audio format
+
+    A leading ID3 tag is skipped only when enough of the header follows it.
+    """
+    if header[:4] in (b"RIFF", b"RF64") and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    tag = skip_id3(header)
+    if tag:
+        return sniff_container(header[tag:]) or "mp3"  # ID3 tags precede MP3, sometimes FLAC or AAC
+    if len(header) >= 2 and header[0] == 0xFF:
+        if header[1] & 0xF6 == 0xF0:  # 12-bit sync, layer 00
+            return "aac"
+        if header[1] & 0xE0 == 0xE0 and (header[1] >> 1) & 3 and (header[1] >> 3) & 3 != 1:
+            return "mp3"
+    return None
+
+def probe_audio(source, filename=None):
+    """Sniff a path or stream and parse its header; returns AudioInfo, or None for unrecognized or unreadable input
+
+    Streams must be seekable and are left at their current position.
+    Non-seekable streams are not probed (None).
+    """
+    if not isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)) and not hasattr(source, "getbuffer"):
+        if not (hasattr(source, "seekable") and source.seekable()):
+            return None
+    try:
+        data = ByteSource(source)
+    except OSError:
+        return None
+    try:
+        header = data.read_at(0, HEADER_BYTES)
+        container = sniff_container(header)
+        if container is None:
+            return None
+        parse = PARSERS[container]
+        try:
+            return parse(data, header)
+        except (struct.error, IndexError, KeyError, ValueError, ZeroDivisionError):
+            return AudioInfo(container)  # recognized, but the header is damaged
+    finally:
+        data.close()
+
+def parse_wav(data, header):
+    info = AudioInfo("wav")
+    offset = 12
+    while offset + 8 <= data.size:
+        chunk = data.read_at(offset, 8)
+        chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:8])[0]
+        if chunk_id == b"fmt ":
+            tag, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", data.read_at(offset + 8, 16))
+            if tag == 0xFFFE:  # WAVE_FORMAT_EXTENSIBLE: the real tag leads the subformat GUID
+                tag = struct.unpack("<H", data.read_at(offset + 32, 2))[0]
+            info.codec = {1: "pcm", 3: "float", 6: "alaw", 7: "ulaw"}.get(tag, f"0x{tag:04x}")
+            info.sample_rate, info.channels, info.sample_width = sample_rate, channels, (bits + 7) // 8
+            block_align = block_align or channels * info.sample_width
+        elif chunk_id == b"data":
+            info.data_offset = offset + 8
+            # Streamed and RF64 files carry a placeholder size; trust the file length instead
+            available = data.size - info.data_offset
+            info.data_size = available if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, available)
+            if info.sample_rate:
+                info.duration = info.data_size / (block_align * info.sample_rate)
+            return info
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return info
+
+def parse_flac(data, header):
+    info = AudioInfo("flac", codec="flac")
+    # STREAMINFO is always the first metadata block: 18 bytes in, rate(20) channels-1(3) bits-1(5) samples(36)
+    packed = int.from_bytes(header[18:26], "big")
+    info.sample_rate = packed >> 44
+    info.channels = ((packed >> 41) & 0x7) + 1
+    info.sample_width = (((packed >> 36) & 0x1F) + 1 + 7) // 8
+    total_samples = packed & 0xFFFFFFFFF
+    if total_samples and info.sample_rate:
+        info.duration = total_samples / info.sample_rate
+    return info
+
+def extended_float(raw):
+    """80-bit IEEE 754 extended precision (AIFF sample rates)"""
+    exponent = struct.unpack(">H", raw[:2])[0]
+    mantissa = int.from_bytes(raw[2:10], "big")
+    sign = -1 if exponent & 0x8000 else 1
+    exponent &= 0x7FFF
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    return sign * mantissa * 2.0 ** (exponent - 16383 - 63)
+
+def parse_aiff(data, header):
+    info = AudioInfo("aiff", big_endian=True)
+    aifc = header[8:12] == b"AIFC"
+    frames = None
+    offset = 12
+    while offset + 8 <= data.size:
+        chunk = data.read_at(offset, 8)
+        chunk_id, chunk_size = chunk[:4], struct.unpack(">I", chunk[4:8])[0]
+        if chunk_id == b"COMM":
+            comm = data.read_at(offset + 8, min(chunk_size, 64))
+            info.channels, frames, bits = struct.unpack(">hIh", comm[:8])
+            info.sample_rate = int(extended_float(comm[8:18]))
+            info.sample_width = (bits + 7) // 8
+            compression = comm[18:22] if aifc else b"NONE"
+            info.codec = {b"NONE": "pcm", b"twos": "pcm", b"sowt": "pcm"}.get(compression,
+                                                                            compression.decode("latin-1").strip())
+            info.big_endian = compression != b"sowt"
+        elif chunk_id == b"SSND":
+            data_offset = struct.unpack(">I", data.read_at(offset + 8, 4))[0]
+            info.data_offset = offset + 16 + data_offset
+            available = data.size - info.data_offset
+            if chunk_size == 0:  # written to a pipe: sizes never filled in, the audio runs to the end
+                info.data_size = available
+                break
+            info.data_size = min(chunk_size - 8 - data_offset, available)
+        offset += 8 + chunk_size + (chunk_size & 1)
+
+    block = (info.channels or 0) * (info.sample_width or 0)
+    if frames and info.data_size is not None and block:
+        info.data_size = min(info.data_size, frames * block)
+    elif info.data_size is not None and block:
+        frames = info.data_size // block
+    if frames and info.sample_rate:
+        info.duration = frames / info.sample_rate
+    return info
+
+def parse_ogg(data, header):
+    info = AudioInfo("ogg")
+    # The first page carries one packet: the codec identification header
+    packet = header[27 + header[26]:]
+    pre_skip = 0
+    if packet[:7] == b"\x01vorbis":
+        info.codec = "vorbis"
+        info.channels, info.sample_rate = struct.unpack("<BI", packet[11:16])
+    elif packet[:8] == b"OpusHead":
+        info.codec = "opus"
+        info.channels, pre_skip = struct.unpack("<BH", packet[9:12])
+        info.sample_rate = 48000  # Opus granules count at 48 kHz whatever the input rate
+    elif packet[:5] == b"\x7fFLAC":
+        info.codec = "flac"
+        streaminfo = parse_flac(None, packet[9:])
+        info.sample_rate, info.channels = streaminfo.sample_rate, streaminfo.channels
+    else:
+        return info
+
+    # The last page's granule position is the stream length in samples
+    tail_offset = max(0, data.size - HEADER_BYTES)
+    tail = data.read_at(tail_offset, HEADER_BYTES)
+    last = tail.rfind(b"OggS")
+    if last >= 0 and info.sample_rate and last + 14 <= len(tail):
+        granule = struct.unpack("<q", tail[last + 6:last + 14])[0]
+        if granule > 0:
+            info.duration = max(0, granule - pre_skip) / info.sample_rate
+    return info
+
+def parse_mp3(data, header):
+    info = AudioInfo("mp3", codec="mp3")
+    start = skip_id3(header)
+    frame = data.read_at(start, 4 + 36 + 16)
+    if len(frame) < 4 or frame[0] != 0xFF or frame[1] & 0xE0 != 0xE0:
+        return info  # tag not followed by a frame header (or a FLAC/AAC payload sniffing missed)
+    version = (frame[1] >> 3) & 3
+    if version == 1 or not (frame[1] >> 1) & 3:
+        return info  # reserved MPEG version or layer: the tag is followed by something else
+    layer = 4 - ((frame[1] >> 1) & 3)
+    mpeg1 = version == 3
+    bitrate = MPEG_BITRATES[(mpeg1, layer)][frame[2] >> 4] * 1000
+    info.sample_rate = MPEG_SAMPLE_RATES[version][(frame[2] >> 2) & 3]
+    info.channels = 1 if frame[3] >> 6 == 3 else 2
+    info.sample_width = 2
+    samples_per_frame = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+
+    # A Xing/Info or VBRI header holds the exact frame count; otherwise estimate from a constant bitrate
+    side_info = (32 if info.channels == 2 else 17) if mpeg1 else (17 if info.channels == 2 else 9)
+    xing = frame[4 + side_info:4 + side_info + 12]
+    frames = None
+    if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 1:
+        frames = struct.unpack(">I", xing[8:12])[0]
+    elif frame[36:40] == b"VBRI":
+        frames = struct.unpack(">I", frame[50:54])[0]
+    if frames:
+        info.duration = frames * samples_per_frame / info.sample_rate
+    elif bitrate:
+        info.duration = (data.size - start) * 8 / bitrate
+    return info
+
+def mp4_boxes(data, offset, end):
+    """Yield (type, payload offset, payload end) for the boxes between offset and end"""
+    while offset + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data.read_at(offset, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data.read_at(offset + 8, 8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+def parse_mp4(data, header):
+    info = AudioInfo("mp4")
+    moov = next(((start, end) for kind, start, end in mp4_boxes(data, 0, data.size) if kind == b"moov"), None)
+    if moov is None:
+        return info
+    for kind, start, end in mp4_boxes(data, *moov):
+        if kind != b"trak":
+            continue
+        mdia = next(((s, e) for k, s, e in mp4_boxes(data, start, end) if k == b"mdia"), None)
+        if mdia is None:
+            continue
+        boxes = {k: (s, e) for k, s, e in mp4_boxes(data, *mdia)}
+        if b"hdlr" not in boxes or data.read_at(boxes[b"hdlr"][0] + 8, 4) != b"soun":
+            continue  # not the audio track
+        if b"mdhd" in boxes:
+            mdhd = data.read_at(boxes[b"mdhd"][0], 32)
+            if mdhd[0] == 1:
+                timescale, duration = struct.unpack(">IQ", mdhd[20:32])
+            else:
+                timescale, duration = struct.unpack(">II", mdhd[12:20])
+            if timescale:
+                info.duration = duration / timescale
+        stbl = next(((s, e) for k, s, e in mp4_boxes(data, *boxes.get(b"minf", (0, 0))) if k == b"stbl"), None)
+        stsd = next(((s, e) for k, s, e in mp4_boxes(data, *stbl) if k == b"stsd"), None) if stbl else None
+        if stsd:
+            # stsd: version/flags and entry count, then the first sample entry
+            entry = data.read_at(stsd[0] + 8, 36)
+            info.codec = entry[4:8].decode("latin-1").strip()
+            info.channels, bits = struct.unpack(">HH", entry[24:28])
+            info.sample_rate = struct.unpack(">I", entry[32:36])[0] >> 16
+            info.sample_width = (bits + 7) // 8 or 2
+        return info
+    return info
+
+def parse_aac(data, header):
+    info = AudioInfo("aac", codec="aac")
+    start = skip_id3(header)
+    frame = header[start:start + 7]
+    info.sample_rate = ADTS_SAMPLE_RATES[(frame[2] >> 2) & 0xF]
+    info.channels = ((frame[2] & 1) << 2) | (frame[3] >> 6)
+    info.sample_width = 2
+
+    # Average frame length over the header bytes, extrapolated to the file size
+    offset, frames, blocks = start, 0, 0
+    while offset + 7 <= len(header) and header[offset] == 0xFF and header[offset + 1] & 0xF6 == 0xF0:
+        length = ((header[offset + 3] & 3) << 11) | (header[offset + 4] << 3) | (header[offset + 5] >> 5)
+        if length < 7:
+            break
+        frames += 1
+        blocks += (header[offset + 6] & 3) + 1
+        offset += length
+    if frames and info.sample_rate:
+        seconds_per_byte = blocks * 1024 / info.sample_rate / (offset - start)
+        info.duration = (data.size - start) * seconds_per_byte
+    return info
+
+PARSERS = {
+    "wav": parse_wav,
+    "flac": parse_flac,
+    "aiff": parse_aiff,
+    "ogg": parse_ogg,
+    "mp3": parse_mp3,
+    "mp4": parse_mp4,
+    "aac": parse_aac,
+}
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+In-Memory Audio Decoding
+Turns an uploaded stream or a file path straight into sr.AudioData
+The container is sniffed from the header bytes; PCM WAV and AIFF are read natively, everything else is
+decoded in-process by PyAV when installed, else piped through ffmpeg
+Decoded audio is normalized to mono at a canonical rate and bit depth (16 kHz, 16-bit by default),
+one window at a time so the source PCM is never held whole
+"""
+
+import io
+import os
+import wave
+import struct
+import audioop
+import tempfile
+import itertools
+import threading
+import subprocess
+import speech_recognition as sr
+from pydub import AudioSegment
+from audio_format import ByteSource, probe_audio
+
+try:
+    import av  # optional: libav in-process, no ffmpeg process per file
+except ImportError:
+    av = None
+
+WAV_EXTENSIONS = {'.wav', '.wave'}
+
+# Canonical recognizer format; speech carries next to nothing above 8 kHz
+DEFAULT_SAMPLE_RATE = 16000
+DEFAULT_SAMPLE_WIDTH = 2
+
+# Source PCM decoded and normalized at a time, so memory per decode does not grow with the recording
+DECODE_WINDOW_BYTES = 1024 * 1024
+PIPE_WRITE_BYTES = 64 * 1024
+
+class AudioDecodeError(Exception):
+    """Raised when an audio source cannot be decoded"""
+
+def file_extension(filename):
+    """Lower-case extension of a filename, or '' when there is none"""
+    return os.path.splitext(filename or "")[1].lower()
+
+def downmix(frames, sample_width, channels):
+    """Average interleaved channels down to mono"""
+    if channels == 1:
+        return frames
+    if channels == 2:
+        return audioop.tomono(frames, sample_width, 0.5, 0.5)
+
+    mono = None
+    segment = AudioSegment(data=frames, sample_width=sample_width, frame_rate=1, channels=channels)
+    for channel in segment.split_to_mono():
+        part = audioop.mul(channel.raw_data, sample_width, 1.0 / channels)
+        mono = part if mono is None else audioop.add(mono, part, sample_width)
+    return mono
+
+class DecodedPCM:
+    """Interleaved signed little-endian PCM exactly as the source provided it"""
+
+    def __init__(self, frames, sample_rate, sample_width, channels):
+        self.frames = frames
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+
+class PCMWindows:
+    """Decoded PCM delivered a window at a time: the format up front, then the frames by iteration
+
+    Only the window being handed out is held, so memory does not grow with
+    the length of the recording. close() stops the decoder early.
+    """
+
+    def __init__(self, windows, sample_rate, sample_width, channels):
+        self.windows = windows
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+
+    def __iter__(self):
+        return iter(self.windows)
+
+    def close(self):
+        if hasattr(self.windows, "close"):
+            self.windows.close()
+
+def normalization_target():
+    """Target (sample_rate, sample_width) from AUDIO_SAMPLE_RATE and AUDIO_SAMPLE_WIDTH
+
+    A sample rate of 0 keeps the source rate.
+    """
+    sample_rate = int(os.environ.get("AUDIO_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+    sample_width = int(os.environ.get("AUDIO_SAMPLE_WIDTH", DEFAULT_SAMPLE_WIDTH))
+    if sample_rate and sample_rate < 8000:
+        raise ValueError("AUDIO_SAMPLE_RATE must be 0 (keep source rate) or at least 8000")
+    if sample_width not in (1, 2, 3, 4):
+        raise ValueError("AUDIO_SAMPLE_WIDTH must be 1, 2, 3 or 4 bytes")
+    return sample_rate, sample_width
+
+class PCMNormalizer:
+    """Downmixes, requantizes and resamples PCM window by window into mono sr.AudioData
+
+    sample_rate and sample_width default to normalization_target(); the
+    source rate is kept when the target rate is 0. Audio is only ever
+    downsampled, since upsampling adds bytes without adding information.
+    Windows are cut on frame boundaries and ratecv's state carries across
+    them, so the result is the same as normalizing the whole file at once.
+    """
+
+    def __init__(self, source_rate, source_width, channels, sample_rate=None, sample_width=None):
+        if sample_rate is None or sample_width is None:
+            default_rate, default_width = normalization_target()
+            sample_rate = default_rate if sample_rate is None else sample_rate
+            sample_width = default_width if sample_width is None else sample_width
+        self.source_rate = source_rate
+        self.source_width = source_width
+        self.channels = channels
+        self.sample_width = sample_width
+        self.sample_rate = sample_rate if sample_rate and sample_rate < source_rate else source_rate
+        self.bytes_before = 0
+        self._block = channels * source_width
+        self._remainder = b""
+        self._state = None
+        self._output = io.BytesIO()  # grows in place; getvalue() hands over its buffer without a copy
+
+    def feed(self, data):
+        """Normalize the next piece of interleaved source PCM"""
+        if self._remainder:
+            data = self._remainder + data
+        usable = len(data) - len(data) % self._block
+        self._remainder = bytes(data[usable:])
+        if not usable:
+            return
+        if usable < len(data):
+            data = data[:usable]
+        self.bytes_before += usable
+        frames = downmix(data, self.source_width, self.channels)
+        if self.sample_width != self.source_width:
+            frames = audioop.lin2lin(frames, self.source_width, self.sample_width)
+        if self.sample_rate != self.source_rate:
+            frames, self._state = audioop.ratecv(frames, self.sample_width, 1, self.source_rate, self.sample_rate,
+                                                 self._state)
+        self._output.write(frames)
+
+    def finish(self):
+        """(sr.AudioData, stats) for everything fed; stats as documented on decode_audio_with_stats"""
+        frames = self._output.getvalue()
+        self._output = io.BytesIO()
+        audio_data = sr.AudioData(frames, self.sample_rate, self.sample_width)
+        return audio_data, {
+            "source_sample_rate": self.source_rate,
+            "source_channels": self.channels,
+            "source_sample_width": self.source_width,
+            "sample_rate": audio_data.sample_rate,
+            "sample_width": audio_data.sample_width,
+            "bytes_before": self.bytes_before,
+            "bytes_after": len(frames),
+        }
+
+def normalize_pcm(pcm, sample_rate=None, sample_width=None):
+    """Downmix, requantize and resample decoded PCM (whole, or PCMWindows) into mono sr.AudioData"""
+    return normalized_with_stats(pcm, sample_rate, sample_width)[0]
+
+def normalized_with_stats(pcm, sample_rate=None, sample_width=None):
+    """normalize_pcm plus the stats reported by decode_audio_with_stats"""
+    normalizer = PCMNormalizer(pcm.sample_rate, pcm.sample_width, pcm.channels, sample_rate, sample_width)
+    if isinstance(pcm, PCMWindows):
+        try:
+            for window in pcm:
+                normalizer.feed(window)
+        finally:
+            pcm.close()
+    else:
+        normalizer.feed(pcm.frames)
+    return normalizer.finish()
+
+def read_wav(source):
+    """Read a PCM WAV path or stream with the wave module"""
+    with wave.open(source, "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if sample_width == 1:
+        frames = audioop.bias(frames, 1, -128)  # 8-bit WAV is unsigned, AudioData is signed
+    return DecodedPCM(frames, sample_rate, sample_width, channels)
+
+def try_read_wav(source):
+    """read_wav, or None (with a stream rewound) when the wave module cannot read the input"""
+    start = source.tell() if hasattr(source, "seekable") and source.seekable() else None
+    try:
+        return read_wav(source)
+    except (wave.Error, EOFError, audioop.error):
+        if start is not None:
+            source.seek(start)
+        return None
+
+def native_windows(source, info, window_bytes=DECODE_WINDOW_BYTES):
+    """PCMWindows straight from the data chunk of a PCM WAV or AIFF probed as `info`, or None when it is not one
+
+    Big-endian AIFF samples are byte-swapped and 8-bit WAV is re-biased to
+    signed, so the result matches what ffmpeg would produce.
+    """
+    if info is None or not info.native or info.data_offset is None:
+        return None
+    block = info.channels * info.sample_width
+    window_bytes = max(block, window_bytes - window_bytes % block)
+    end = info.data_offset + info.data_size - info.data_size % block
+
+    def windows():
+        data = ByteSource(source)
+        try:
+            for offset in range(info.data_offset, end, window_bytes):
+                frames = data.read_at(offset, min(window_bytes, end - offset))
+                if not frames:
+                    return
+                if info.big_endian and info.sample_width > 1:
+                    frames = audioop.byteswap(frames, info.sample_width)
+                if info.sample_width == 1 and info.container == "wav":
+                    frames = audioop.bias(frames, 1, -128)  # 8-bit WAV is unsigned, AIFF is already signed
+                yield frames
+        finally:
+            data.close()
+
+    return PCMWindows(windows(), info.sample_rate, info.sample_width, info.channels)
+
+def collect(pcm):
+    """DecodedPCM holding every window of a PCMWindows"""
+    return DecodedPCM(b"".join(pcm), pcm.sample_rate, pcm.sample_width, pcm.channels)
+
+def read_wav_stream_header(stream):
+    """Read a WAV header from a pipe up to the start of its data chunk; returns (sample_rate, channels, sample_width)
+
+    Chunk sizes are not trusted for the data chunk, since ffmpeg writing to
+    a pipe cannot seek back to fill them in.
+    """
+    head = stream.read(12)
+    if len(head) < 12 or head[0:4] != b"RIFF" or head[8:12] != b"WAVE":
+        raise AudioDecodeError("Decoder output is not a WAV stream")
+
+    fmt = None
+    while True:
+        chunk = stream.read(8)
+        if len(chunk) < 8:
+            raise AudioDecodeError("WAV stream has no data chunk")
+        chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:8])[0]
+        if chunk_id == b"data":
+            if fmt is None:
+                raise AudioDecodeError("WAV data chunk before fmt chunk")
+            return fmt
+        body = stream.read(chunk_size + (chunk_size & 1))
+        if chunk_id == b"fmt ":
+            _, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", body)
+            fmt = (sample_rate, channels, bits // 8)
+
+def decoder_engine(engine=None):
+    """Engine for non-WAV input: "pyav" when PyAV is importable, else "ffmpeg"
+
+    AUDIO_DECODER=ffmpeg forces the subprocess path even with PyAV installed.
+    """
+    engine = engine or os.environ.get("AUDIO_DECODER", "auto")
+    if engine not in ("auto", "pyav", "ffmpeg"):
+        raise ValueError("AUDIO_DECODER must be auto, pyav or ffmpeg")
+    if engine == "pyav" and av is None:
+        raise AudioDecodeError("AUDIO_DECODER=pyav but PyAV is not installed")
+    if engine == "auto":
+        return "pyav" if av is not None else "ffmpeg"
+    return engine
+
+def pyav_windows(source, format_hint=None, window_bytes=DECODE_WINDOW_BYTES):
+    """Decode a path or seekable stream in-process with PyAV; PCMWindows of 16-bit PCM at its own rate and layout"""
+    if isinstance(source, (str, os.PathLike)):
+        source = os.fspath(source)
+    try:
+        container = av.open(source, mode="r", format=format_hint)  # spool files look writable to PyAV
+    except av.error.FFmpegError as e:
+        raise AudioDecodeError(f"PyAV failed: {e}")
+    try:
+        if not container.streams.audio:
+            raise AudioDecodeError("No audio stream in the input")
+        frames = container.decode(container.streams.audio[0])
+        first = next(frames, None)
+        if first is None:
+            raise AudioDecodeError("Audio stream has no decodable frames")
+    except av.error.FFmpegError as e:
+        container.close()
+        raise AudioDecodeError(f"PyAV failed: {e}")
+    except AudioDecodeError:
+        container.close()
+        raise
+    sample_rate, channels = first.sample_rate, len(first.layout.channels)
+    resampler = av.AudioResampler(format="s16", layout=first.layout.name, rate=sample_rate)
+
+    def windows():
+        buffer = bytearray()
+        try:
+            for frame in itertools.chain([first], frames, [None]):  # None flushes the resampler
+                for converted in resampler.resample(frame):
+                    buffer += memoryview(converted.planes[0])[:converted.samples * channels * 2]
+                if len(buffer) >= window_bytes:
+                    yield bytes(buffer)
+                    buffer.clear()
+            if buffer:
+                yield bytes(buffer)
+        except av.error.FFmpegError as e:
+            raise AudioDecodeError(f"PyAV failed: {e}")
+        finally:
+            container.close()
+
+    return PCMWindows(windows(), sample_rate, 2, channels)
+
+def read_with_pyav(source, format_hint=None):
+    """Decode a path or seekable stream in-process with PyAV to 16-bit PCM at its own rate and channel count"""
+    return collect(pyav_windows(source, format_hint))
+
+def ffmpeg_input(source):
+    """Build ffmpeg input arguments and the stream to feed its stdin (None for a path)
+
+    Streams are fed over stdin through ffmpeg's cache protocol, so containers
+    that need to seek (such as M4A with a trailing index) still decode.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return ["-i", os.fspath(source)], None
+    return ["-read_ahead_limit", "-1", "-i", "cache:pipe:0"], source
+
+def feed_stdin(pipe, source):
+    """Copy a stream (or a BytesIO's buffer, without copying it whole) into a pipe, then close the pipe"""
+    try:
+        if hasattr(source, "getbuffer"):
+            view = source.getbuffer()
+            try:
+                for offset in range(source.tell(), len(view), PIPE_WRITE_BYTES):
+                    pipe.write(view[offset:offset + PIPE_WRITE_BYTES])
+            finally:
+                view.release()
+        else:
+            for block in iter(lambda: source.read(PIPE_WRITE_BYTES), b""):
+                pipe.write(block)
+    except (BrokenPipeError, ValueError):
+        pass  # ffmpeg gave up on the input; its exit status says why
+    finally:
+        try:
+            pipe.close()
+        except BrokenPipeError:
+            pass
+
+def drain(pipe, buffer):
+    """Read a pipe to its end into a bytearray (or anything with write)"""
+    write = buffer.extend if isinstance(buffer, bytearray) else buffer.write
+    for block in iter(lambda: pipe.read(65536), b""):
+        write(block)
+
+def ffmpeg_error(process, errors):
+    """AudioDecodeError carrying the last line ffmpeg wrote to stderr"""
+    message = bytes(errors).decode("utf-8", errors="replace").strip().splitlines()
+    return AudioDecodeError(f"ffmpeg failed: {message[-1] if message else process.returncode}")
+
+def ffmpeg_windows(source, format_hint=None, window_bytes=DECODE_WINDOW_BYTES):
+    """Decode any ffmpeg-readable path or stream; PCMWindows of 16-bit PCM at its own rate and channel count
+
+    Input is fed to stdin by a thread and PCM read from stdout a window at
+    a time as ffmpeg produces it; nothing touches the disk and neither the
+    whole input nor the whole output is ever copied.
+    """
+    input_args, feed = ffmpeg_input(source)
+    process = start_ffmpeg(input_args, format_hint, stdin=feed is not None)
+    errors = bytearray()
+    threads = [threading.Thread(target=drain, args=(process.stderr, errors), daemon=True)]
+    if feed is not None:
+        threads.append(threading.Thread(target=feed_stdin, args=(process.stdin, feed), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    def finish():
+        process.stdout.close()
+        process.wait()
+        for thread in threads:
+            thread.join()
+
+    try:
+        sample_rate, channels, sample_width = read_wav_stream_header(process.stdout)
+    except AudioDecodeError:
+        finish()
+        if process.returncode != 0:
+            raise ffmpeg_error(process, errors)
+        raise
+
+    def windows():
+        exhausted = False
+        try:
+            block = channels * sample_width
+            size = max(block, window_bytes - window_bytes % block)
+            for frames in iter(lambda: process.stdout.read(size), b""):
+                yield frames
+            exhausted = True
+        finally:
+            if not exhausted and process.poll() is None:
+                process.kill()  # closed early: stop decoding what nobody will read
+            finish()
+        if process.returncode != 0:
+            raise ffmpeg_error(process, errors)
+
+    return PCMWindows(windows(), sample_rate, sample_width, channels)
+
+def read_with_ffmpeg(source, format_hint=None):
+    """Decode any ffmpeg-readable path or stream to 16-bit PCM at its own rate and channel count"""
+    return collect(ffmpeg_windows(source, format_hint))
+
+def start_ffmpeg(input_args, format_hint=None, stdin=True):
+    """Start ffmpeg writing 16-bit PCM WAV (source rate and channels) to stdout"""
+    command = [AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if format_hint:
+        command += ["-f", format_hint]
+    command += input_args
+    command += ["-vn", "-acodec", "pcm_s16le", "-f", "wav", "pipe:1"]
+    try:
+        return subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except OSError as e:
+        raise AudioDecodeError(f"Could not start ffmpeg ({AudioSegment.converter}): {e}")
+
+class IncrementalDecoder:
+    """ffmpeg decode fed piece by piece while the input is still arriving
+
+    feed() passes bytes straight to ffmpeg's stdin and a reader thread
+    spools the PCM it produces (in memory up to DECODE_WINDOW_BYTES, then
+    on disk), so by the time the last piece arrives most of the audio is
+    already decoded. Works for any container ffmpeg can read from a pipe;
+    formats that keep their index at the end simply finish their work in
+    finish().
+    """
+
+    def __init__(self, filename=None):
+        format_hint = {".aac": "aac"}.get(file_extension(filename))
+        self.process = start_ffmpeg(["-read_ahead_limit", "-1", "-i", "cache:pipe:0"], format_hint)
+        self.bytes_fed = 0
+        self._output = tempfile.SpooledTemporaryFile(max_size=DECODE_WINDOW_BYTES)
+        self._errors = bytearray()
+        self._readers = [
+            threading.Thread(target=drain, args=(self.process.stdout, self._output), daemon=True),
+            threading.Thread(target=drain, args=(self.process.stderr, self._errors), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def feed(self, data):
+        """Pass the next piece of the input to ffmpeg"""
+        try:
+            self.process.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            raise AudioDecodeError("ffmpeg stopped accepting input")
+        self.bytes_fed += len(data)
+
+    def finish(self, sample_rate=None, sample_width=None):
+        """Close the input and return (normalized sr.AudioData, stats) like decode_audio_with_stats"""
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+        for reader in self._readers:
+            reader.join()
+        try:
+            if self.process.returncode != 0:
+                raise ffmpeg_error(self.process, self._errors)
+            self._output.seek(0)
+            rate, channels, width = read_wav_stream_header(self._output)
+            windows = iter(lambda: self._output.read(DECODE_WINDOW_BYTES), b"")
+            return normalized_with_stats(PCMWindows(windows, rate, width, channels), sample_rate, sample_width)
+        finally:
+            self._output.close()
+
+    def abort(self):
+        """Stop ffmpeg without waiting for a result"""
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self._output.close()
+
+def decode_windows(source, filename=None, engine=None, info=None, window_bytes=DECODE_WINDOW_BYTES):
+    """Decode an audio file path or binary stream into PCMWindows
+
+    The container comes from the header bytes (info, when the caller has
+    already probed the source, else probe_audio); the filename's extension
+    only decides for input that cannot be sniffed, such as a non-seekable
+    stream. PCM WAV and AIFF are read natively; anything else (FLAC,
+    compressed WAV, other containers) goes to decoder_engine().
+    """
+    if filename is None and isinstance(source, (str, os.PathLike)):
+        filename = os.fspath(source)
+    extension = file_extension(filename)
+    info = info or probe_audio(source)
+
+    pcm = native_windows(source, info, window_bytes)
+    if pcm is not None:
+        return pcm
+    if info is None and extension in WAV_EXTENSIONS:
+        pcm = try_read_wav(source)
+        if pcm is not None:
+            return PCMWindows([pcm.frames], pcm.sample_rate, pcm.sample_width, pcm.channels)
+
+    # Raw ADTS has no container for ffmpeg to probe
+    container = info.container if info else {".aac": "aac"}.get(extension)
+    format_hint = "aac" if container == "aac" else None
+    if decoder_engine(engine) == "pyav" and (isinstance(source, (str, os.PathLike)) or hasattr(source, "seek")):
+        return pyav_windows(source, format_hint, window_bytes)
+    return ffmpeg_windows(source, format_hint, window_bytes)
+
+def decode_pcm(source, filename=None, engine=None, info=None):
+    """Decode an audio file path or binary stream into DecodedPCM, holding the whole source PCM (see decode_windows)"""
+    return collect(decode_windows(source, filename, engine, info))
+
+def decode_audio_with_stats(source, filename=None, sample_rate=None, sample_width=None, info=None, engine=None):
+    """Decode and normalize audio one window at a time; returns (sr.AudioData, stats)
+
+    Peak memory is one window of source PCM plus the normalized output,
+    however long the recording. stats describes the source format and the
+    PCM size before and after normalization, i.e. how much less audio is
+    handed to the recognizer.
+    """
+    return normalized_with_stats(decode_windows(source, filename, engine, info), sample_rate, sample_width)
+
+def decode_audio(source, filename=None, sample_rate=None, sample_width=None):
+    """Decode an audio file path or binary stream into normalized mono sr.AudioData"""
+    return decode_audio_with_stats(source, filename, sample_rate, sample_width)[0]
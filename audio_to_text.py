@@ -11,12 +11,20 @@ import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import speech_recognition as sr
-from pydub import AudioSegment
-import io
+from recognizer_backend import create_backend
+from language_probe import recognize_cached
+from language_priors import create_language_priors
+from transcript_cache import create_cache
+from audio_io import decode_audio
+from audio_chunking import audio_duration, transcribe_in_chunks, DEFAULT_CHUNK_SECONDS
+from voice_activity import prefilter
 
 class AudioFileToTextConverter:
     def __init__(self):
         self.recognizer = sr.Recognizer()
+        self.backend = create_backend()
+        self.cache = create_cache()
+        self.language_priors = create_language_priors()
         
         # Setup GUI
         self.setup_gui()
@@ -61,7 +69,14 @@ class AudioFileToTextConverter:
         
         self.file_label = ttk.Label(file_frame, text="No files selected")
         self.file_label.grid(row=1, column=0, columnspan=2, pady=(10, 0))
-        
+
+        self.chunking_var = tk.BooleanVar(value=True)
+        self.chunk_seconds_var = tk.IntVar(value=int(DEFAULT_CHUNK_SECONDS))
+        ttk.Checkbutton(file_frame, text="Split long recordings at silences (seconds per chunk):",
+                       variable=self.chunking_var).grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
+        ttk.Spinbox(file_frame, from_=5, to=120, increment=5, width=5,
+                   textvariable=self.chunk_seconds_var).grid(row=2, column=1, sticky=tk.W, pady=(10, 0))
+
         # Status section
         self.status_label = ttk.Label(main_frame, text="Ready to process audio files", 
                                      font=('Arial', 10))
@@ -106,12 +121,31 @@ class AudioFileToTextConverter:
             self.status_label.config(text=message)
         self.root.update()
     
+    def chunk_seconds_setting(self):
+        """Chunk length from the chunking controls, 0 when off; None (after telling the user) when invalid
+
+        Called from the button handlers: Tk variables are only read on the main thread.
+        """
+        if not self.chunking_var.get():
+            return 0
+        try:
+            chunk_seconds = self.chunk_seconds_var.get()
+        except tk.TclError:
+            chunk_seconds = None
+        if chunk_seconds is None or chunk_seconds <= 0:
+            messagebox.showerror("Error", "Seconds per chunk must be a positive whole number")
+            return None
+        return chunk_seconds
+
     def process_audio_file(self):
         """Process a single audio file"""
+        chunk_seconds = self.chunk_seconds_setting()
+        if chunk_seconds is None:
+            return
         file_path = filedialog.askopenfilename(
             title="Select Audio File",
             filetypes=[
-                ("Audio Files", "*.wav *.mp3 *.m4a *.flac *.aac *.ogg"),
+                ("Audio Files", "*.wav *.mp3 *.m4a *.flac *.aac *.ogg *.aiff *.aif"),
                 ("WAV Files", "*.wav"),
                 ("MP3 Files", "*.mp3"),
                 ("All Files", "*.*")
@@ -123,16 +157,19 @@ class AudioFileToTextConverter:
             self.update_status("Processing audio file...")
             
             # Process file in a separate thread
-            processing_thread = threading.Thread(target=self.transcribe_file, args=(file_path,))
+            processing_thread = threading.Thread(target=self.transcribe_file, args=(file_path, chunk_seconds))
             processing_thread.daemon = True
             processing_thread.start()
     
     def process_multiple_files(self):
         """Process multiple audio files"""
+        chunk_seconds = self.chunk_seconds_setting()
+        if chunk_seconds is None:
+            return
         file_paths = filedialog.askopenfilenames(
             title="Select Audio Files",
             filetypes=[
-                ("Audio Files", "*.wav *.mp3 *.m4a *.flac *.aac *.ogg"),
+                ("Audio Files", "*.wav *.mp3 *.m4a *.flac *.aac *.ogg *.aiff *.aif"),
                 ("WAV Files", "*.wav"),
                 ("MP3 Files", "*.mp3"),
                 ("All Files", "*.*")
@@ -144,11 +181,12 @@ class AudioFileToTextConverter:
             self.update_status("Processing multiple audio files...")
             
             # Process files in a separate thread
-            processing_thread = threading.Thread(target=self.transcribe_multiple_files, args=(file_paths,))
+            processing_thread = threading.Thread(target=self.transcribe_multiple_files,
+                                                 args=(file_paths, chunk_seconds))
             processing_thread.daemon = True
             processing_thread.start()
     
-    def transcribe_file(self, file_path):
+    def transcribe_file(self, file_path, chunk_seconds=0):
         """Transcribe audio from a single file"""
         try:
             # Convert file to WAV if necessary
@@ -156,7 +194,7 @@ class AudioFileToTextConverter:
             
             if audio_data:
                 language = self.language_var.get()
-                text = self.transcribe_audio(audio_data, language)
+                text = self.transcribe_audio(audio_data, language, chunk_seconds)
                 
                 if text:
                     filename = os.path.basename(file_path)
@@ -176,7 +214,7 @@ class AudioFileToTextConverter:
             self.append_result(f"[File: {filename}]: Error - {str(e)}\n\n")
             self.update_status(f"File processing error: {str(e)}")
     
-    def transcribe_multiple_files(self, file_paths):
+    def transcribe_multiple_files(self, file_paths, chunk_seconds=0):
         """Transcribe multiple audio files"""
         total_files = len(file_paths)
         successful = 0
@@ -190,7 +228,7 @@ class AudioFileToTextConverter:
                 
                 if audio_data:
                     language = self.language_var.get()
-                    text = self.transcribe_audio(audio_data, language)
+                    text = self.transcribe_audio(audio_data, language, chunk_seconds)
                     
                     if text:
                         filename = os.path.basename(file_path)
@@ -215,65 +253,49 @@ class AudioFileToTextConverter:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            # Handle different audio formats
-            if file_path.lower().endswith('.wav'):
-                with sr.AudioFile(file_path) as source:
-                    audio_data = self.recognizer.record(source)
-                return audio_data
-            else:
-                # Convert other formats to WAV using pydub
-                audio = AudioSegment.from_file(file_path)
-                
-                # Convert to WAV format in memory
-                wav_io = io.BytesIO()
-                audio.export(wav_io, format="wav")
-                wav_io.seek(0)
-                
-                # Create temporary WAV file
-                temp_wav = "temp_audio.wav"
-                with open(temp_wav, "wb") as f:
-                    f.write(wav_io.read())
-                
-                # Load with speech_recognition
-                with sr.AudioFile(temp_wav) as source:
-                    audio_data = self.recognizer.record(source)
-                
-                # Clean up temporary file
-                if os.path.exists(temp_wav):
-                    os.remove(temp_wav)
-                
-                return audio_data
+            # WAV is read natively; other formats are piped through ffmpeg in memory
+            return decode_audio(file_path)
                 
         except Exception as e:
             print(f"Error loading audio file: {e}")
             return None
     
-    def transcribe_audio(self, audio_data, language):
-        """Transcribe audio data to text"""
+    def transcribe_audio(self, audio_data, language, chunk_seconds=0):
+        """Transcribe audio data to text, splitting recordings longer than chunk_seconds (0 never)"""
         try:
-            if language == "auto":
-                # Try both languages and return the first successful result
-                for lang in ["en-IN", "hi-IN"]:
-                    try:
-                        text = self.recognizer.recognize_google(audio_data, language=lang)
-                        return f"{text} [Auto-detected: {lang}]"
-                    except sr.UnknownValueError:
-                        continue
-                    except sr.RequestError:
-                        continue
+            # Skip the recognizer for speech-free audio and trim leading/trailing silence
+            audio_data, activity = prefilter(audio_data)
+            if audio_data is None:
+                self.update_status("No speech detected - skipping recognition")
                 return None
+
+            if chunk_seconds and audio_duration(audio_data) > chunk_seconds:
+                # Long recording: cut at pauses and recognize the pieces in parallel
+                self.update_status(f"Splitting long recording into chunks of up to {chunk_seconds}s...")
+                result = transcribe_in_chunks(audio_data, lambda chunk: self.recognize_cached(chunk, language),
+                                              max_chunk_seconds=chunk_seconds)
+                if not result["text"]:
+                    return None
             else:
-                # Use specified language
-                text = self.recognizer.recognize_google(audio_data, language=language)
-                return text
-                
+                result = self.recognize_cached(audio_data, language)
+                if result is None:
+                    return None
+
+            if language == "auto":
+                return f"{result['text']} [Auto-detected: {result['language']}]"
+            return result["text"]
+
         except sr.UnknownValueError:
             return None
         except sr.RequestError as e:
             raise Exception(f"Speech recognition service error: {e}")
         except Exception as e:
             raise Exception(f"Transcription error: {e}")
-    
+
+    def recognize_cached(self, audio_data, language):
+        """Recognize audio through the transcript cache; returns the cached entry or None"""
+        return recognize_cached(self.backend, self.cache, audio_data, language, priors=self.language_priors)
+
     def append_result(self, text):
         """Append text to results area"""
         self.result_text.insert(tk.END, text)
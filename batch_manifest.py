@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Batch Run Manifest
+Append-only JSONL log of per-file transcription results, written as each file finishes
+Lets an interrupted batch run resume by skipping files it already transcribed
+"""
+
+import os
+import json
+import threading
+
+MANIFEST_EXTENSIONS = ('.jsonl', '.ndjson')
+
+def is_manifest_path(path):
+    """True when an output path should be written as a JSONL manifest"""
+    return bool(path) and os.path.splitext(path)[1].lower() in MANIFEST_EXTENSIONS
+
+def file_signature(file_path):
+    """Size and modification time, used to tell whether a recorded file has changed since"""
+    stat = os.stat(file_path)
+    return {"bytes": stat.st_size, "mtime": round(stat.st_mtime, 3)}
+
+class BatchManifest:
+    """JSONL results file opened for appending, one record per processed file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def completed(self):
+        """Successful records already in the manifest, keyed by absolute file path
+
+        A line cut short by a crash is ignored, as are failed records, so
+        those files are attempted again on resume.
+        """
+        done = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("status") == "ok" and record.get("file"):
+                    done[os.path.abspath(record["file"])] = record
+        return done
+
+    def is_done(self, file_path, completed):
+        """True if file_path has a successful record and is unchanged since it was written"""
+        record = completed.get(os.path.abspath(file_path))
+        if record is None:
+            return False
+        try:
+            signature = file_signature(file_path)
+        except OSError:
+            return False
+        return record.get("bytes") == signature["bytes"] and record.get("mtime") == signature["mtime"]
+
+    def open(self):
+        """Open for appending, terminating a partial last line left by an interrupted run"""
+        needs_newline = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(self.path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+        return self
+
+    def append(self, record):
+        """Write one record and flush it, so it survives a crash of the run"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
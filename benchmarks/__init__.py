@@ -0,0 +1,4 @@
+"""
+Benchmarks for the audio-to-text pipeline
+Run from the project root, e.g. python -m benchmarks.bench_connection_reuse
+"""
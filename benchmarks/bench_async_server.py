@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Async Server Benchmark
+Serves the same /transcribe load from app.py (threaded Werkzeug) and async_app.py (aiohttp)
+while slow clients hold connections open, and reports throughput, latency and peak thread count
+"""
+
+import io
+import os
+import sys
+import time
+import wave
+import socket
+import logging
+import asyncio
+import argparse
+import threading
+import statistics
+import subprocess
+from benchmarks.bench_decode_path import make_wav_bytes
+from benchmarks.bench_cli_batch import unique_wav
+
+SLOW_REQUEST_HEAD = (
+    "POST /transcribe HTTP/1.1\r\n"
+    "Host: 127.0.0.1\r\n"
+    "Content-Type: multipart/form-data; boundary=slowclient\r\n"
+    "Content-Length: 10000000\r\n\r\n"
+    "--slowclient\r\n"
+)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_recognizer(latency_ms):
+    """Stand-in recognizer in a child process, so its threads are not counted against the servers"""
+    port = free_port()
+    process = subprocess.Popen([sys.executable, "fake_recognizer_server.py", "--port", str(port),
+                                "--latency-ms", str(latency_ms), "--hindi-share", "0"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}/speech-api/v2/recognize"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("stand-in recognizer did not start")
+
+class ThreadSampler:
+    """Tracks the peak threading.active_count() while running"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def reset(self):
+        self.peak = threading.active_count()
+
+def start_flask(api):
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+def start_aiohttp(async_app, concurrency):
+    from aiohttp import web
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    port = free_port()
+
+    async def start():
+        runner = web.AppRunner(async_app.create_app(recognize_concurrency=concurrency))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        return runner
+
+    runner = asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return f"http://127.0.0.1:{port}", stop
+
+async def hold_slow_client(port, opened, release):
+    """Send the headers and the first bytes of an upload, then trickle a byte a second"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(SLOW_REQUEST_HEAD.encode("ascii"))
+    await writer.drain()
+    opened()
+    try:
+        while not release.is_set():
+            try:
+                await asyncio.wait_for(release.wait(), 1.0)
+            except asyncio.TimeoutError:
+                writer.write(b" ")
+                await writer.drain()
+    finally:
+        writer.close()
+
+async def drive(url, clips, slow_clients):
+    """Open the slow clients, then post every clip at once; returns (latencies, statuses, wall time)"""
+    import aiohttp
+    port = int(url.rsplit(":", 1)[1])
+    release = asyncio.Event()
+    opened = asyncio.Semaphore(0)
+    holders = [asyncio.create_task(hold_slow_client(port, opened.release, release)) for _ in range(slow_clients)]
+    for _ in range(slow_clients):
+        await opened.acquire()
+    await asyncio.sleep(0.5)  # let the server pick every connection up
+
+    latencies, statuses = [], {}
+
+    async def post(session, index, payload):
+        form = aiohttp.FormData()
+        form.add_field("file", payload, filename=f"clip_{index}.wav")
+        form.add_field("language", "en-IN")
+        started = time.perf_counter()
+        async with session.post(f"{url}/transcribe", data=form) as response:
+            await response.read()
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    started = time.perf_counter()
+    timeout = aiohttp.ClientTimeout(total=600)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0), timeout=timeout) as session:
+        await asyncio.gather(*(post(session, index, payload) for index, payload in enumerate(clips)))
+    wall = time.perf_counter() - started
+
+    release.set()
+    await asyncio.gather(*holders, return_exceptions=True)
+    return latencies, statuses, wall
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask vs asyncio server under concurrent and slow uploads")
+    parser.add_argument("--requests", type=int, default=64, help="Concurrent /transcribe requests (default: 64)")
+    parser.add_argument("--slow-clients", type=int, default=500,
+                        help="Connections trickling an upload during the run (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Transcriptions in flight: JOB_WORKERS and ASYNC_RECOGNIZE_CONCURRENCY (default: 16)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Clip length (default: 3)")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Stand-in recognizer latency (default: 300)")
+    parser.add_argument("--servers", nargs="+", default=["flask", "asyncio"], choices=["flask", "asyncio"])
+    args = parser.parse_args()
+
+    recognizer, recognizer_url = start_recognizer(args.latency_ms)
+    # Same settings for both servers; every clip is distinct so the cache and coalescing never help
+    os.environ.update({
+        "RECOGNIZER_URL": recognizer_url,
+        "JOB_WORKERS": str(args.concurrency),
+        "JOB_QUEUE_LIMIT": str(args.requests * 2),
+        "TRANSCRIPT_CACHE_DIR": "",
+        "LANGUAGE_STATS_PATH": "",
+        "COALESCE_REQUESTS": "0",
+    })
+    import app as api
+    import async_app
+    api.app.logger.disabled = True  # the slow clients' disconnects would log a traceback each
+
+    with wave.open(io.BytesIO(make_wav_bytes(args.seconds, sample_rate=44100, channels=2))) as wav:
+        frames = wav.readframes(wav.getnframes())
+    sampler = ThreadSampler()
+
+    print("⚡ Async server benchmark")
+    print(f"   {args.requests} concurrent uploads, {args.slow_clients} slow clients, "
+          f"concurrency {args.concurrency}, recognizer {args.latency_ms:.0f} ms")
+    print("=" * 78)
+    print(f"{'server':>8} {'ok':>5} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'threads':>8} {'peak':>6}")
+    try:
+        for round_index, name in enumerate(args.servers):
+            # Distinct clips per round so the second server gets no help from the in-memory cache
+            offset = round_index * args.requests
+            clips = [unique_wav(frames, offset + index) for index in range(args.requests)]
+            if name == "flask":
+                url, stop = start_flask(api)
+            else:
+                url, stop = start_aiohttp(async_app, args.concurrency)
+            time.sleep(0.2)
+            baseline = threading.active_count()
+            sampler.reset()
+            latencies, statuses, wall = asyncio.run(drive(url, clips, args.slow_clients))
+            peak = sampler.peak
+            stop()
+
+            ok = sum(count for status, count in statuses.items() if status < 500)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(f"{name:>8} {ok:>5} {len(latencies) - ok:>7} {len(latencies) / wall:>8.1f} "
+                  f"{statistics.median(latencies) * 1000:>9.0f} {p95 * 1000:>9.0f} {baseline:>8} {peak:>6}")
+    finally:
+        recognizer.terminate()
+    print("\nEvery slow client holds a Werkzeug thread; on asyncio it is an idle coroutine.")
+
+if __name__ == "__main__":
+    main()
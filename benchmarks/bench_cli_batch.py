@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+CLI Batch Scaling Benchmark
+Runs cli_audio_to_text batch mode over a generated corpus with increasing --workers
+Reports throughput against the offline stand-in recognizer
+"""
+
+import io
+import os
+import time
+import wave
+import argparse
+import tempfile
+import contextlib
+from fake_recognizer_server import start_fake_server
+from cli_audio_to_text import AudioFileToTextConverter
+from benchmarks.bench_decode_path import make_wav_bytes, encode_with_ffmpeg
+
+def unique_wav(frames, index):
+    """Stereo 44.1 kHz WAV of frames delayed by index+1 samples, so no two files hash alike
+
+    The offset goes at the start: trailing silence would be trimmed by the
+    voice-activity filter and leave identical recognizer payloads.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(44100)
+        wav.writeframes(b"\x00\x00\x00\x00" * (index + 1) + frames)
+    return buffer.getvalue()
+
+def build_corpus(directory, count, seconds, formats):
+    """Write count files cycling through formats; each file differs so nothing is cached"""
+    with wave.open(io.BytesIO(make_wav_bytes(seconds, sample_rate=44100, channels=2))) as wav:
+        frames = wav.readframes(wav.getnframes())
+
+    paths = []
+    for i in range(count):
+        extension = formats[i % len(formats)]
+        wav_bytes = unique_wav(frames, i)
+        payload = wav_bytes if extension == "wav" else encode_with_ffmpeg(wav_bytes, extension)
+        path = os.path.join(directory, f"clip_{i:04d}.{extension}")
+        with open(path, "wb") as f:
+            f.write(payload)
+        paths.append(path)
+    return paths
+
+def run_batch(paths, workers, language):
+    """One batch run with a fresh converter and an empty cache; returns wall time"""
+    converter = AudioFileToTextConverter()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = converter.batch_process_files(paths, language, workers=workers)
+    elapsed = time.perf_counter() - start
+    converter.backend.close()
+    return elapsed, summary["failed"]
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI batch mode scaling benchmark")
+    parser.add_argument("--files", type=int, default=300, help="Corpus size (default: 300)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Clip length (default: 3)")
+    parser.add_argument("--formats", nargs="+", default=["wav", "mp3", "flac"],
+                      help="Corpus formats (non-WAV formats need ffmpeg)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                      default=sorted({1, 2, 4, os.cpu_count() or 1, 2 * (os.cpu_count() or 1)}),
+                      help="Worker counts to compare (default: 1 2 4 cores 2*cores)")
+    parser.add_argument("--latency-ms", type=float, default=200.0,
+                      help="Stand-in recognizer latency (default: 200)")
+    parser.add_argument("--language", default="en-IN", help="Language to request (default: en-IN)")
+    args = parser.parse_args()
+
+    server = start_fake_server(latency=args.latency_ms / 1000.0, hindi_share=0.0)  # every clip is "spoken" in English
+    os.environ["RECOGNIZER_URL"] = server.url
+    os.environ["TRANSCRIPT_CACHE_DIR"] = ""  # memory only, and each run gets a new converter
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        print(f"🎧 Building corpus of {args.files} files ({', '.join(args.formats)})...")
+        paths = build_corpus(corpus_dir, args.files, args.seconds, args.formats)
+
+        print(f"🧮 {os.cpu_count()} CPU cores, recognizer latency {args.latency_ms:.0f} ms")
+        print("=" * 60)
+        print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'speedup':>9} {'failed':>7}")
+        baseline = None
+        for workers in args.workers:
+            elapsed, failed = run_batch(paths, workers, args.language)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {len(paths) / elapsed:>9.1f} "
+                  f"{baseline / elapsed:>8.1f}x {failed:>7}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
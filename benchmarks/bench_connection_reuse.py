@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Connection Reuse Benchmark
+Compares a new connection per recognizer call with the pooled keep-alive backend
+Runs entirely offline against the local stand-in recognizer
+"""
+
+import math
+import time
+import array
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+import speech_recognition as sr
+from recognizer_backend import GoogleWebSpeechBackend
+from fake_recognizer_server import start_fake_server
+
+def synthetic_audio(seconds=2.0, sample_rate=16000, frequency=220.0):
+    """Build a 16-bit mono tone as sr.AudioData"""
+    samples = array.array("h", (
+        int(8000 * math.sin(2 * math.pi * frequency * i / sample_rate))
+        for i in range(int(seconds * sample_rate))
+    ))
+    return sr.AudioData(samples.tobytes(), sample_rate, 2)
+
+def run_mode(server, keep_alive, flac_data, sample_rate, requests, concurrency):
+    """Issue requests against the stand-in and return latency and connection figures"""
+    backend = GoogleWebSpeechBackend(endpoint=server.url, keep_alive=keep_alive, max_idle=concurrency)
+    before = server.stats()
+    latencies = []
+
+    def one_call(_):
+        start = time.perf_counter()
+        try:
+            backend.recognize_encoded(flac_data, sample_rate, "en-IN")
+        except sr.UnknownValueError:
+            pass  # the stand-in may 'hear' the other language
+        latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_call, range(requests)))
+    elapsed = time.perf_counter() - started
+    backend.pool.close()
+
+    after = server.stats()
+    latencies.sort()
+    return {
+        "mode": "keep-alive pool" if keep_alive else "connection per call",
+        "requests": requests,
+        "connections": after["connections"] - before["connections"],
+        "throughput_rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Recognizer connection reuse benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per mode (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent callers (default: 4)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                      help="Simulated recognizer latency (default: 0)")
+    parser.add_argument("--handshake-ms", type=float, default=30.0,
+                      help="Simulated TCP/TLS setup cost per new connection (default: 30)")
+    args = parser.parse_args()
+
+    server = start_fake_server(latency=args.latency_ms / 1000.0, handshake=args.handshake_ms / 1000.0)
+    # Encode once so the numbers isolate the transport cost
+    flac_data, sample_rate = GoogleWebSpeechBackend(endpoint=server.url).encode(synthetic_audio())
+
+    print("🔌 Recognizer connection reuse benchmark")
+    print("=" * 45)
+    for keep_alive in (False, True):
+        result = run_mode(server, keep_alive, flac_data, sample_rate, args.requests, args.concurrency)
+        print(f"{result['mode']:>20}: {result['throughput_rps']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:6.2f} ms  p95 {result['p95_ms']:6.2f} ms  "
+              f"connections {result['connections']}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
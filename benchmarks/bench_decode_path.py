@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Decode Path Benchmark
+Compares the old temp-file upload path with the in-memory decode path in audio_io.py
+Reports per-request latency and bytes written to disk
+"""
+
+import io
+import os
+import math
+import time
+import uuid
+import wave
+import array
+import argparse
+import tempfile
+import statistics
+import subprocess
+import speech_recognition as sr
+from pydub import AudioSegment
+from audio_io import decode_audio
+
+def make_wav_bytes(seconds, sample_rate=44100, channels=2):
+    """Build a WAV file in memory"""
+    samples = array.array("h")
+    for i in range(int(seconds * sample_rate)):
+        value = int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate))
+        samples.extend([value] * channels)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def encode_with_ffmpeg(wav_bytes, extension):
+    """Encode WAV bytes to another container with ffmpeg"""
+    # MP4 muxers must seek back to write the index, so they need a real file
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = os.path.join(temp_dir, f"encoded.{extension}")
+        subprocess.run(
+            [AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0", output],
+            input=wav_bytes, stdout=subprocess.DEVNULL, check=True,
+        )
+        with open(output, "rb") as f:
+            return f.read()
+
+def legacy_path(upload, filename):
+    """Replica of the previous /transcribe path; returns (audio_data, disk_bytes)"""
+    recognizer = sr.Recognizer()
+    temp_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4().hex}_{filename}")
+    disk_bytes = 0
+    try:
+        with open(temp_path, "wb") as f:  # file.save(temp_path)
+            f.write(upload)
+        disk_bytes += len(upload)
+
+        if filename.endswith(".wav"):
+            with sr.AudioFile(temp_path) as source:
+                return recognizer.record(source), disk_bytes
+
+        audio = AudioSegment.from_file(temp_path)
+        temp_wav = f"temp_{uuid.uuid4().hex}.wav"
+        audio.export(temp_wav, format="wav")
+        disk_bytes += os.path.getsize(temp_wav)
+        with sr.AudioFile(temp_wav) as source:
+            audio_data = recognizer.record(source)
+        os.remove(temp_wav)
+        return audio_data, disk_bytes
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def in_memory_path(upload, filename):
+    """The new path: upload stream straight to sr.AudioData"""
+    return decode_audio(io.BytesIO(upload), filename), 0
+
+def measure(path_function, upload, filename, repeats):
+    """Run one decode path repeatedly; returns latencies and disk bytes per request"""
+    latencies = []
+    disk_bytes = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _, written = path_function(upload, filename)
+        latencies.append(time.perf_counter() - start)
+        disk_bytes = written
+    return statistics.median(latencies) * 1000, disk_bytes
+
+def main():
+    parser = argparse.ArgumentParser(description="Temp-file vs in-memory decode benchmark")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio length (default: 30)")
+    parser.add_argument("--repeats", type=int, default=10, help="Runs per path (default: 10)")
+    parser.add_argument("--formats", nargs="+", default=["wav", "mp3", "ogg", "flac"],
+                      help="Upload formats to test (non-WAV formats need ffmpeg)")
+    args = parser.parse_args()
+
+    wav_bytes = make_wav_bytes(args.seconds)
+    print("💽 Decode path benchmark")
+    print("=" * 60)
+    print(f"{'format':>6} {'upload':>10} {'path':>10} {'p50 ms':>9} {'disk bytes':>12}")
+    for extension in args.formats:
+        try:
+            upload = wav_bytes if extension == "wav" else encode_with_ffmpeg(wav_bytes, extension)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"{extension:>6} skipped: {e}")
+            continue
+
+        filename = f"sample.{extension}"
+        for name, path_function in (("temp-file", legacy_path), ("in-memory", in_memory_path)):
+            try:
+                latency_ms, disk_bytes = measure(path_function, upload, filename, args.repeats)
+            except Exception as e:
+                print(f"{extension:>6} {len(upload):>10} {name:>10} failed: {e}")
+                continue
+            print(f"{extension:>6} {len(upload):>10} {name:>10} {latency_ms:>9.1f} {disk_bytes:>12}")
+
+if __name__ == "__main__":
+    main()
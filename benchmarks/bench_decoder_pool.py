@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Decoder Pool Benchmark
+Decodes many small MP3/M4A uploads with an ffmpeg process per file and through the persistent decoder pool
+Reports files per second, per-file latency and CPU time including child processes
+"""
+
+import io
+import os
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from audio_io import decode_pcm, normalized_with_stats, av
+from decoder_pool import DecoderPool
+from benchmarks.bench_decode_path import make_wav_bytes, encode_with_ffmpeg
+
+def cpu_seconds():
+    """User plus system time of this process and its reaped children"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+def run(decode, files, concurrency):
+    """Decode every (filename, payload) with `concurrency` callers; returns (wall seconds, latencies in ms)"""
+    latencies = []
+
+    def one(item):
+        filename, payload = item
+        started = time.perf_counter()
+        decode(io.BytesIO(payload), filename)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, files))
+    return time.perf_counter() - start, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-file ffmpeg vs persistent decoder pool benchmark")
+    parser.add_argument("--files", type=int, default=200, help="Files to decode (default: 200)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Clip length (default: 2)")
+    parser.add_argument("--formats", nargs="+", default=["mp3", "m4a"], help="Formats to cycle through")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Concurrent decodes and pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    wav_bytes = make_wav_bytes(args.seconds, sample_rate=44100, channels=2)
+    encoded = {extension: encode_with_ffmpeg(wav_bytes, extension) for extension in args.formats}
+    files = [(f"clip_{i:04d}.{args.formats[i % len(args.formats)]}", encoded[args.formats[i % len(args.formats)]])
+             for i in range(args.files)]
+
+    def per_file_ffmpeg(source, filename):
+        return normalized_with_stats(decode_pcm(source, filename, engine="ffmpeg"))
+
+    modes = [("ffmpeg per file", per_file_ffmpeg, None), ("pool (ffmpeg)", None, "ffmpeg")]
+    if av is not None:
+        modes.append(("pool (pyav)", None, "pyav"))
+    else:
+        print("ℹ️  PyAV not installed; skipping the PyAV row (pip install av)")
+
+    print(f"📦 Decoder pool benchmark: {args.files} files ({', '.join(args.formats)}, {args.seconds:g}s each), "
+          f"{args.workers} workers")
+    print("=" * 72)
+    print(f"{'mode':>16} {'seconds':>8} {'files/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'CPU s':>8} {'speedup':>8}")
+    baseline = None
+    for name, decode, engine in modes:
+        pool = None
+        if engine:
+            pool = DecoderPool(args.workers, engine=engine, health_interval=0)
+            pool.start()
+            pool.health_check()  # workers are up and answering before the clock starts
+            decode = pool.decode
+        cpu_before = cpu_seconds()
+        seconds, latencies = run(decode, files, args.workers)
+        if pool:
+            pool.close()  # reap the workers so their CPU time is counted
+        cpu = cpu_seconds() - cpu_before
+        baseline = baseline or seconds
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{name:>16} {seconds:>8.2f} {len(files) / seconds:>8.1f} {statistics.median(latencies):>8.1f} "
+              f"{p95:>8.1f} {cpu:>8.2f} {baseline / seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
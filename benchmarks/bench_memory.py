@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Decode Memory Benchmark
+Peak Python memory (tracemalloc) to turn one upload into normalized AudioData, by recording length
+Compares the original pydub path, the whole-file in-memory decode and the windowed decode with a spooled upload
+"""
+
+import io
+import os
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from audio_io import decode_pcm, normalized_with_stats, decode_audio_with_stats
+from benchmarks.bench_decode_path import make_wav_bytes, encode_with_ffmpeg, legacy_path
+
+SPOOL_BYTES = 4 * 1024 * 1024  # app.py's default UPLOAD_SPOOL_MB
+
+def pydub_path(path, filename):
+    """The original /transcribe: upload bytes, pydub AudioSegment, exported WAV, AudioData"""
+    with open(path, "rb") as f:
+        return legacy_path(f.read(), filename)[0]
+
+def whole_file_path(path, filename):
+    """Upload read into a BytesIO, every source sample decoded, then normalized at once"""
+    with open(path, "rb") as f:
+        upload = io.BytesIO(f.read())
+    return normalized_with_stats(decode_pcm(upload, filename))[0]
+
+def windowed_path(path, filename):
+    """Upload copied to a spool file (memory up to 4 MB, disk beyond), decoded and normalized window by window"""
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    with open(path, "rb") as f:
+        shutil.copyfileobj(f, upload, 64 * 1024)
+    upload.seek(0)
+    return decode_audio_with_stats(upload, filename)[0]
+
+MODES = (("pydub", pydub_path), ("whole-file", whole_file_path), ("windowed", windowed_path))
+
+def peak_bytes(function, *args):
+    """Peak traced allocation while function runs, above what was allocated before; returns (peak, result size)"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = function(*args)
+        peak = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return peak, len(result.frame_data)
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak decode memory by recording length")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[30, 120, 300],
+                        help="Recording lengths to test (default: 30 120 300)")
+    parser.add_argument("--formats", nargs="+", default=["wav", "mp3"], help="Upload formats (default: wav mp3)")
+    parser.add_argument("--modes", nargs="+", default=[name for name, _ in MODES],
+                        choices=[name for name, _ in MODES])
+    args = parser.parse_args()
+
+    print("🧮 Decode memory benchmark (44.1 kHz stereo source, tracemalloc peak in MB)")
+    print("=" * 78)
+    print(f"{'format':>6} {'seconds':>8} {'upload':>8} {'output':>8}" + "".join(f" {mode:>11}" for mode in args.modes))
+    modes = [(name, function) for name, function in MODES if name in args.modes]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for seconds in args.seconds:
+            wav_bytes = make_wav_bytes(seconds, sample_rate=44100, channels=2)
+            for extension in args.formats:
+                payload = wav_bytes if extension == "wav" else encode_with_ffmpeg(wav_bytes, extension)
+                # The upload as Werkzeug leaves it: spooled to a temporary file
+                path = os.path.join(temp_dir, f"upload.{extension}")
+                with open(path, "wb") as f:
+                    f.write(payload)
+                row = f"{extension:>6} {seconds:>8g} {len(payload) / 1e6:>8.1f}"
+                output = 0
+                cells = []
+                for _, function in modes:
+                    try:
+                        peak, output = peak_bytes(function, path, os.path.basename(path))
+                        cells.append(f"{peak / 1e6:>11.1f}")
+                    except OSError:  # pydub needs ffprobe for anything but WAV
+                        cells.append(f"{'n/a':>11}")
+                print(row + f" {output / 1e6:>8.1f} " + " ".join(cells))
+                del payload
+    print("\nWindowed peak is one decode window plus the normalized output, whatever the source size.")
+    print("tracemalloc sees Python allocations only; ffmpeg runs in its own process.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Normalization Benchmark
+Compares recognizer payloads sent at the upload's own rate with the canonical 16 kHz mono format
+Reports PCM and FLAC bytes per request and recognition latency over a bandwidth-limited uplink
+"""
+
+import io
+import time
+import wave
+import array
+import argparse
+import statistics
+from audio_io import decode_audio_with_stats, DEFAULT_SAMPLE_RATE
+from recognizer_backend import GoogleWebSpeechBackend
+from fake_recognizer_server import start_fake_server
+from benchmarks.corpus import speech_like
+
+SOURCES = ("48000x2", "44100x2", "22050x1", "16000x1")
+
+def source_wav(seconds, sample_rate, channels):
+    """Speech-like WAV upload at a given rate and channel count"""
+    mono = speech_like(seconds, sample_rate=sample_rate, seed=7)
+    samples = array.array("h")
+    for value in mono:
+        samples.extend([value] * channels)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def measure(backend, upload, target_rate, repeats):
+    """Decode at target_rate (0 keeps the source rate) and recognize repeatedly"""
+    audio_data, stats = decode_audio_with_stats(io.BytesIO(upload), "upload.wav", sample_rate=target_rate)
+    flac_data, _ = backend.encode(audio_data)
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.recognize(audio_data, "en-IN")
+        latencies.append(time.perf_counter() - start)
+    return stats, len(flac_data), statistics.median(latencies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Source-rate vs normalized recognizer payload benchmark")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Audio length (default: 20)")
+    parser.add_argument("--repeats", type=int, default=5, help="Recognitions per case (default: 5)")
+    parser.add_argument("--sources", nargs="+", default=list(SOURCES),
+                      help="Upload formats as RATExCHANNELS (default: 48000x2 44100x2 22050x1 16000x1)")
+    parser.add_argument("--target-rate", type=int, default=DEFAULT_SAMPLE_RATE,
+                      help=f"Normalized sample rate (default: {DEFAULT_SAMPLE_RATE})")
+    parser.add_argument("--uplink-kbps", type=float, default=2000.0,
+                      help="Simulated uplink to the recognizer in kbit/s (default: 2000)")
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                      help="Stand-in recognizer latency (default: 50)")
+    args = parser.parse_args()
+
+    server = start_fake_server(latency=args.latency_ms / 1000.0, hindi_share=0.0,
+                               bandwidth=args.uplink_kbps * 1000 / 8)
+    backend = GoogleWebSpeechBackend(endpoint=server.url)
+
+    print("🗜️  Normalization benchmark")
+    print("=" * 78)
+    print(f"{'source':>9} {'mode':>10} {'PCM before':>11} {'PCM after':>10} {'FLAC bytes':>11} {'p50 ms':>9}")
+    for source in args.sources:
+        sample_rate, channels = (int(part) for part in source.split("x"))
+        upload = source_wav(args.seconds, sample_rate, channels)
+        baseline = None
+        for mode, target_rate in (("source", 0), (f"{args.target_rate // 1000}k mono", args.target_rate)):
+            stats, flac_bytes, latency_ms = measure(backend, upload, target_rate, args.repeats)
+            saving = f" ({latency_ms / baseline - 1:+.0%} latency)" if baseline else ""
+            baseline = baseline or latency_ms
+            print(f"{source:>9} {mode:>10} {stats['bytes_before']:>11} {stats['bytes_after']:>10} "
+                  f"{flac_bytes:>11} {latency_ms:>9.1f}{saving}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Recognizer Fault Scenarios
+Drives the resilient recognizer client against the stand-in server with injected faults
+Compares a bare backend with retries, the token bucket and the circuit breaker in each scenario
+"""
+
+import io
+import sys
+import time
+import argparse
+import threading
+import speech_recognition as sr
+from concurrent.futures import ThreadPoolExecutor
+from audio_io import decode_audio
+from recognizer_backend import GoogleWebSpeechBackend
+from recognizer_resilience import ResilientBackend, TokenBucket, CircuitBreaker, CircuitOpenError
+from fake_recognizer_server import start_fake_server
+from benchmarks.bench_normalization import source_wav
+
+def run_calls(backend, audio_data, calls, concurrency):
+    """Recognize `calls` times; returns counts of outcomes and the wall time"""
+    outcomes = {"ok": 0, "failed": 0, "fast_failed": 0}
+    lock = threading.Lock()
+
+    def one(_):
+        try:
+            backend.recognize(audio_data, "en-IN")
+            outcome = "ok"
+        except CircuitOpenError:
+            outcome = "fast_failed"
+        except (sr.RequestError, sr.UnknownValueError):
+            outcome = "failed"
+        with lock:
+            outcomes[outcome] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(calls)))
+    return outcomes, time.perf_counter() - start
+
+def report(name, client, server, before, outcomes, seconds):
+    """Print one row; returns the outcomes plus the requests sent and 429s seen"""
+    stats = server.stats()
+    sent = stats["requests"] - before["requests"]
+    throttled = stats["throttled"] - before["throttled"]
+    print(f"{name:>10} {client:>10} {outcomes['ok']:>5} {outcomes['failed']:>7} {outcomes['fast_failed']:>11} "
+          f"{sent:>10} {throttled:>10} {seconds:>8.2f}")
+    return dict(outcomes, sent=sent, throttled=throttled)
+
+def scenario(name, server, audio_data, clients, calls, concurrency, faults, after=None):
+    """Run every client through one fault setting; returns {client: report() row}"""
+    rows = {}
+    for client, backend in clients:
+        server.set_faults(**faults)
+        if faults.get("quota_rps"):
+            # Start in a fresh quota second, so the client before has not used up part of it
+            time.sleep(1.0 - time.monotonic() % 1.0)
+        before = server.stats()
+        outcomes, seconds = run_calls(backend, audio_data, calls, concurrency)
+        rows[client] = report(name, client, server, before, outcomes, seconds)
+        if after:
+            after(client, backend)
+    server.set_faults(error_rate=0.0, drop_rate=0.0, quota_rps=0, outage=False)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Recognizer resilience under injected faults")
+    parser.add_argument("--calls", type=int, default=60, help="Recognitions per scenario (default: 60)")
+    parser.add_argument("--concurrency", type=int, default=6, help="Concurrent callers (default: 6)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Stand-in recognizer latency (default: 20)")
+    parser.add_argument("--error-rate", type=float, default=0.3, help="Flaky scenario error rate (default: 0.3)")
+    parser.add_argument("--quota-rps", type=int, default=20, help="Quota scenario requests per second (default: 20)")
+    args = parser.parse_args()
+
+    server = start_fake_server(latency=args.latency_ms / 1000.0, hindi_share=0.0, seed=1)
+    audio_data = decode_audio(io.BytesIO(source_wav(2.0, 16000, 1)), "clip.wav")
+
+    def bare():
+        return GoogleWebSpeechBackend(endpoint=server.url)
+
+    def resilient(bucket=None, breaker=None):
+        return ResilientBackend(bare(), retries=4, backoff_base=0.05, backoff_max=1.0, bucket=bucket,
+                                breaker=breaker)
+
+    print("🛡️  Recognizer fault scenarios")
+    print("=" * 84)
+    print(f"{'scenario':>10} {'client':>10} {'ok':>5} {'failed':>7} {'fast-failed':>11} "
+          f"{'sent':>10} {'429s':>10} {'seconds':>8}")
+
+    # Transient 503s and dropped connections: retries with jittered backoff recover almost all
+    scenario("flaky", server, audio_data,
+             [("bare", bare()), ("retrying", resilient())],
+             args.calls, args.concurrency, {"error_rate": args.error_rate, "drop_rate": 0.05})
+
+    # A per-second quota: retrying 429s works but hammers the quota; the bucket stays under it
+    quota = scenario("quota", server, audio_data,
+             [("bare", bare()), ("retrying", resilient()),
+              ("bucket", resilient(bucket=TokenBucket(args.quota_rps * 0.9, burst=1)))],
+             args.calls * 2, args.concurrency * 2, {"quota_rps": args.quota_rps})
+
+    # Backend down: the breaker opens after a few failures and later calls fail without a request
+    breaker = CircuitBreaker(threshold=5, reset_timeout=1.0)
+    protected = resilient(breaker=breaker)
+    outage = scenario("outage", server, audio_data,
+             [("retrying", resilient()), ("breaker", protected)],
+             args.calls, args.concurrency, {"outage": True})
+
+    # Backend back: the trial call after reset_timeout closes the circuit again
+    time.sleep(breaker.reset_timeout)
+    scenario("recovery", server, audio_data, [("breaker", protected)], args.calls, args.concurrency, {})
+    state = breaker.stats()['state']
+    print(f"\n🔌 Circuit after recovery: {state} (opened {breaker.times_opened}x, "
+          f"{breaker.short_circuited} calls short-circuited)")
+    server.shutdown()
+
+    # Calls already in flight when the circuit opens may still reach the backend, one each
+    max_outage_requests = breaker.threshold + args.concurrency
+    checks = [
+        ("retrying client rides out the quota", quota["retrying"]["failed"] == 0),
+        ("token bucket stays under the quota", quota["bucket"]["throttled"] == 0),
+        ("breaker short-circuits the outage", outage["breaker"]["fast_failed"] > 0),
+        (f"breaker sends at most {max_outage_requests} requests to the outage",
+         outage["breaker"]["sent"] <= max_outage_requests),
+        ("circuit closes again after recovery", state == "closed"),
+    ]
+    print()
+    for description, passed in checks:
+        print(f"{'✅' if passed else '❌'} {description}")
+    if not all(passed for _, passed in checks):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
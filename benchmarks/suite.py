@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Micro-benchmarks for load_audio_file, the VAD pre-filter and transcribe_audio, plus end-to-end /transcribe runs
+Results are saved as JSON; --baseline compares against an earlier run and flags regressions
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from werkzeug.serving import make_server
+from fake_recognizer_server import start_fake_server
+from benchmarks.corpus import generate_corpus
+from voice_activity import prefilter
+
+# Lower is better for latencies, higher is better for throughput
+LATENCY_METRICS = ("p50_ms", "p95_ms")
+THROUGHPUT_METRICS = ("throughput_rps",)
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize(latencies):
+    """Latency summary in milliseconds"""
+    return {
+        "runs": len(latencies),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "min_ms": round(min(latencies) * 1000, 3),
+    }
+
+def timed(function, repeats):
+    """Call function repeatedly; returns per-call latencies in seconds"""
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def bench_load(converter, corpus_dir, entries, repeats):
+    """load_audio_file for every corpus file"""
+    results = {}
+    for entry in entries:
+        path = os.path.join(corpus_dir, entry["file"])
+        results[f"load_audio_file/{entry['file']}"] = summarize(
+            timed(lambda: converter.load_audio_file(path), repeats))
+    return results
+
+def bench_vad(converter, corpus_dir, entries, repeats):
+    """Voice-activity pre-filter on each decoded WAV, with the audio seconds it saves"""
+    results = {}
+    for entry in entries:
+        if entry["format"] != "wav":
+            continue
+        audio_data = converter.load_audio_file(os.path.join(corpus_dir, entry["file"]))
+        summary = summarize(timed(lambda: prefilter(audio_data), repeats))
+        summary["saved_seconds"] = round(prefilter(audio_data)[1].saved_seconds, 3)
+        results[f"vad/{entry['content']}_{entry['length']}"] = summary
+    return results
+
+def bench_transcribe(converter, corpus_dir, entries, repeats, language, chunk_seconds):
+    """transcribe_audio against the stand-in recognizer (cache disabled)
+
+    Content is the same across formats, so only the WAV of each recording
+    is transcribed. Long recordings go through silence chunking as in the API.
+    """
+    results = {}
+    for entry in entries:
+        if entry["format"] != "wav":
+            continue
+        audio_data = converter.load_audio_file(os.path.join(corpus_dir, entry["file"]))
+        name = f"transcribe_audio/{entry['content']}_{entry['length']}/{language}"
+        results[name] = summarize(timed(
+            lambda: converter.transcribe_audio(audio_data, language, chunk_seconds), repeats))
+    return results
+
+def bench_end_to_end(flask_app, corpus_dir, entries, requests_per_file, concurrency, language):
+    """POST each short file to a live /transcribe server from concurrent clients"""
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/transcribe"
+    local = threading.local()
+
+    def post(path):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        with open(path, "rb") as f:
+            payload = f.read()
+        start = time.perf_counter()
+        response = session.post(url, files={"file": (os.path.basename(path), payload)}, data={"language": language})
+        return time.perf_counter() - start, response.status_code
+
+    results = {}
+    try:
+        for entry in entries:
+            if entry["length"] != "short":
+                continue
+            path = os.path.join(corpus_dir, entry["file"])
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                outcomes = list(executor.map(post, [path] * requests_per_file))
+            elapsed = time.perf_counter() - start
+            summary = summarize([latency for latency, _ in outcomes])
+            summary["throughput_rps"] = round(len(outcomes) / elapsed, 2)
+            summary["errors"] = sum(1 for _, status in outcomes if status >= 500)
+            results[f"transcribe_e2e/{entry['file']}"] = summary
+    finally:
+        server.shutdown()
+    return results
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """List regressions of current results against a baseline
+
+    A latency regresses when it grows by more than threshold (a fraction)
+    and by at least min_delta_ms; throughput regresses when it drops by
+    more than threshold.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        for metric in LATENCY_METRICS:
+            if metric in result and metric in before and before[metric] > 0:
+                change = (result[metric] - before[metric]) / before[metric]
+                if change > threshold and result[metric] - before[metric] >= min_delta_ms:
+                    regressions.append((name, metric, before[metric], result[metric], change))
+        for metric in THROUGHPUT_METRICS:
+            if metric in result and metric in before and before[metric] > 0:
+                change = (result[metric] - before[metric]) / before[metric]
+                if change < -threshold:
+                    regressions.append((name, metric, before[metric], result[metric], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode and recognize pipeline benchmark suite")
+    parser.add_argument("--corpus", default=os.path.join("benchmarks", "corpus"),
+                      help="Corpus directory, generated if missing (default: benchmarks/corpus)")
+    parser.add_argument("--formats", nargs="+", default=["wav", "mp3", "flac", "ogg"],
+                      help="Corpus formats (non-WAV formats need ffmpeg)")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per micro-benchmark (default: 5)")
+    parser.add_argument("--requests", type=int, default=40, help="End-to-end requests per file (default: 40)")
+    parser.add_argument("--concurrency", type=int, default=8, help="End-to-end client threads (default: 8)")
+    parser.add_argument("--latency-ms", type=float, default=100.0,
+                      help="Stand-in recognizer latency (default: 100)")
+    parser.add_argument("--language", default="en-IN", help="Language to request (default: en-IN)")
+    parser.add_argument("--skip", nargs="+", default=[], choices=["load", "vad", "transcribe", "e2e"],
+                      help="Benchmark groups to skip")
+    parser.add_argument("--output", help="Write results JSON here (e.g. a new baseline)")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                      help="Relative change counted as a regression (default: 0.2)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                      help="Ignore latency changes smaller than this (default: 1.0)")
+    args = parser.parse_args()
+
+    server = start_fake_server(latency=args.latency_ms / 1000.0, hindi_share=0.0)
+    os.environ["RECOGNIZER_URL"] = server.url
+    os.environ["TRANSCRIPT_CACHE_ENTRIES"] = "0"  # measure recognition, not cache hits
+    os.environ["TRANSCRIPT_CACHE_DIR"] = ""
+
+    # Imported after the environment is set: the API builds its backend and cache at import
+    import app as api
+
+    print(f"🎧 Preparing corpus in {args.corpus}...")
+    entries = generate_corpus(args.corpus, args.formats)
+
+    results = {}
+    if "load" not in args.skip:
+        print("⏱️  load_audio_file...")
+        results.update(bench_load(api.converter, args.corpus, entries, args.repeats))
+    if "vad" not in args.skip:
+        print("⏱️  voice-activity pre-filter...")
+        results.update(bench_vad(api.converter, args.corpus, entries, args.repeats))
+    if "transcribe" not in args.skip:
+        print("⏱️  transcribe_audio...")
+        results.update(bench_transcribe(api.converter, args.corpus, entries, args.repeats, args.language,
+                                        api.app.config['CHUNK_SECONDS']))
+    if "e2e" not in args.skip:
+        print("⏱️  end-to-end /transcribe...")
+        results.update(bench_end_to_end(api.app, args.corpus, entries, args.requests, args.concurrency,
+                                        args.language))
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+
+    print("\n📊 Results")
+    print("=" * 78)
+    print(f"{'benchmark':<48} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>9}")
+    for name, result in results.items():
+        throughput = result.get("throughput_rps")
+        print(f"{name:<48} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{throughput if throughput is not None else '':>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        print(f"\n🔍 Compared with {args.baseline} (commit {baseline['meta'].get('commit')})")
+        if not regressions:
+            print(f"✅ No regressions beyond {args.threshold:.0%}")
+        for name, metric, before, after, change in regressions:
+            print(f"❌ {name} {metric}: {before} -> {after} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,56 @@ Supports Hindi and English speech recognition
 Converts audio files to text - Command Line Interface
 """
 
+import io
 import os
 import sys
+import time
+import hashlib
 import argparse
 import speech_recognition as sr
-from pydub import AudioSegment
-import io
+from recognizer_backend import create_backend
+from language_probe import probe_languages, recognize_cached, AUTO_LANGUAGES
+from language_priors import create_language_priors
+from transcript_cache import create_cache
+from audio_io import decode_audio, decode_audio_with_stats
+from audio_format import probe_audio
+from decoder_pool import DecoderPool
+from audio_chunking import audio_duration, transcribe_in_chunks, DEFAULT_CHUNK_SECONDS, DEFAULT_CHUNK_WORKERS
+from voice_activity import prefilter
+from batch_manifest import BatchManifest, file_signature, is_manifest_path
+from directory_ingest import scan_directory, DirectoryWatcher, AUDIO_PATTERNS, DEFAULT_POLL_INTERVAL, DEFAULT_DEBOUNCE
 import traceback
+import threading
+import contextlib
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+def format_offset(seconds):
+    """Format a time offset as MM:SS"""
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+def load_for_batch(file_path, decoder=None):
+    """Read, hash and decode one file, in the decoder pool if given; returns (audio_data, sha256, decode_ms)"""
+    started = time.perf_counter()
+    with open(file_path, "rb") as f:
+        payload = f.read()
+    digest = hashlib.sha256(payload).hexdigest()
+    if decoder is not None:
+        audio_data = decoder.decode(io.BytesIO(payload), file_path)[0]
+    else:
+        audio_data = decode_audio(io.BytesIO(payload), file_path)
+    return audio_data, digest, round((time.perf_counter() - started) * 1000, 1)
 
 class AudioFileToTextConverter:
-    def __init__(self):
+    def __init__(self, chunk_seconds=DEFAULT_CHUNK_SECONDS, workers=DEFAULT_CHUNK_WORKERS, vad=True):
         self.recognizer = sr.Recognizer()
+        self.backend = create_backend()
+        self.cache = create_cache()
+        self.language_priors = create_language_priors()
+        self.chunk_seconds = chunk_seconds
+        self.workers = workers
+        self.vad = vad
     
     def transcribe_file(self, file_path, language="auto"):
         """Transcribe audio from file"""
@@ -25,6 +64,11 @@ class AudioFileToTextConverter:
             # Load audio file
             audio_data = self.load_audio_file(file_path)
             
+            if audio_data and self.vad:
+                audio_data = self.skip_silence(audio_data)
+                if audio_data is None:
+                    return None
+
             if audio_data:
                 print("🔄 Transcribing audio...")
                 text = self.transcribe_audio(audio_data, language)
@@ -53,35 +97,17 @@ class AudioFileToTextConverter:
             
             print(f"📂 Loading file: {os.path.basename(file_path)}")
             
-            # Handle different audio formats
-            if file_path.lower().endswith('.wav'):
-                with sr.AudioFile(file_path) as source:
-                    audio_data = self.recognizer.record(source)
-                return audio_data
-            else:
-                # Convert other formats to WAV using pydub
+            # The header says what the file is; PCM WAV/AIFF are read natively, the rest is decoded in memory
+            info = probe_audio(file_path)
+            if info is not None:
+                details = [f"{info.sample_rate} Hz" if info.sample_rate else None,
+                           f"{info.channels} ch" if info.channels else None,
+                           f"{info.duration:.1f}s" if info.duration is not None else None]
+                print(f"🔎 Detected {info.container.upper()} ({info.codec or 'unknown codec'})"
+                      + "".join(f", {detail}" for detail in details if detail))
+            if info is None or not info.native:
                 print("🔄 Converting audio format...")
-                audio = AudioSegment.from_file(file_path)
-                
-                # Convert to WAV format in memory
-                wav_io = io.BytesIO()
-                audio.export(wav_io, format="wav")
-                wav_io.seek(0)
-                
-                # Create temporary WAV file
-                temp_wav = "temp_audio_cli.wav"
-                with open(temp_wav, "wb") as f:
-                    f.write(wav_io.read())
-                
-                # Load with speech_recognition
-                with sr.AudioFile(temp_wav) as source:
-                    audio_data = self.recognizer.record(source)
-                
-                # Clean up temporary file
-                if os.path.exists(temp_wav):
-                    os.remove(temp_wav)
-                
-                return audio_data
+            return decode_audio_with_stats(file_path, info=info)[0]
                 
         except Exception as e:
             print(f"❌ Error loading audio file: {e}")
@@ -89,37 +115,66 @@ class AudioFileToTextConverter:
                 traceback.print_exc()
             return None
     
+    def skip_silence(self, audio_data, quiet=False):
+        """Voice-activity pre-filter: None for speech-free audio, else the audio with dead air trimmed"""
+        trimmed, activity = prefilter(audio_data)
+        if not quiet:
+            if trimmed is None:
+                print(f"🔇 No speech detected in {activity.duration:.1f}s of audio - skipping recognition")
+            elif activity.saved_seconds > 0:
+                print(f"✂️  Trimmed {activity.saved_seconds:.1f}s of silence "
+                      f"(speech {activity.start:.1f}s-{activity.end:.1f}s of {activity.duration:.1f}s)")
+        return trimmed
+
     def transcribe_audio(self, audio_data, language):
         """Transcribe audio data to text with detailed error reporting"""
         try:
+            duration = audio_duration(audio_data)
+            if self.chunk_seconds and duration > self.chunk_seconds:
+                return self.transcribe_chunked(audio_data, language, duration)
+
+            cache_key = self.cache.make_key(audio_data, language)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print("⚡ Cache hit - reusing previous transcription")
+                if language == "auto":
+                    return f"{cached['text']} [Auto-detected: {cached['language']}]"
+                return cached["text"]
+
             print(f"🔄 Starting transcription with language: {language}")
-            
+
             if language == "auto":
-                print("🔍 Auto-detecting language...")
-                # Try both languages
-                for lang in ["en-IN", "hi-IN"]:
-                    try:
-                        print(f"  🔍 Trying language: {lang}...")
-                        text = self.recognizer.recognize_google(audio_data, language=lang)
-                        print(f"  ✅ Successfully detected {lang}!")
-                        return f"{text} [Auto-detected: {lang}]"
-                    except sr.UnknownValueError:
-                        print(f"  ❌ No speech detected for {lang}")
-                        continue
-                    except sr.RequestError as e:
-                        print(f"  ❌ Request error for {lang}: {e}")
-                        continue
-                    except Exception as e:
-                        print(f"  ❌ Unexpected error for {lang}: {e}")
-                        continue
-                
+                order, lead = self.language_priors.plan(AUTO_LANGUAGES)
+                if lead:
+                    print(f"🔍 Auto-detecting language (trying {order[0]} first, learned from earlier files)...")
+                else:
+                    print(f"🔍 Auto-detecting language (probing {', '.join(order)} concurrently)...")
+                detection = probe_languages(self.backend, audio_data, AUTO_LANGUAGES, priors=self.language_priors)
+                for probe in detection["probes"]:
+                    lang = probe["language"]
+                    if probe["status"] == "recognized":
+                        print(f"  ✅ {lang}: speech recognized ({probe['latency_ms']} ms)")
+                    elif probe["status"] == "no_speech":
+                        print(f"  ❌ No speech detected for {lang} ({probe['latency_ms']} ms)")
+                    elif probe["status"] == "error":
+                        print(f"  ❌ Request error for {lang}: {probe['error']}")
+                    else:
+                        print(f"  ⏭️  {lang}: {probe['status']} (preferred language already won)")
+
+                if detection["text"] is not None:
+                    print(f"  ✅ Successfully detected {detection['language']}!")
+                    self.cache.put(cache_key, {"text": detection["text"], "language": detection["language"],
+                                               "confidence": "high"})
+                    return f"{detection['text']} [Auto-detected: {detection['language']}]"
+
                 print("❌ No successful transcription in any language")
                 return None
             else:
                 # Use specified language
                 print(f"  🔍 Transcribing with {language}...")
-                text = self.recognizer.recognize_google(audio_data, language=language)
+                text = self.backend.recognize(audio_data, language)
                 print(f"  ✅ Transcription successful!")
+                self.cache.put(cache_key, {"text": text, "language": language, "confidence": "high"})
                 return text
                 
         except sr.UnknownValueError:
@@ -135,19 +190,201 @@ class AudioFileToTextConverter:
             if "--debug" in sys.argv:
                 traceback.print_exc()
             return None
-    
-    def batch_process_files(self, file_paths, language="auto", output_file=None):
-        """Process multiple files and optionally save to output file"""
+
+    def transcribe_chunked(self, audio_data, language, duration):
+        """Split a long recording at silences and transcribe the chunks in parallel"""
+        print(f"✂️  Splitting {duration:.1f}s of audio into chunks of up to {self.chunk_seconds:.0f}s "
+              f"({self.workers} workers)...")
+
+        def report(segment):
+            if segment["text"]:
+                print(f"  ✅ Chunk {segment['index'] + 1} [{format_offset(segment['start'])}-"
+                      f"{format_offset(segment['end'])}] recognized")
+            else:
+                print(f"  ❌ Chunk {segment['index'] + 1} [{format_offset(segment['start'])}-"
+                      f"{format_offset(segment['end'])}]: {segment['error'] or 'no speech'}")
+
+        stitched = transcribe_in_chunks(
+            audio_data,
+            lambda chunk: self.recognize_chunk(chunk, language),
+            max_chunk_seconds=self.chunk_seconds,
+            workers=self.workers,
+            on_segment=report
+        )
+
+        print("\n🧩 Segments:")
+        for segment in stitched["segments"]:
+            text = segment["text"] or "[no speech]"
+            print(f"  [{format_offset(segment['start'])}-{format_offset(segment['end'])}] {text}")
+
+        if not stitched["text"]:
+            print("❌ No chunk could be transcribed")
+            return None
+        if language == "auto":
+            return f"{stitched['text']} [Auto-detected: {stitched['language']}]"
+        return stitched["text"]
+
+    def recognize_chunk(self, audio_data, language):
+        """Cached recognition of one chunk without console output (runs on worker threads)"""
+        return recognize_cached(self.backend, self.cache, audio_data, language, priors=self.language_priors)
+
+    def recognize_result(self, audio_data, language):
+        """Recognize without per-step console output, chunking long recordings
+
+        Returns {"text", "language", ...} or None when no speech was recognized.
+        """
+        if self.vad:
+            audio_data = self.skip_silence(audio_data, quiet=True)
+            if audio_data is None:
+                return None
+        duration = audio_duration(audio_data)
+        if self.chunk_seconds and duration > self.chunk_seconds:
+            stitched = transcribe_in_chunks(audio_data, lambda chunk: self.recognize_chunk(chunk, language),
+                                            max_chunk_seconds=self.chunk_seconds, workers=self.workers)
+            return stitched if stitched["text"] else None
+        return self.recognize_chunk(audio_data, language)
+
+    def transcribe_record(self, file_path, language, load_future=None):
+        """Transcribe one file quietly and describe the outcome as a manifest record
+
+        load_future, if given, is the file's load_for_batch call feeding the
+        decoder pool; otherwise the file is loaded here.
+        """
+        started = time.perf_counter()
+        record = {"file": file_path, "sha256": None, "language": language, "detected_language": None,
+                  "text": None, "status": "failed", "error": None, "duration": None, "timings": {}}
+        try:
+            record.update(file_signature(file_path))
+            audio_data, digest, decode_ms = load_future.result() if load_future else load_for_batch(file_path)
+            record["sha256"] = digest
+            record["duration"] = round(audio_duration(audio_data), 3)
+            record["timings"]["decode_ms"] = decode_ms
+
+            recognize_started = time.perf_counter()
+            result = self.recognize_result(audio_data, language)
+            record["timings"]["recognize_ms"] = round((time.perf_counter() - recognize_started) * 1000, 1)
+            if result:
+                record.update(text=result["text"], detected_language=result["language"], status="ok")
+            else:
+                record["error"] = "no speech recognized"
+        except Exception as e:
+            record["error"] = str(e)
+            if "--debug" in sys.argv:
+                traceback.print_exc()
+        record["timings"]["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        record["finished_at"] = datetime.now().isoformat()
+        return record
+
+    def parallel_transcribe(self, file_paths, language, workers):
+        """Yield a record per file in input order while files are processed concurrently
+
+        Decoding runs in a pool of persistent decoder processes and
+        recognition, which mostly waits on the network, in a pool of threads;
+        a file starts recognizing as soon as its own decode finishes. Only a
+        few files per worker are in flight at once, so memory stays flat on
+        large corpora.
+        """
+        window = workers * 4
+        with DecoderPool(workers) as pool, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as decoders, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recognize") as recognizers:
+            in_flight = deque()
+            for file_path in file_paths:
+                load = decoders.submit(load_for_batch, file_path, pool)
+                in_flight.append(recognizers.submit(self.transcribe_record, file_path, language, load))
+                if len(in_flight) >= window:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def manifest_records(self, file_paths, language, workers):
+        """Records for every file, sequential or concurrent"""
+        if workers > 1:
+            return self.parallel_transcribe(file_paths, language, workers)
+        return (self.transcribe_record(file_path, language) for file_path in file_paths)
+
+    def report_avoided_probes(self, avoided_before):
+        """Print how many auto-detect requests the learned language order saved this run"""
+        self.language_priors.save()
+        avoided = self.language_priors.probes_avoided - avoided_before
+        if avoided:
+            print(f"🎯 Learned language order skipped {avoided} auto-detect request(s)")
+
+    def batch_to_manifest(self, file_paths, language, manifest_path, workers=1, resume=False):
+        """Transcribe files, appending a JSONL record to manifest_path as each one finishes
+
+        With resume, files already recorded as transcribed (and unchanged
+        since) are skipped. Returns the run summary.
+        """
+        manifest = BatchManifest(manifest_path)
+        avoided_before = self.language_priors.probes_avoided
+        skipped = 0
+        if resume:
+            completed = manifest.completed()
+            remaining = [file_path for file_path in file_paths if not manifest.is_done(file_path, completed)]
+            skipped = len(file_paths) - len(remaining)
+            print(f"⏭️  Resuming: {skipped} of {len(file_paths)} files already in {manifest_path}")
+            file_paths = remaining
+
+        total_files = len(file_paths)
+        successful = 0
+        print(f"🔄 Processing {total_files} files with {workers} worker{'s' if workers > 1 else ''}, "
+              f"appending results to {manifest_path}...")
+        with manifest:
+            for i, record in enumerate(self.manifest_records(file_paths, language, workers), 1):
+                manifest.append(record)
+                name = os.path.basename(record["file"])
+                if record["status"] == "ok":
+                    successful += 1
+                    print(f"✅ [{i}/{total_files}] {name} ({record['detected_language']}, "
+                          f"{record['timings']['total_ms']:.0f} ms)")
+                else:
+                    print(f"❌ [{i}/{total_files}] {name}: {record['error']}")
+
+        print(f"\n📊 Summary: {successful}/{total_files} files successfully transcribed"
+              + (f", {skipped} skipped as already done" if skipped else ""))
+        self.report_avoided_probes(avoided_before)
+        print(f"💾 Results saved to: {manifest_path}")
+        return {"total": total_files, "successful": successful, "failed": total_files - successful,
+                "skipped": skipped}
+
+    def batch_process_files(self, file_paths, language="auto", output_file=None, workers=1, resume=False):
+        """Process multiple files and optionally save to output file; returns the run summary
+
+        A .jsonl output file is written incrementally (see batch_to_manifest).
+        With workers > 1 the files are decoded and recognized concurrently;
+        results are still reported and saved in input order.
+        """
+        if is_manifest_path(output_file):
+            return self.batch_to_manifest(file_paths, language, output_file, workers, resume)
+
+        avoided_before = self.language_priors.probes_avoided
         results = []
         successful = 0
         total_files = len(file_paths)
-        
-        print(f"🔄 Processing {total_files} files...")
-        
-        for i, file_path in enumerate(file_paths, 1):
+
+        if workers > 1:
+            print(f"🔄 Processing {total_files} files with {workers} workers...")
+            outcomes = self.parallel_transcribe(file_paths, language, workers)
+        else:
+            print(f"🔄 Processing {total_files} files...")
+            outcomes = ({"file": file_path} for file_path in file_paths)
+
+        for i, record in enumerate(outcomes, 1):
+            file_path = record["file"]
             print(f"\n--- Processing file {i}/{total_files}: {os.path.basename(file_path)} ---")
-            text = self.transcribe_file(file_path, language)
-            
+            if workers > 1:
+                text = None
+                if record["status"] == "ok":
+                    text = record["text"]
+                    if language == "auto":
+                        text = f"{text} [Auto-detected: {record['detected_language']}]"
+                    print(f"📝 Transcription ({language}): {text}")
+                else:
+                    print(f"❌ File processing error: {record['error']}")
+            else:
+                text = self.transcribe_file(file_path, language)
+
             if text:
                 result = f"File: {os.path.basename(file_path)}\nTranscription: {text}\n"
                 results.append(result)
@@ -159,6 +396,7 @@ class AudioFileToTextConverter:
                 print("❌ Failed")
         
         print(f"\n📊 Summary: {successful}/{total_files} files successfully transcribed")
+        self.report_avoided_probes(avoided_before)
         
         if output_file and results:
             try:
@@ -175,23 +413,118 @@ class AudioFileToTextConverter:
             except Exception as e:
                 print(f"❌ Failed to save results: {e}")
         
-        return results
+        return {"total": total_files, "successful": successful, "failed": total_files - successful, "skipped": 0}
+
+    def watch_and_transcribe(self, watcher, language="auto", output_file=None, workers=1, resume=False):
+        """Transcribe files as they land in a watched directory until interrupted (Ctrl+C)
+
+        Ready files go to a bounded pool: decoding in persistent decoder
+        processes, recognition in threads. When every slot is busy the watcher stops
+        polling until one frees up, so a burst of arrivals queues on disk
+        rather than in memory. Results are printed, and appended to a .jsonl
+        output, in completion order. Returns the run summary.
+        """
+        manifest = BatchManifest(output_file) if output_file else None
+        completed = manifest.completed() if manifest and resume else {}
+        avoided_before = self.language_priors.probes_avoided
+        slots = threading.BoundedSemaphore(workers * 2)
+        counts = {"successful": 0, "failed": 0, "skipped": 0}
+        lock = threading.Lock()
+
+        def finished(future):
+            try:
+                record = future.result()
+            except Exception as e:  # cancelled during shutdown
+                print(f"❌ File processing error: {e}")
+                slots.release()
+                return
+            if manifest:
+                manifest.append(record)
+            with lock:
+                counts["successful" if record["status"] == "ok" else "failed"] += 1
+            if record["status"] == "ok":
+                text = record["text"]
+                if language == "auto":
+                    text = f"{text} [Auto-detected: {record['detected_language']}]"
+                print(f"✅ {record['file']} ({record['timings']['total_ms']:.0f} ms): {text}")
+            else:
+                print(f"❌ {record['file']}: {record['error']}")
+            slots.release()
+
+        print(f"👀 Watching {watcher.directory} for {', '.join(watcher.patterns)} "
+              f"(every {watcher.interval:g}s, {watcher.debounce:g}s debounce, {workers} workers)")
+        print("⏹️  Press Ctrl+C to stop")
+        with (manifest or contextlib.nullcontext()), DecoderPool(workers) as pool, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as decoders, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recognize") as recognizers:
+            try:
+                for file_path in watcher.watch():
+                    if completed and manifest.is_done(file_path, completed):
+                        counts["skipped"] += 1
+                        continue
+                    slots.acquire()
+                    print(f"📥 New file: {file_path}")
+                    load = decoders.submit(load_for_batch, file_path, pool)
+                    recognizers.submit(self.transcribe_record, file_path, language, load).add_done_callback(finished)
+            except KeyboardInterrupt:
+                print("\n⏹️  Stopping; finishing files already in progress...")
+
+        print(f"\n📊 Summary: {counts['successful']} transcribed, {counts['failed']} failed"
+              + (f", {counts['skipped']} skipped as already done" if counts["skipped"] else ""))
+        self.report_avoided_probes(avoided_before)
+        return counts
 
 def main():
     parser = argparse.ArgumentParser(description="Audio File to Text Converter (CLI)")
     parser.add_argument("--file", "-f", help="Single audio file path")
     parser.add_argument("--files", nargs="+", help="Multiple audio files for batch processing")
+    parser.add_argument("--dir", "-d", help="Directory of audio files for batch processing")
+    parser.add_argument("--pattern", "-p", action="append",
+                      help="Glob filter for --dir, repeatable; patterns with a '/' match the relative path "
+                           "(default: common audio extensions)")
+    parser.add_argument("--no-recursive", action="store_true", help="Only look at the top level of --dir")
+    parser.add_argument("--watch", action="store_true",
+                      help="Keep running and transcribe new files as they appear in --dir")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                      help=f"Seconds between directory scans in --watch mode (default: {DEFAULT_POLL_INTERVAL:g})")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                      help=f"Seconds a new file must stay unchanged before it is picked up (default: {DEFAULT_DEBOUNCE:g})")
     parser.add_argument("--language", "-l", choices=["en-IN", "hi-IN", "auto"], default="auto",
                       help="Language for transcription (default: auto)")
-    parser.add_argument("--output", "-o", help="Output file for saving results")
+    parser.add_argument("--output", "-o",
+                      help="Output file for saving results (.jsonl: one record appended per finished file)")
+    parser.add_argument("--resume", action="store_true",
+                      help="Skip files already transcribed in the --output .jsonl manifest")
     parser.add_argument("--debug", action="store_true",
                       help="Enable debug mode with detailed error information")
-    
+    parser.add_argument("--chunk-seconds", type=float, default=DEFAULT_CHUNK_SECONDS,
+                      help=f"Split recordings longer than this at silences (default: {DEFAULT_CHUNK_SECONDS:.0f}, 0 disables)")
+    parser.add_argument("--chunk-workers", type=int, default=DEFAULT_CHUNK_WORKERS,
+                      help=f"Parallel chunk transcriptions within one file (default: {DEFAULT_CHUNK_WORKERS})")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                      help="Files processed in parallel in batch mode: decoding in worker processes, "
+                           "recognition in threads (default: 1)")
+    parser.add_argument("--no-vad", action="store_true",
+                      help="Send audio to the recognizer even when no speech is detected, without trimming silence")
+
     args = parser.parse_args()
-    
+    if args.chunk_seconds < 0 or args.chunk_workers < 1 or args.workers < 1:
+        parser.error("--chunk-seconds must be >= 0, --chunk-workers and --workers >= 1")
+    if args.resume and not is_manifest_path(args.output):
+        parser.error("--resume needs a .jsonl --output manifest")
+    if args.dir and not os.path.isdir(args.dir):
+        parser.error(f"--dir {args.dir} is not a directory")
+    if args.watch and not args.dir:
+        parser.error("--watch needs --dir")
+    if args.watch and args.output and not is_manifest_path(args.output):
+        parser.error("--watch appends results as they finish; use a .jsonl --output")
+    if args.poll_interval <= 0 or args.debounce < 0:
+        parser.error("--poll-interval must be > 0 and --debounce >= 0")
+    patterns = tuple(args.pattern) if args.pattern else AUDIO_PATTERNS
+
     # Create converter instance
     try:
-        converter = AudioFileToTextConverter()
+        converter = AudioFileToTextConverter(args.chunk_seconds, args.chunk_workers, vad=not args.no_vad)
     except Exception as e:
         print(f"❌ Failed to initialize converter: {e}")
         if args.debug:
@@ -206,7 +539,11 @@ def main():
     print()
     
     try:
-        if args.file:
+        if args.file and is_manifest_path(args.output):
+            # A manifest gets the same record for one file as for a batch
+            converter.batch_process_files([args.file], args.language, args.output, resume=args.resume)
+
+        elif args.file:
             # Process single file
             print("📁 Single file mode")
             text = converter.transcribe_file(args.file, args.language)
@@ -221,15 +558,34 @@ def main():
         elif args.files:
             # Process multiple files
             print("📁 Batch processing mode")
-            converter.batch_process_files(args.files, args.language, args.output)
+            converter.batch_process_files(args.files, args.language, args.output, args.workers, args.resume)
+
+        elif args.dir and args.watch:
+            # Keep transcribing new arrivals
+            print("📁 Watch mode")
+            watcher = DirectoryWatcher(args.dir, patterns, recursive=not args.no_recursive,
+                                       interval=args.poll_interval, debounce=args.debounce)
+            converter.watch_and_transcribe(watcher, args.language, args.output, args.workers, args.resume)
+
+        elif args.dir:
+            # Process every matching file under a directory
+            print("📁 Directory mode")
+            file_paths = scan_directory(args.dir, patterns, recursive=not args.no_recursive)
+            print(f"🔎 Found {len(file_paths)} matching files in {args.dir}")
+            if file_paths:
+                converter.batch_process_files(file_paths, args.language, args.output, args.workers, args.resume)
         
         else:
             # No files specified, show help
-            print("❌ Error: Please specify either --file or --files")
+            print("❌ Error: Please specify --file, --files or --dir")
             print("\nExamples:")
             print("  Single file:    python audio_file_to_text_cli.py --file audio.wav")
             print("  Multiple files: python audio_file_to_text_cli.py --files file1.wav file2.mp3")
+            print("  In parallel:    python audio_file_to_text_cli.py --files *.mp3 --workers 8")
             print("  With output:    python audio_file_to_text_cli.py --file audio.wav --output result.txt")
+            print("  Resumable run:  python audio_file_to_text_cli.py --files *.mp3 --output run.jsonl --resume")
+            print("  Directory:      python audio_file_to_text_cli.py --dir recordings --pattern '*.mp3'")
+            print("  Watch folder:   python audio_file_to_text_cli.py --dir inbox --watch --workers 4 --output inbox.jsonl")
             print("  Hindi only:     python audio_file_to_text_cli.py --file audio.wav --language hi-IN")
             print("  English only:   python audio_file_to_text_cli.py --file audio.wav --language en-IN")
             sys.exit(1)
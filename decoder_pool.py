@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Persistent Decoder Worker Pool
+Long-lived worker processes that decode audio to normalized PCM, shared by the API and the CLI batch path
+Input is streamed to a worker over a pipe and PCM streamed back; workers are health-checked and restarted
+"""
+
+import os
+import sys
+import json
+import queue
+import struct
+import argparse
+import tempfile
+import threading
+import subprocess
+import speech_recognition as sr
+from audio_io import (AudioDecodeError, DECODE_WINDOW_BYTES, native_windows, decode_audio_with_stats, decoder_engine,
+                      normalization_target, normalized_with_stats)
+from audio_format import probe_audio
+
+PIPE_CHUNK_BYTES = 1024 * 1024
+DEFAULT_DECODER_TIMEOUT = 60.0
+DEFAULT_DECODER_MAX_JOBS = 1000
+DEFAULT_HEALTH_INTERVAL = 30.0
+PING_TIMEOUT = 5.0
+
+class WorkerLost(Exception):
+    """The worker died or stopped answering mid-request"""
+
+# Wire format on the worker's stdin and stdout: frames of a 4-byte little-endian length and a payload.
+# A request or reply is one JSON frame; audio follows as data frames ending with an empty one.
+
+def write_frame(stream, data):
+    stream.write(struct.pack("<I", len(data)))
+    stream.write(data)
+
+def read_frame(stream):
+    header = stream.read(4)
+    if len(header) < 4:
+        raise EOFError("pipe closed")
+    size = struct.unpack("<I", header)[0]
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("pipe closed")
+    return data
+
+def write_stream(stream, payload):
+    """Write bytes, or a binary stream read a frame at a time, as data frames followed by the empty end frame"""
+    if hasattr(payload, "read"):
+        for block in iter(lambda: payload.read(PIPE_CHUNK_BYTES), b""):
+            write_frame(stream, block)
+    else:
+        view = memoryview(payload)
+        for offset in range(0, len(view), PIPE_CHUNK_BYTES):
+            write_frame(stream, view[offset:offset + PIPE_CHUNK_BYTES])
+    write_frame(stream, b"")
+
+def serve(requests, replies, engine=None):
+    """Worker loop: answer ping and decode requests until stdin closes"""
+    while True:
+        try:
+            request = json.loads(read_frame(requests))
+        except EOFError:
+            return
+        if request["op"] == "ping":
+            write_frame(replies, json.dumps({"ok": True, "pid": os.getpid(), "engine": decoder_engine(engine)}).encode())
+            replies.flush()
+            continue
+
+        if "path" in request:
+            source = request["path"]
+        else:
+            # Large inputs spill to disk, so a worker's memory stays bounded like the server's
+            source = tempfile.SpooledTemporaryFile(max_size=DECODE_WINDOW_BYTES)
+            for block in iter(lambda: read_frame(requests), b""):
+                source.write(block)
+            source.seek(0)
+        try:
+            audio_data, stats = decode_audio_with_stats(source, request["filename"], request["sample_rate"],
+                                                        request["sample_width"], engine=engine)
+        except Exception as e:
+            write_frame(replies, json.dumps({"ok": False, "error": str(e)}).encode())
+            replies.flush()
+            continue
+        finally:
+            if "path" not in request:
+                source.close()
+        write_frame(replies, json.dumps({"ok": True, "sample_rate": audio_data.sample_rate,
+                                         "sample_width": audio_data.sample_width, "stats": stats}).encode())
+        write_stream(replies, audio_data.frame_data)
+        replies.flush()
+
+class DecoderWorker:
+    """One decoder process (this module run with --serve) and the pipes to it
+
+    Workers are plain subprocesses rather than multiprocessing children, so
+    they never re-import the server's __main__ module.
+    """
+
+    def __init__(self, engine=None):
+        command = [sys.executable, os.path.abspath(__file__), "--serve"]
+        if engine:
+            command += ["--engine", engine]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.jobs = 0
+        self._timed_out = False
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def call(self, request, payload=None, timeout=DEFAULT_DECODER_TIMEOUT):
+        """Send a request (and its input bytes); returns (reply, output bytes or None)
+
+        A watchdog kills the worker at the deadline, which turns the blocked
+        read into WorkerLost("timed out").
+        """
+        watchdog = threading.Timer(timeout, self._expire)
+        watchdog.start()
+        try:
+            write_frame(self.process.stdin, json.dumps(request).encode())
+            if payload is not None:
+                write_stream(self.process.stdin, payload)
+            self.process.stdin.flush()
+            reply = json.loads(read_frame(self.process.stdout))
+            output = None
+            if reply["ok"] and request["op"] == "decode":
+                output = bytearray()
+                for block in iter(lambda: read_frame(self.process.stdout), b""):
+                    output += block
+            return reply, output
+        except (EOFError, OSError, ValueError):
+            raise WorkerLost("timed out" if self._timed_out else "exited")
+        finally:
+            watchdog.cancel()
+
+    def _expire(self):
+        self._timed_out = True
+        self.process.kill()
+
+    def ping(self, timeout=PING_TIMEOUT):
+        """The worker's ping reply, or None when it is dead or unresponsive"""
+        if not self.alive():
+            return None
+        try:
+            return self.call({"op": "ping"}, timeout=timeout)[0]
+        except WorkerLost:
+            return None
+
+    def stop(self):
+        try:
+            self.process.stdin.close()  # the worker exits at end of input
+            self.process.wait(1.0)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+
+class DecoderPool:
+    """Fixed set of long-lived decoder processes shared by concurrent callers
+
+    Workers start on first use. A worker that dies, misses the decode
+    timeout or fails a health check is replaced; each is also recycled
+    after max_jobs decodes. Inside a worker, non-WAV input is decoded by
+    PyAV when it is installed (no process per file), else through an
+    ffmpeg pipe. Either way the decode and the normalization run outside
+    the caller's process and its GIL.
+    """
+
+    def __init__(self, size, timeout=DEFAULT_DECODER_TIMEOUT, max_jobs=DEFAULT_DECODER_MAX_JOBS,
+                 health_interval=DEFAULT_HEALTH_INTERVAL, engine=None):
+        self.size = size
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.health_interval = health_interval
+        self.engine = engine
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = threading.Event()
+        self.decoded = 0
+        self.native = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.restarts = 0
+        self.recycled = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Start the workers and the health monitor (decode() does this on first use)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._idle.put(DecoderWorker(self.engine))
+        if self.health_interval:
+            threading.Thread(target=self._monitor, name="decoder-health", daemon=True).start()
+
+    def _replace(self, worker):
+        worker.stop()
+        with self._lock:
+            self.restarts += 1
+        return DecoderWorker(self.engine)
+
+    def decode(self, source, filename=None, sample_rate=None, sample_width=None, info=None):
+        """Decode a path or binary stream in a worker; returns (sr.AudioData, stats) like decode_audio_with_stats
+
+        PCM WAV and AIFF (by their header, see audio_format) are still read in
+        the calling process: copying them out costs less than shipping them to
+        a worker. info is the source's probe_audio result when already known.
+        """
+        if sample_rate is None or sample_width is None:
+            default_rate, default_width = normalization_target()
+            sample_rate = default_rate if sample_rate is None else sample_rate
+            sample_width = default_width if sample_width is None else sample_width
+        if filename is None and isinstance(source, (str, os.PathLike)):
+            filename = os.fspath(source)
+
+        pcm = native_windows(source, info or probe_audio(source))
+        if pcm is not None:
+            with self._lock:
+                self.native += 1
+            return normalized_with_stats(pcm, sample_rate, sample_width)
+
+        request = {"op": "decode", "filename": filename, "sample_rate": sample_rate, "sample_width": sample_width}
+        payload = None
+        if isinstance(source, (str, os.PathLike)):
+            request["path"] = os.path.abspath(source)
+        else:
+            payload = source.getbuffer() if hasattr(source, "getbuffer") else source  # streamed, never read whole
+
+        self.start()
+        worker = self._idle.get()
+        try:
+            if not worker.alive():
+                worker = self._replace(worker)
+            reply, output = worker.call(request, payload, self.timeout)
+        except WorkerLost as e:
+            with self._lock:
+                self.failed += 1
+                if str(e) == "timed out":
+                    self.timeouts += 1
+                else:
+                    self.crashes += 1
+            worker = self._replace(worker)
+            raise AudioDecodeError(f"Decoder worker {e} while decoding {os.path.basename(filename or 'input')}")
+        finally:
+            self._release(worker)
+
+        with self._lock:
+            if reply["ok"]:
+                self.decoded += 1
+            else:
+                self.failed += 1
+        if not reply["ok"]:
+            raise AudioDecodeError(reply["error"])
+        return sr.AudioData(bytes(output), reply["sample_rate"], reply["sample_width"]), reply["stats"]
+
+    def _release(self, worker):
+        """Return a worker to the idle set, recycling it once it has done max_jobs decodes"""
+        worker.jobs += 1
+        if self.max_jobs and worker.jobs >= self.max_jobs:
+            worker = self._replace(worker)
+            with self._lock:
+                self.recycled += 1
+        self._idle.put(worker)
+
+    def health_check(self):
+        """Ping every idle worker and replace any that is dead or does not answer; returns how many were replaced
+
+        Busy workers are covered by the decode timeout instead. Workers are
+        taken out one at a time, so decode() callers are never short of more
+        than the one being pinged.
+        """
+        replaced = 0
+        for _ in range(self._idle.qsize()):  # the idle queue is FIFO: each worker comes round once
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker.ping() is None:
+                worker = self._replace(worker)
+                replaced += 1
+            self._idle.put(worker)
+        return replaced
+
+    def _monitor(self):
+        while not self._closed.wait(self.health_interval):
+            self.health_check()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.size,
+                "started": self._started,
+                "engine": decoder_engine(self.engine),
+                "idle": self._idle.qsize(),
+                "decoded": self.decoded,
+                "native": self.native,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "crashes": self.crashes,
+                "restarts": self.restarts,
+                "recycled": self.recycled,
+                "timeout_seconds": self.timeout,
+                "max_jobs": self.max_jobs,
+            }
+
+    def close(self):
+        """Stop the health monitor and every idle worker"""
+        self._closed.set()
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+def create_decoder_pool():
+    """Build the shared decoder pool from environment configuration; None when disabled
+
+    DECODER_WORKERS          decoder processes (default: CPU count with PyAV, else 0: decodes in the calling thread)
+    DECODER_TIMEOUT          seconds a decode may take before its worker is restarted (default 60)
+    DECODER_MAX_JOBS         decodes before a worker is recycled (default 1000, 0 never)
+    DECODER_HEALTH_INTERVAL  seconds between health checks of idle workers (default 30, 0 disables)
+    """
+    # Without PyAV a worker only relays to an ffmpeg process, which the calling thread can start itself
+    default_size = (os.cpu_count() or 1) if decoder_engine() == "pyav" else 0
+    size = int(os.environ.get("DECODER_WORKERS", default_size))
+    if size <= 0:
+        return None
+    return DecoderPool(
+        size,
+        timeout=float(os.environ.get("DECODER_TIMEOUT", DEFAULT_DECODER_TIMEOUT)),
+        max_jobs=int(os.environ.get("DECODER_MAX_JOBS", DEFAULT_DECODER_MAX_JOBS)),
+        health_interval=float(os.environ.get("DECODER_HEALTH_INTERVAL", DEFAULT_HEALTH_INTERVAL)),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Decoder worker (started by DecoderPool)")
+    parser.add_argument("--serve", action="store_true", help="Serve decode requests on stdin/stdout")
+    parser.add_argument("--engine", choices=["auto", "pyav", "ffmpeg"], help="Decoder for non-WAV input")
+    args = parser.parse_args()
+    if not args.serve:
+        parser.error("decoder_pool.py only runs as a DecoderPool worker (--serve)")
+
+    # Replies own the real stdout; anything a library prints goes to stderr instead
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve(sys.stdin.buffer, replies, args.engine)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Directory Ingest
+Finds audio files under a directory with glob filters, once or continuously
+Watch mode polls for new files and only hands them out once they stop changing
+"""
+
+import os
+import time
+import fnmatch
+
+AUDIO_PATTERNS = ("*.wav", "*.wave", "*.mp3", "*.m4a", "*.flac", "*.aac", "*.ogg", "*.aiff", "*.aif")
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 2.0
+
+def matches(relative_path, patterns):
+    """Case-insensitive glob match; patterns without a slash match the file name at any depth"""
+    relative_path = relative_path.replace(os.sep, "/").lower()
+    name = relative_path.rsplit("/", 1)[-1]
+    for pattern in patterns:
+        pattern = pattern.lower()
+        if fnmatch.fnmatchcase(relative_path if "/" in pattern else name, pattern):
+            return True
+    return False
+
+def scan_directory(directory, patterns=AUDIO_PATTERNS, recursive=True):
+    """Sorted paths of matching files under directory (hidden files and folders are skipped)"""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".")) if recursive else []
+        for name in files:
+            if name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            if matches(os.path.relpath(path, directory), patterns):
+                found.append(path)
+    return sorted(found)
+
+class DirectoryWatcher:
+    """Polls a directory and reports each matching file once it has settled
+
+    A file is ready when its size and modification time have not changed
+    for `debounce` seconds, so files still being copied in are left alone.
+    A file that is later rewritten is reported again.
+    """
+
+    def __init__(self, directory, patterns=AUDIO_PATTERNS, recursive=True,
+                 interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        self.directory = directory
+        self.patterns = patterns
+        self.recursive = recursive
+        self.interval = interval
+        self.debounce = debounce
+        self._pending = {}     # path -> (signature, time it was first seen with that signature)
+        self._dispatched = {}  # path -> signature handed out
+
+    def poll(self, now=None):
+        """Scan once; returns files that became ready since the last poll"""
+        now = time.monotonic() if now is None else now
+        ready = []
+        present = set()
+        for path in scan_directory(self.directory, self.patterns, self.recursive):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed between listing and stat
+            present.add(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._dispatched.get(path) == signature:
+                continue
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != signature:
+                self._pending[path] = (signature, now)
+            elif now - seen[1] >= self.debounce and stat.st_size > 0:
+                del self._pending[path]
+                self._dispatched[path] = signature
+                ready.append(path)
+
+        # Forget files that disappeared so a new file with the same name counts as new
+        for path in list(self._pending):
+            if path not in present:
+                del self._pending[path]
+        for path in list(self._dispatched):
+            if path not in present:
+                del self._dispatched[path]
+        return ready
+
+    def watch(self):
+        """Yield ready files forever, polling every `interval` seconds"""
+        while True:
+            for path in self.poll():
+                yield path
+            time.sleep(self.interval)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in Recognizer Server
+Speaks the Google Web Speech API v2 wire protocol used by recognizer_backend.py
+Returns deterministic transcripts so the pipeline can be benchmarked offline
+Can inject faults (errors, throttling, dropped connections, outages) to exercise client resilience
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+RECOGNIZE_PATH = "/speech-api/v2/recognize"
+FAULT_SETTINGS = ("error_rate", "error_status", "drop_rate", "quota_rps", "outage")
+
+VOCABULARY = {
+    "en-IN": ["hello", "this", "is", "a", "test", "recording", "of", "the", "meeting", "today",
+              "please", "share", "your", "notes", "with", "team", "thank", "you"],
+    "hi-IN": ["नमस्ते", "यह", "एक", "परीक्षण", "रिकॉर्डिंग", "है", "आज", "की", "बैठक", "में",
+              "कृपया", "अपने", "नोट्स", "साझा", "करें", "धन्यवाद"],
+}
+
+def spoken_language(digest, hindi_share):
+    """Pick the language an audio payload is 'spoken' in from its digest"""
+    return "hi-IN" if digest[0] / 256 < hindi_share else "en-IN"
+
+def fake_transcript(digest, language):
+    """Build a deterministic transcript for an audio payload"""
+    words = VOCABULARY.get(language, VOCABULARY["en-IN"])
+    count = 4 + digest[1] % 8
+    return " ".join(words[digest[2 + i] % len(words)] for i in range(count))
+
+class FakeRecognizerHandler(BaseHTTPRequestHandler):
+    """Request handler for the stand-in recognizer"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+        if self.server.handshake:
+            time.sleep(self.server.handshake)  # stands in for TCP/TLS setup round-trips
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, content_type="application/json; charset=utf-8"):
+        """Send a response with a Content-Length so the connection stays open"""
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/stats":
+            self.send_body(200, json.dumps(self.server.stats()))
+        elif path == "/faults":
+            self.send_body(200, json.dumps(self.server.faults()))
+        else:
+            self.send_body(404, json.dumps({"error": "not found"}))
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if parts.path == "/faults":
+            self.server.set_faults(**json.loads(body or b"{}"))
+            self.send_body(200, json.dumps(self.server.faults()))
+            return
+        if parts.path != RECOGNIZE_PATH:
+            self.send_body(404, json.dumps({"error": "not found"}))
+            return
+
+        self.server.count("requests")
+        self.server.count("bytes_received", len(body))
+        fault = self.server.pick_fault()
+        if fault == "drop":
+            self.close_connection = True  # hang up without an answer
+            return
+        if fault is not None:
+            status, retry_after = fault
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", "0")
+            if retry_after is not None:
+                self.send_header("Retry-After", str(retry_after))
+            self.end_headers()
+            return
+        if self.server.bandwidth:
+            time.sleep(len(body) / self.server.bandwidth)  # stands in for a slow uplink
+        language = parse_qs(parts.query).get("lang", ["en-US"])[0]
+        digest = hashlib.sha256(body).digest()
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        # Same framing as Google: an empty result block, then the final result
+        lines = ['{"result":[]}']
+        if body and spoken_language(digest, self.server.hindi_share) == language:
+            result = {
+                "result": [{
+                    "alternative": [{"transcript": fake_transcript(digest, language), "confidence": 0.92}],
+                    "final": True,
+                }],
+                "result_index": 0,
+            }
+            lines.append(json.dumps(result, ensure_ascii=False))
+        self.send_body(200, "\n".join(lines) + "\n")
+
+class FakeRecognizerServer(ThreadingHTTPServer):
+    """Threaded stand-in recognizer with request and connection counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, handshake=0.0, hindi_share=0.5, verbose=False, bandwidth=0.0,
+                 seed=0, **faults):
+        super().__init__(address, FakeRecognizerHandler)
+        self.latency = latency
+        self.handshake = handshake
+        self.bandwidth = bandwidth  # bytes per second, 0 for unlimited
+        self.hindi_share = hindi_share
+        self.verbose = verbose
+        self._counters = {"connections": 0, "requests": 0, "bytes_received": 0, "faults": 0, "throttled": 0}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._window = (0, 0)  # (second, requests served in it) for the quota
+        self.error_rate = 0.0   # share of requests answered with error_status
+        self.error_status = 503
+        self.drop_rate = 0.0    # share of requests whose connection is closed unanswered
+        self.quota_rps = 0      # requests per second before answering 429, 0 for no quota
+        self.outage = False     # answer every request with error_status
+        self.set_faults(**faults)
+
+    def set_faults(self, **settings):
+        """Change fault injection settings (any of FAULT_SETTINGS)"""
+        unknown = set(settings) - set(FAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown fault settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            for name, value in settings.items():
+                setattr(self, name, value)
+
+    def faults(self):
+        """Current fault injection settings"""
+        with self._lock:
+            return {name: getattr(self, name) for name in FAULT_SETTINGS}
+
+    def pick_fault(self):
+        """Decide whether this request fails: None, "drop" or (status, retry_after)"""
+        with self._lock:
+            if self.quota_rps:
+                second = int(time.monotonic())
+                window, served = self._window
+                served = served + 1 if window == second else 1
+                self._window = (second, served)
+                if served > self.quota_rps:
+                    self._counters["throttled"] += 1
+                    return 429, 1
+            if self.outage or self._random.random() < self.error_rate:
+                self._counters["faults"] += 1
+                return self.error_status, None
+            if self._random.random() < self.drop_rate:
+                self._counters["faults"] += 1
+                return "drop"
+            return None
+
+    def count(self, name, amount=1):
+        """Increment a counter"""
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        """Snapshot of the counters"""
+        with self._lock:
+            return dict(self._counters)
+
+    @property
+    def url(self):
+        """Recognizer URL to use as RECOGNIZER_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{RECOGNIZE_PATH}"
+
+def start_fake_server(host="127.0.0.1", port=0, latency=0.0, handshake=0.0, hindi_share=0.5, bandwidth=0.0,
+                      **faults):
+    """Start a stand-in recognizer in a background thread and return it
+
+    faults are initial fault injection settings (see FAULT_SETTINGS); they
+    can be changed later with set_faults() or a POST to /faults.
+    """
+    server = FakeRecognizerServer((host, port), latency=latency, handshake=handshake,
+                                  hindi_share=hindi_share, bandwidth=bandwidth, **faults)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in speech recognizer server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                      help="Simulated recognition latency per request")
+    parser.add_argument("--handshake-ms", type=float, default=0.0,
+                      help="Simulated connection setup cost per new connection")
+    parser.add_argument("--hindi-share", type=float, default=0.5,
+                      help="Fraction of payloads recognized as Hindi (default: 0.5)")
+    parser.add_argument("--uplink-kbps", type=float, default=0.0,
+                      help="Simulated upload bandwidth in kilobits per second (default: unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                      help="Fraction of requests answered with --error-status (default: 0)")
+    parser.add_argument("--error-status", type=int, default=503, help="Status for injected errors (default: 503)")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                      help="Fraction of requests whose connection is closed unanswered (default: 0)")
+    parser.add_argument("--quota-rps", type=int, default=0,
+                      help="Requests per second before answering 429 (default: no quota)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = FakeRecognizerServer((args.host, args.port), latency=args.latency_ms / 1000.0,
+                                  handshake=args.handshake_ms / 1000.0, hindi_share=args.hindi_share,
+                                  verbose=args.verbose, bandwidth=args.uplink_kbps * 1000 / 8,
+                                  error_rate=args.error_rate, error_status=args.error_status,
+                                  drop_rate=args.drop_rate, quota_rps=args.quota_rps)
+    print("🧪 Stand-in recognizer running")
+    print(f"🔗 RECOGNIZER_URL={server.url}")
+    print(f"📊 Stats: http://{args.host}:{args.port}/stats")
+    print(f"💥 Faults: http://{args.host}:{args.port}/faults (POST JSON to change)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
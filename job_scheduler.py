@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Duration-Aware Job Scheduler
+Orders waiting transcriptions shortest-first within weighted fair shares per client
+Anything that has waited past the starvation limit goes first, oldest first
+"""
+
+import os
+import time
+import itertools
+import threading
+
+DEFAULT_STARVATION_SECONDS = 60.0
+MIN_JOB_SECONDS = 1.0            # a clip under a second still costs a recognizer round-trip
+UNKNOWN_BYTES_PER_SECOND = 16000  # 128 kbit/s, for uploads whose header gave no duration
+PRIORITY_CLASSES = (("short", 30.0), ("medium", 300.0), ("long", float("inf")))
+ANONYMOUS = "anonymous"
+
+def job_cost(audio=None, size=None):
+    """Estimated cost of a transcription in audio seconds
+
+    The header duration (audio, see audio_format) when there is one, else
+    the upload size at 128 kbit/s, else MIN_JOB_SECONDS.
+    """
+    if audio is not None and audio.duration:
+        seconds = audio.duration
+    elif size:
+        seconds = size / UNKNOWN_BYTES_PER_SECOND
+    else:
+        seconds = 0.0
+    return max(seconds, MIN_JOB_SECONDS)
+
+def priority_class(cost):
+    """Name of the priority class a job of `cost` audio seconds falls in"""
+    for name, limit in PRIORITY_CLASSES:
+        if cost <= limit:
+            return name
+    return PRIORITY_CLASSES[-1][0]
+
+class Entry:
+    """One waiting item with the client, cost and class it was scheduled under"""
+
+    def __init__(self, item, client, cost, sequence):
+        self.item = item
+        self.client = client
+        self.cost = cost
+        self.priority = priority_class(cost)
+        self.sequence = sequence
+        self.enqueued = time.monotonic()
+        self.waited = None
+        self.promoted = False
+
+class FairScheduler:
+    """Weighted fair queuing over clients, shortest job first, with aging
+
+    Each client has a virtual finish time that grows by cost / weight for
+    every job of theirs that is dispatched. The next job is the one that
+    would finish earliest in virtual time, client's finish + cost / weight,
+    so short jobs win and a client that has just had a lot of audio
+    transcribed waits behind one that has not. The clock follows the start
+    time of the jobs dispatched, and a client with nothing queued is moved
+    up to it when a job arrives, so being idle earns no credit. Entries
+    older than starvation_seconds skip all of this and go oldest first.
+    Queues are no deeper than the job queue limit, so each pop scans them
+    rather than keeping a heap per client.
+    """
+
+    def __init__(self, weights=None, starvation_seconds=DEFAULT_STARVATION_SECONDS, on_dispatch=None):
+        self.weights = dict(weights or {})
+        self.starvation_seconds = starvation_seconds
+        self.on_dispatch = on_dispatch  # called with each dispatched Entry (entry.waited is set)
+        self._lock = threading.Lock()
+        self._entries = []
+        self._finish = {}   # client -> virtual finish time of its last dispatched job
+        self._queued = {}   # client -> entries waiting
+        self._sequence = itertools.count()
+        self.virtual_time = 0.0
+        self.promoted = 0
+        self._classes = {name: {"queued": 0, "dispatched": 0, "wait_total": 0.0, "wait_max": 0.0}
+                         for name, _ in PRIORITY_CLASSES}
+
+    def push(self, item, client=None, cost=None):
+        """Queue item for client with an estimated cost in audio seconds (default MIN_JOB_SECONDS); returns its Entry"""
+        cost = MIN_JOB_SECONDS if cost is None else cost
+        entry = Entry(item, client or ANONYMOUS, cost, next(self._sequence))
+        with self._lock:
+            if entry.client not in self._queued:
+                self._finish[entry.client] = max(self._finish.get(entry.client, 0.0), self.virtual_time)
+            self._entries.append(entry)
+            self._queued[entry.client] = self._queued.get(entry.client, 0) + 1
+            self._classes[entry.priority]["queued"] += 1
+        return entry
+
+    def pop(self):
+        """Take the entry that should run next; None when nothing is waiting"""
+        with self._lock:
+            if not self._entries:
+                return None
+            now = time.monotonic()
+            starving = [entry for entry in self._entries if now - entry.enqueued >= self.starvation_seconds]
+            if starving:
+                entry = min(starving, key=lambda entry: entry.sequence)
+                entry.promoted = True
+                self.promoted += 1
+            else:
+                entry = min(self._entries, key=lambda entry: (self._tag(entry), entry.sequence))
+            start = self._finish[entry.client]
+            self._finish[entry.client] = start + entry.cost / self.weight(entry.client)
+            self.virtual_time = max(self.virtual_time, start)
+            self._remove(entry)
+            entry.waited = now - entry.enqueued
+            totals = self._classes[entry.priority]
+            totals["dispatched"] += 1
+            totals["wait_total"] += entry.waited
+            totals["wait_max"] = max(totals["wait_max"], entry.waited)
+        if self.on_dispatch is not None:
+            self.on_dispatch(entry)
+        return entry
+
+    def remove(self, entry):
+        """Withdraw an entry that is still waiting (its caller gave up); returns False if it was already popped"""
+        with self._lock:
+            if entry not in self._entries:
+                return False
+            self._remove(entry)
+            return True
+
+    def weight(self, client):
+        return self.weights.get(client, 1.0)
+
+    def _tag(self, entry):
+        """Virtual finish time of entry if it were dispatched next"""
+        return self._finish[entry.client] + entry.cost / self.weight(entry.client)
+
+    def _remove(self, entry):
+        """Drop a waiting entry, and its client's finish time once that no longer matters (lock held)"""
+        self._entries.remove(entry)
+        self._classes[entry.priority]["queued"] -= 1
+        self._queued[entry.client] -= 1
+        if not self._queued[entry.client]:
+            del self._queued[entry.client]
+        # Idle clients at or behind the clock start from the clock anyway
+        for client in [client for client, finish in self._finish.items()
+                       if finish <= self.virtual_time and client not in self._queued]:
+            del self._finish[client]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Waiting entries, active clients and queue wait per priority class"""
+        with self._lock:
+            classes = {}
+            for name, totals in self._classes.items():
+                dispatched = totals["dispatched"]
+                classes[name] = {
+                    "queued": totals["queued"],
+                    "dispatched": dispatched,
+                    "wait_mean_seconds": round(totals["wait_total"] / dispatched, 3) if dispatched else None,
+                    "wait_max_seconds": round(totals["wait_max"], 3),
+                }
+            return {
+                "queued": len(self._entries),
+                "clients_waiting": len(self._queued),
+                "weighted_clients": len(self.weights),
+                "starvation_seconds": self.starvation_seconds,
+                "promoted": self.promoted,
+                "classes": classes,
+            }
+
+def parse_weights(text):
+    """Parse "client=weight,client=weight" into a dict; raises ValueError for a bad or non-positive weight"""
+    weights = {}
+    for pair in filter(None, (pair.strip() for pair in (text or "").split(","))):
+        client, _, weight = pair.rpartition("=")
+        if not client or float(weight) <= 0:
+            raise ValueError(f"Invalid client weight {pair!r}; expected client=positive number")
+        weights[client.strip()] = float(weight)
+    return weights
+
+def create_scheduler(on_dispatch=None):
+    """Build a scheduler from environment configuration
+
+    SCHEDULER_CLIENT_WEIGHTS       client=weight pairs, comma separated (X-Client-Id values or key:<hash>; default 1)
+    SCHEDULER_STARVATION_SECONDS   wait after which a job runs ahead of shorter ones (default 60)
+    """
+    return FairScheduler(
+        weights=parse_weights(os.environ.get("SCHEDULER_CLIENT_WEIGHTS", "")),
+        starvation_seconds=float(os.environ.get("SCHEDULER_STARVATION_SECONDS", DEFAULT_STARVATION_SECONDS)),
+        on_dispatch=on_dispatch,
+    )
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Adaptive Language Ordering
+Learns which auto-detect language each client (and all traffic together) usually sends
+Decayed per-language weights decide the probe order and whether one language is probed alone first
+"""
+
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+
+DEFAULT_STATS_PATH = os.path.join(os.path.expanduser("~"), ".cache", "audio_to_text", "language_stats.json")
+GLOBAL_SCOPE = "*"
+
+class LanguagePriors:
+    """Exponentially decayed detection counts, globally and per client, persisted as JSON
+
+    A client's own history is blended with the global mix (worth
+    `client_prior` observations), so a new client starts from what most
+    traffic looks like. When the leading language's share reaches
+    `lead_threshold` with at least `min_weight` observations behind it, it is
+    probed on its own first and the others only if it fails.
+    """
+
+    def __init__(self, path=DEFAULT_STATS_PATH, half_life=7 * 24 * 3600, lead_threshold=0.8,
+                 min_weight=5.0, client_prior=2.0, max_clients=10000, save_interval=30.0):
+        self.path = path
+        self.half_life = half_life
+        self.lead_threshold = lead_threshold
+        self.min_weight = min_weight
+        self.client_prior = client_prior
+        self.max_clients = max_clients
+        self.save_interval = save_interval
+        self._scopes = {}  # scope -> {"weights": {language: weight}, "updated": timestamp}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.time()
+        self.detections = 0
+        self.lead_hits = 0
+        self.lead_misses = 0
+        self.probes_sent = 0
+        self.probes_avoided = 0
+        self._load()
+
+    def _load(self):
+        """Read saved weights; a missing or unreadable file starts from scratch"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        scopes = saved.get("scopes", {}) if isinstance(saved, dict) else {}
+        for scope, entry in scopes.items():
+            if isinstance(entry, dict) and isinstance(entry.get("weights"), dict):
+                self._scopes[scope] = {"weights": dict(entry["weights"]), "updated": float(entry.get("updated", 0))}
+        self.probes_avoided = int(saved.get("probes_avoided", 0))
+
+    def _decayed(self, scope, now):
+        """Weights of one scope decayed to `now` (empty when the scope is unknown)"""
+        entry = self._scopes.get(scope)
+        if entry is None:
+            return {}
+        factor = 0.5 ** (max(0.0, now - entry["updated"]) / self.half_life) if self.half_life else 1.0
+        return {language: weight * factor for language, weight in entry["weights"].items()}
+
+    def shares(self, languages, client=None, now=None):
+        """Estimated probability of each candidate language and the evidence behind it
+
+        Returns ({language: share}, weight); shares are uniform when nothing
+        has been observed yet.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            global_weights = self._decayed(GLOBAL_SCOPE, now)
+            client_weights = self._decayed(client, now) if client else {}
+
+        global_total = sum(global_weights.get(language, 0.0) for language in languages)
+        if global_total > 0:
+            base = {language: global_weights.get(language, 0.0) / global_total for language in languages}
+        else:
+            base = {language: 1.0 / len(languages) for language in languages}
+        if not client:
+            return base, global_total
+
+        client_total = sum(client_weights.get(language, 0.0) for language in languages)
+        prior = self.client_prior if global_total > 0 else 0.0
+        if client_total + prior == 0:
+            return base, 0.0
+        blended = {
+            language: (client_weights.get(language, 0.0) + prior * base[language]) / (client_total + prior)
+            for language in languages
+        }
+        return blended, client_total + global_total
+
+    def plan(self, languages, client=None):
+        """Probe order for the candidates, most likely first, and whether to probe the first alone
+
+        Ties keep the configured order, so with no history the result is
+        the static preference order probed concurrently.
+        """
+        shares, weight = self.shares(languages, client)
+        ordered = sorted(languages, key=lambda language: (-shares[language], languages.index(language)))
+        lead = (len(ordered) > 1 and weight >= self.min_weight
+                and shares[ordered[0]] >= self.lead_threshold)
+        return ordered, lead
+
+    def record(self, language, client=None, sent=0, avoided=0, lead=None):
+        """Count one detection outcome and the probe requests it took (or saved)"""
+        now = time.time()
+        with self._lock:
+            for scope in (GLOBAL_SCOPE, client):
+                if not scope:
+                    continue
+                weights = self._decayed(scope, now)
+                weights[language] = weights.get(language, 0.0) + 1.0
+                self._scopes[scope] = {"weights": weights, "updated": now}
+            if client and len(self._scopes) > self.max_clients + 1:
+                self._forget_oldest_client()
+            self.detections += 1
+            self.probes_sent += sent
+            self.probes_avoided += avoided
+            if lead is not None:
+                if lead:
+                    self.lead_hits += 1
+                else:
+                    self.lead_misses += 1
+            self._dirty = True
+            due = now - self._last_save >= self.save_interval
+        if due:
+            self.save()
+
+    def _forget_oldest_client(self):
+        oldest = min((scope for scope in self._scopes if scope != GLOBAL_SCOPE),
+                     key=lambda scope: self._scopes[scope]["updated"])
+        del self._scopes[oldest]
+
+    def save(self):
+        """Write the weights atomically if anything changed since the last save"""
+        with self._lock:
+            self._last_save = time.time()
+            if not self.path or not self._dirty:
+                return
+            data = json.dumps({"scopes": self._scopes, "probes_avoided": self.probes_avoided})
+            self._dirty = False  # cleared before writing, so updates made meanwhile mark it again
+        temp_path = None
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Unwritable location: keep learning in memory and try again at the next save
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._dirty = True
+
+    def stats(self):
+        """Learned global mix and probe counters"""
+        with self._lock:
+            global_weights = self._decayed(GLOBAL_SCOPE, time.time())
+            return {
+                "global_weights": {language: round(weight, 2) for language, weight in global_weights.items()},
+                "clients": sum(1 for scope in self._scopes if scope != GLOBAL_SCOPE),
+                "detections": self.detections,
+                "lead_hits": self.lead_hits,
+                "lead_misses": self.lead_misses,
+                "probes_sent": self.probes_sent,
+                "probes_avoided": self.probes_avoided,
+                "half_life_seconds": self.half_life,
+                "lead_threshold": self.lead_threshold,
+                "persisted": bool(self.path),
+            }
+
+def create_language_priors():
+    """Build the language priors configured through the environment
+
+    LANGUAGE_STATS_PATH        JSON file the weights persist to; empty keeps them in memory
+    LANGUAGE_STATS_HALF_LIFE   seconds for an observation to lose half its weight (default 7 days)
+    LANGUAGE_LEAD_THRESHOLD    share at which the likeliest language is probed alone first (default 0.8)
+    LANGUAGE_LEAD_MIN_WEIGHT   observations needed before that happens (default 5)
+    """
+    priors = LanguagePriors(
+        path=os.environ.get("LANGUAGE_STATS_PATH", DEFAULT_STATS_PATH) or None,
+        half_life=float(os.environ.get("LANGUAGE_STATS_HALF_LIFE", str(7 * 24 * 3600))),
+        lead_threshold=float(os.environ.get("LANGUAGE_LEAD_THRESHOLD", "0.8")),
+        min_weight=float(os.environ.get("LANGUAGE_LEAD_MIN_WEIGHT", "5")),
+    )
+    atexit.register(priors.save)
+    return priors
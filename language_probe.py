@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Concurrent Language Probing
+Sends the auto-detect recognizer requests for every candidate language at once
+Returns as soon as the preferred language's result is known
+With learned priors, a clearly dominant language is tried alone first and the rest only on failure
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import speech_recognition as sr
+
+# Candidate languages for language="auto", most preferred first
+AUTO_LANGUAGES = ["en-IN", "hi-IN"]
+
+_executor = None
+
+def get_probe_executor():
+    """Shared thread pool for probe requests (size from PROBE_WORKERS)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=int(os.environ.get("PROBE_WORKERS", "8")),
+                                       thread_name_prefix="language-probe")
+    return _executor
+
+def _run_probe(recognize, language, started):
+    """Run one probe and describe its outcome instead of raising"""
+    try:
+        text = recognize(language)
+        status, error = "recognized", None
+    except sr.UnknownValueError:
+        text, status, error = None, "no_speech", None
+    except sr.RequestError as e:
+        text, status, error = None, "error", str(e)
+    except Exception as e:
+        text, status, error = None, "error", str(e)
+    return {
+        "language": language,
+        "status": status,
+        "text": text,
+        "error": error,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+def probe_languages(backend, audio_data, languages=None, executor=None, priors=None, client=None):
+    """Recognize audio in all candidate languages concurrently
+
+    The winner is the most preferred language that recognized speech; a
+    less preferred success only wins once every language ahead of it has
+    failed. Probes still pending when the winner is known are cancelled if
+    they have not started and ignored otherwise.
+
+    With priors (a LanguagePriors), the preference order is the one learned
+    for `client` and the likeliest language may be probed alone first;
+    languages never probed because it won are reported as "skipped", and
+    the outcome is recorded back into the priors.
+
+    Returns {"text", "language", "probes", "lead"}; text and language are
+    None when no language recognized speech.
+    """
+    languages = list(languages or AUTO_LANGUAGES)
+    executor = executor or get_probe_executor()
+    lead = False
+    if priors is not None:
+        languages, lead = priors.plan(languages, client)
+
+    # Encode once and share the payload between probes when the backend allows it
+    if hasattr(backend, "encode"):
+        flac_data, sample_rate = backend.encode(audio_data)
+        recognize = lambda language: backend.recognize_encoded(flac_data, sample_rate, language)
+    else:
+        recognize = lambda language: backend.recognize(audio_data, language)
+
+    started = time.perf_counter()
+    futures = {}
+
+    def submit(batch):
+        submitted = {executor.submit(_run_probe, recognize, language, started): language for language in batch}
+        futures.update(submitted)
+        return set(submitted)
+
+    outcomes = {}
+    winner = None
+    pending = submit(languages[:1] if lead else languages)
+
+    while pending and winner is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            outcomes[futures[future]] = future.result()
+
+        # Walk the preference order until we hit an unfinished probe
+        for language in languages:
+            outcome = outcomes.get(language)
+            if outcome is None:
+                break
+            if outcome["status"] == "recognized":
+                winner = outcome
+                break
+
+        if (winner is None and not pending and len(futures) < len(languages)
+                and outcomes[languages[0]]["status"] != "error"):
+            # The lead language heard no speech: fall back to the others concurrently.
+            # A failed request is not retried in other languages; the backend is the problem.
+            pending = submit(languages[len(futures):])
+
+    for future in pending:
+        language = futures[future]
+        if future.done():
+            outcomes[language] = future.result()
+            continue
+        outcomes[language] = {
+            "language": language,
+            "status": "cancelled" if future.cancel() else "ignored",
+            "text": None,
+            "error": None,
+            "latency_ms": None,
+        }
+    for language in languages:
+        outcomes.setdefault(language, {
+            "language": language,
+            "status": "skipped",
+            "text": None,
+            "error": None,
+            "latency_ms": None,
+        })
+
+    probes = [
+        {key: value for key, value in outcomes[language].items() if key != "text"}
+        for language in languages
+    ]
+    if priors is not None and winner is not None:
+        priors.record(winner["language"], client,
+                      sent=sum(1 for probe in probes if probe["status"] not in ("cancelled", "skipped")),
+                      avoided=sum(1 for probe in probes if probe["status"] == "skipped"),
+                      lead=winner["language"] == languages[0] if lead else None)
+    return {
+        "text": winner["text"] if winner else None,
+        "language": winner["language"] if winner else None,
+        "probes": probes,
+        "lead": lead,
+    }
+
+def recognize_cached(backend, cache, audio_data, language, priors=None):
+    """Recognize one clip through a TranscriptCache, probing AUTO_LANGUAGES for "auto" (used by the CLI and GUI)
+
+    Returns the cached or new {"text", "language", "confidence"}, or None
+    when no speech was recognized (which is not cached).
+    """
+    cache_key = cache.make_key(audio_data, language)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if language == "auto":
+        # Probe in the learned order; the preferred success wins
+        detection = probe_languages(backend, audio_data, AUTO_LANGUAGES, priors=priors)
+        if detection["text"] is None:
+            return None
+        result = {"text": detection["text"], "language": detection["language"], "confidence": "high"}
+    else:
+        try:
+            text = backend.recognize(audio_data, language)
+        except sr.UnknownValueError:
+            return None
+        result = {"text": text, "language": language, "confidence": "high"}
+
+    cache.put(cache_key, result)
+    return result
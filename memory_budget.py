@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+In-Flight Audio Memory Budget
+Caps the audio bytes all running transcriptions hold at once: in-memory uploads, decode windows, normalized PCM
+A transcription that would overrun the budget waits, in arrival order, for earlier ones to finish
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from audio_io import DECODE_WINDOW_BYTES
+
+DEFAULT_BUDGET_MB = 512
+DEFAULT_BUDGET_WAIT = 30.0
+
+class BudgetTimeout(Exception):
+    """Raised when no room frees up in the budget within the wait time"""
+
+class Reservation:
+    """Bytes held in a MemoryBudget until release() (or the end of a with block)"""
+
+    def __init__(self, budget, nbytes):
+        self.budget = budget
+        self.nbytes = nbytes
+        self._released = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.budget._release(self.nbytes)
+
+class MemoryBudget:
+    """A counting semaphore over bytes shared by every transcription in the process
+
+    Reservations are granted first come, first served, so a large upload is
+    not starved by a stream of small ones. One larger than the whole budget
+    is cut down to it and so runs alone. max_bytes 0 never makes anyone wait
+    but still tracks what is in flight.
+    """
+
+    def __init__(self, max_bytes, wait_seconds=DEFAULT_BUDGET_WAIT):
+        self.max_bytes = max_bytes
+        self.wait_seconds = wait_seconds
+        self._condition = threading.Condition()
+        self._waiting = deque()
+        self.in_flight = 0
+        self.peak = 0
+        self.reserved = 0
+        self.waited = 0
+        self.timeouts = 0
+
+    def reserve(self, nbytes, timeout=None):
+        """Wait until nbytes fit, then hold them; returns a Reservation, raises BudgetTimeout"""
+        if self.max_bytes:
+            nbytes = min(nbytes, self.max_bytes)
+        timeout = self.wait_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        ticket = object()
+        with self._condition:
+            self._waiting.append(ticket)
+            try:
+                if not self._fits(ticket, nbytes):
+                    self.waited += 1
+                while not self._fits(ticket, nbytes):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise BudgetTimeout(f"{self.in_flight} of {self.max_bytes} bytes in flight after {timeout:g}s")
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                self._condition.notify_all()  # the next in line may fit now
+            self.in_flight += nbytes
+            self.peak = max(self.peak, self.in_flight)
+            self.reserved += 1
+        return Reservation(self, nbytes)
+
+    def _fits(self, ticket, nbytes):
+        if not self.max_bytes:
+            return True
+        return self._waiting[0] is ticket and self.in_flight + nbytes <= self.max_bytes
+
+    def _release(self, nbytes):
+        with self._condition:
+            self.in_flight -= nbytes
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "max_bytes": self.max_bytes,
+                "in_flight_bytes": self.in_flight,
+                "peak_bytes": self.peak,
+                "waiting": len(self._waiting),
+                "reserved": self.reserved,
+                "waited": self.waited,
+                "timeouts": self.timeouts,
+                "wait_seconds": self.wait_seconds,
+            }
+
+def audio_footprint(upload_bytes, info=None, sample_rate=0, sample_width=2, resident_bytes=None):
+    """Bytes one transcription holds at its peak: the in-memory upload, a decode window and the normalized PCM
+
+    The normalized size comes from the header duration (info, see
+    audio_format) at the target rate and width; sample_rate 0 keeps the
+    source rate. It is counted twice, since the silence trim and the chunks
+    sent for recognition are copies. Without a duration, twice the upload
+    size stands in: about what a 128 kbit/s MP3 normalizes to.
+    resident_bytes is how much of the upload is held in memory (default
+    all of it; 0 for an upload spooled to disk).
+    """
+    if info is not None and info.duration and info.sample_rate:
+        rate = min(sample_rate, info.sample_rate) if sample_rate else info.sample_rate
+        normalized = int(info.duration * rate) * sample_width
+    else:
+        normalized = 2 * upload_bytes
+    resident = upload_bytes if resident_bytes is None else resident_bytes
+    return resident + 2 * DECODE_WINDOW_BYTES + 2 * normalized
+
+def create_memory_budget():
+    """Build the server's audio memory budget from environment configuration
+
+    AUDIO_MEMORY_BUDGET_MB  audio megabytes all transcriptions may hold at once (default 512, 0 unlimited)
+    AUDIO_MEMORY_WAIT       seconds a transcription waits for room before failing (default 30)
+    """
+    return MemoryBudget(
+        int(float(os.environ.get("AUDIO_MEMORY_BUDGET_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024),
+        wait_seconds=float(os.environ.get("AUDIO_MEMORY_WAIT", DEFAULT_BUDGET_WAIT)),
+    )
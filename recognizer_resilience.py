@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Resilient Recognizer Client
+Wraps a recognizer backend with retries (exponential backoff and full jitter), a token bucket and a circuit breaker
+Transient throttling is retried quietly, the quota is respected up front and a dead backend fails fast
+"""
+
+import time
+import random
+import threading
+import speech_recognition as sr
+
+# Answers worth retrying: timeouts, throttling and server-side failures
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class RecognizerUnavailable(sr.RequestError):
+    """The recognizer was not called because it is failing or over quota"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(RecognizerUnavailable):
+    """Raised instead of calling a backend that keeps failing"""
+
+class RateLimitExceeded(RecognizerUnavailable):
+    """Raised when a request would wait too long for a token"""
+
+def is_transient(error):
+    """True for errors a retry may fix: connection failures and TRANSIENT_STATUSES answers"""
+    if isinstance(error, RecognizerUnavailable):
+        return False
+    status = getattr(error, "status", None)
+    return status is None or status in TRANSIENT_STATUSES
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`
+
+    acquire() reserves a token and sleeps until it is due, so callers are
+    served in arrival order at the configured rate instead of racing for
+    freed tokens.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, max_wait=None):
+        """Take one token, waiting for it if needed; raises RateLimitExceeded past max_wait"""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(f"recognizer quota exhausted; next slot in {wait:.1f}s", retry_after=wait)
+            self._tokens -= 1.0
+            self.acquired += 1
+            if wait:
+                self.delayed += 1
+                self.wait_seconds += wait
+        if wait:
+            self.sleep(wait)
+        return wait
+
+    def stats(self):
+        with self._lock:
+            tokens = min(self.burst, self._tokens + (self.clock() - self._updated) * self.rate)
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "tokens": round(tokens, 2),
+                "acquired": self.acquired,
+                "delayed": self.delayed,
+                "rejected": self.rejected,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and fails calls fast for `reset_timeout` seconds
+
+    After the timeout one trial call is let through (half-open): success
+    closes the circuit, failure opens it again. Calls arriving during the
+    trial wait up to `trial_wait` seconds for its outcome rather than
+    failing while the backend may already be back.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30.0, trial_wait=5.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.trial_wait = trial_wait
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go ahead now"""
+        with self._lock:
+            deadline = None
+            while True:
+                if self.state == CLOSED:
+                    return
+                remaining = self.opened_at + self.reset_timeout - self.clock()
+                if self.state == OPEN and remaining <= 0:
+                    self.state = HALF_OPEN
+                if self.state == HALF_OPEN:
+                    if not self._trial_running:
+                        self._trial_running = True
+                        return
+                    deadline = deadline or self.clock() + self.trial_wait
+                    if self.clock() < deadline:
+                        self._changed.wait(deadline - self.clock())
+                        continue
+                self.short_circuited += 1
+                retry_after = max(remaining, 0.0) or self.reset_timeout
+                raise CircuitOpenError(f"recognizer circuit open after {self.failures} failures; "
+                                       f"retry in {retry_after:.0f}s", retry_after=retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+            self._changed.notify_all()
+
+    def abandon(self):
+        """Forget a call that never reached the backend, freeing the half-open trial"""
+        with self._lock:
+            self._trial_running = False
+            self._changed.notify_all()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.times_opened += 1
+            self._changed.notify_all()
+
+    def stats(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.opened_at + self.reset_timeout - self.clock()), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "threshold": self.threshold,
+                "reset_timeout": self.reset_timeout,
+                "retry_in": retry_in,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+            }
+
+class ResilientBackend:
+    """Recognizer backend wrapper adding retries, rate limiting and a circuit breaker
+
+    "No speech" answers count as healthy responses. Other attributes (such
+    as encode) pass through to the wrapped backend.
+    """
+
+    def __init__(self, backend, retries=3, backoff_base=0.25, backoff_max=4.0, bucket=None, breaker=None,
+                 rate_wait=10.0, sleep=time.sleep, rng=None):
+        self.backend = backend
+        self.name = backend.name
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = bucket
+        self.breaker = breaker
+        self.rate_wait = rate_wait
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0  # calls not yet returned, backoff sleeps included
+        self.retried = 0
+        self.recovered = 0
+        self.failed = 0
+
+    def __getattr__(self, name):
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def backoff(self, attempt, retry_after=None):
+        """Full-jitter delay before retry number attempt + 1, honouring a server Retry-After"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = self.rng.uniform(0, ceiling)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def call(self, function, *args):
+        """Run one recognizer call under the breaker, the bucket and the retry policy"""
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+        try:
+            return self._attempt(function, *args)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _attempt(self, function, *args):
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_call()
+            try:
+                if self.bucket is not None:
+                    self.bucket.acquire(self.rate_wait)
+            except RateLimitExceeded:
+                if self.breaker is not None:
+                    self.breaker.abandon()
+                self._gave_up()
+                raise
+            try:
+                result = function(*args)
+            except sr.UnknownValueError:
+                self._succeeded(attempt)
+                raise
+            except sr.RequestError as e:
+                if not is_transient(e):
+                    if self.breaker is not None:
+                        self.breaker.record_success()  # the backend answered; the request was at fault
+                    self._gave_up()
+                    raise
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if attempt >= self.retries:
+                    self._gave_up()
+                    raise
+                with self._lock:
+                    self.retried += 1
+                self.sleep(self.backoff(attempt, getattr(e, "retry_after", None)))
+                attempt += 1
+                continue
+            except Exception:
+                if self.breaker is not None:
+                    self.breaker.abandon()
+                raise
+            self._succeeded(attempt)
+            return result
+
+    def _succeeded(self, attempt):
+        if self.breaker is not None:
+            self.breaker.record_success()
+        if attempt:
+            with self._lock:
+                self.recovered += 1
+
+    def _gave_up(self):
+        with self._lock:
+            self.failed += 1
+
+    def recognize(self, audio_data, language):
+        return self.call(self.backend.recognize, audio_data, language)
+
+    def recognize_encoded(self, flac_data, sample_rate, language):
+        return self.call(self.backend.recognize_encoded, flac_data, sample_rate, language)
+
+    def healthy(self):
+        """False while the circuit is open"""
+        return self.breaker is None or self.breaker.state != OPEN
+
+    def stats(self):
+        """Wrapped backend stats plus retry, rate limit and circuit state"""
+        with self._lock:
+            resilience = {
+                "calls": self.calls,
+                "in_flight": self.in_flight,
+                "retries": self.retried,
+                "recovered": self.recovered,
+                "failed": self.failed,
+                "max_retries": self.retries,
+            }
+        resilience["rate_limit"] = self.bucket.stats() if self.bucket is not None else None
+        resilience["circuit"] = self.breaker.stats() if self.breaker is not None else None
+        return dict(self.backend.stats(), resilience=resilience)
+
+    def close(self):
+        self.backend.close()
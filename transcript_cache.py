@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Transcript Cache
+Keyed on a hash of the decoded PCM plus the language
+Bounded in-memory LRU in front of a persistent on-disk tier with size/TTL eviction
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "audio_to_text", "transcripts")
+
+class TranscriptCache:
+    """Two-tier transcript cache shared by the API, CLI and GUI"""
+
+    def __init__(self, max_entries=1024, disk_dir=DEFAULT_CACHE_DIR,
+                 disk_max_bytes=256 * 1024 * 1024, ttl_seconds=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # computed lazily on first write
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except OSError:
+                self.disk_dir = None  # unwritable location: memory tier only
+
+    @staticmethod
+    def make_key(audio_data, language):
+        """Hash the decoded PCM, its format and the language into a cache key"""
+        digest = hashlib.sha256()
+        digest.update(f"{audio_data.sample_rate}:{audio_data.sample_width}:{language}:".encode("utf-8"))
+        digest.update(audio_data.frame_data)
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        """Location of an entry on disk, sharded by key prefix"""
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _expired(self, created):
+        """Check an entry's creation time against the TTL"""
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        value = self._disk_get(key) if self.disk_dir else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._memory_put(key, value[0], value[1])
+        return value[1]
+
+    def put(self, key, value):
+        """Store a value in both tiers"""
+        created = time.time()
+        with self._lock:
+            self._memory_put(key, created, value)
+        if self.disk_dir:
+            self._disk_put(key, created, value)
+
+    def _memory_put(self, key, created, value):
+        """Insert into the LRU, evicting the least recently used entry (lock held)"""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key):
+        """Read an entry from disk; returns (created, value) or None"""
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self._expired(entry.get("created", 0)):
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # mtime doubles as last-access time for eviction
+        except OSError:
+            pass
+        return entry["created"], entry["value"]
+
+    def _disk_put(self, key, created, value):
+        """Write an entry atomically, then enforce the size budget"""
+        path = self._disk_path(key)
+        data = json.dumps({"created": created, "value": value}, ensure_ascii=False).encode("utf-8")
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if temp_path is not None:
+                self._remove(temp_path)  # a full disk must not leave partial .tmp files behind
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data)
+            over_budget = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self.evict_disk()
+
+    def _scan_disk(self):
+        """List (mtime, size, path) for every entry on disk"""
+        entries = []
+        if not os.path.isdir(self.disk_dir):
+            return entries
+        for shard in os.scandir(self.disk_dir):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                if not item.name.endswith(".json"):
+                    continue
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        return entries
+
+    def _remove(self, path):
+        """Delete a disk entry, ignoring races with other processes"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict_disk(self):
+        """Drop expired entries, then the least recently used until under budget"""
+        if not self.disk_dir:
+            return
+        entries = self._scan_disk()
+        now = time.time()
+        kept = []
+        evicted = 0
+        for mtime, size, path in entries:
+            # mtime is refreshed on every hit, so it bounds the creation time from above
+            if self.ttl_seconds is not None and now - mtime > self.ttl_seconds:
+                self._remove(path)
+                evicted += 1
+            else:
+                kept.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in kept)
+        kept.sort()
+        # Evict down to 90% so we do not rescan on every write near the limit
+        target = self.disk_max_bytes * 0.9
+        for mtime, size, path in kept:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self.evictions += evicted
+
+    def clear(self):
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir:
+            for _, _, path in self._scan_disk():
+                self._remove(path)
+            with self._lock:
+                self._disk_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_max_entries": self.max_entries,
+                "disk_enabled": bool(self.disk_dir),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+            }
+
+def create_cache():
+    """Build the transcript cache configured through the environment
+
+    TRANSCRIPT_CACHE_ENTRIES  in-memory LRU size (default 1024)
+    TRANSCRIPT_CACHE_DIR      on-disk tier location; empty disables it
+    TRANSCRIPT_CACHE_MAX_MB   on-disk size budget (default 256)
+    TRANSCRIPT_CACHE_TTL      entry lifetime in seconds (default 7 days)
+    """
+    return TranscriptCache(
+        max_entries=int(os.environ.get("TRANSCRIPT_CACHE_ENTRIES", "1024")),
+        disk_dir=os.environ.get("TRANSCRIPT_CACHE_DIR", DEFAULT_CACHE_DIR) or None,
+        disk_max_bytes=int(float(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        ttl_seconds=float(os.environ.get("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600))),
+    )
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Background Transcription Jobs
+Runs decode and recognition on a bounded executor so HTTP workers return immediately
+Waiting jobs are started in job_scheduler order: shortest first, fair across clients
+Jobs report status and progress while they run and are evicted a while after finishing
+Identical requests submitted while one is in flight share that job instead of running again
+"""
+
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from job_scheduler import create_scheduler, FairScheduler
+
+DEFAULT_JOB_WORKERS = 4
+DEFAULT_JOB_QUEUE_LIMIT = 64
+DEFAULT_JOB_TTL = 15 * 60
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class JobQueueFull(Exception):
+    """Raised when the executor already holds the maximum number of unfinished jobs"""
+
+class TranscriptionError(Exception):
+    """A request or job failure carrying an API error code and HTTP status"""
+
+    def __init__(self, message, code="INTERNAL_ERROR", status=500):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+class Job:
+    """One transcription request and its progress"""
+
+    def __init__(self, job_id, metadata=None):
+        self.id = job_id
+        self.metadata = metadata or {}
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.holders = 1     # requests sharing this job; it is discarded once all have let go
+        self.coalesce_key = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in (COMPLETED, FAILED)
+
+    def update(self, stage=None, progress=None):
+        """Record a stage change or progress fraction from the worker"""
+        if stage is not None:
+            self.stage = stage
+        if progress is not None:
+            self.progress = round(min(max(progress, 0.0), 1.0), 3)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback):
+        """Call callback(job) once the job finishes (right away if it already has)
+
+        Lets an event loop wait for a job without parking a thread on wait().
+        """
+        with self._callbacks_lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _set_done(self):
+        with self._callbacks_lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def to_dict(self):
+        """JSON-ready view of the job"""
+        job = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        job.update(self.metadata)
+        if self.result is not None:
+            job["result"] = self.result
+        if self.error is not None:
+            job["error"] = {"error": self.error["error"], "code": self.error["code"]}
+        return job
+
+def execute_job(job, work):
+    """Run work(job) on the calling thread, recording the result or error on the job"""
+    job.status = RUNNING
+    job.started_at = time.time()
+    try:
+        job.result = work(job)
+        job.status = COMPLETED
+        job.update(stage="done", progress=1.0)
+    except Exception as e:
+        record_failure(job, e)
+    finally:
+        job.finished_at = time.time()
+    return job
+
+async def execute_job_async(job, work):
+    """Await the coroutine work(job), recording the result or error on the job like execute_job"""
+    job.status = RUNNING
+    job.started_at = time.time()
+    try:
+        job.result = await work(job)
+        job.status = COMPLETED
+        job.update(stage="done", progress=1.0)
+    except Exception as e:
+        record_failure(job, e)
+    finally:
+        job.finished_at = time.time()
+    return job
+
+def record_failure(job, error):
+    """Mark a job failed; TranscriptionError keeps its code and status, anything else is INTERNAL_ERROR"""
+    if isinstance(error, TranscriptionError):
+        job.error = {"error": str(error), "code": error.code, "status": error.status}
+    else:
+        job.error = {"error": f"Internal server error: {error}", "code": "INTERNAL_ERROR", "status": 500}
+    job.status = FAILED
+
+class JobManager:
+    """Bounded background executor with a TTL-evicted job table
+
+    The executor only decides when a worker is free; which waiting job it
+    then runs is the scheduler's choice, made at that moment.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS, queue_limit=DEFAULT_JOB_QUEUE_LIMIT,
+                 ttl_seconds=DEFAULT_JOB_TTL, scheduler=None):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.ttl_seconds = ttl_seconds
+        self.scheduler = scheduler or FairScheduler()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()  # job id -> Job, in submission order
+        self._in_flight = {}        # coalesce key -> unfinished Job
+        self._lock = threading.Lock()
+        self._unfinished = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.coalesced = 0
+
+    def submit(self, work, client=None, cost=None, **metadata):
+        """Queue work(job) and return the Job right away
+
+        work returns the job result; raising TranscriptionError records its
+        code and status, any other exception fails the job as INTERNAL_ERROR.
+        client and cost (estimated audio seconds, see job_scheduler.job_cost)
+        decide where the job waits.
+        """
+        job, _ = self.admit(**metadata)
+        self._schedule(job, work, client, cost)
+        return job
+
+    def submit_or_join(self, key, work, client=None, cost=None, **metadata):
+        """Single-flight submit: returns (job, joined)
+
+        If an unfinished job was submitted with the same key, the caller
+        shares it (joined is True) and work is not run again; otherwise a
+        new job is queued as with submit.
+        """
+        job, joined = self.admit(key, **metadata)
+        if not joined:
+            self._schedule(job, work, client, cost)
+        return job, joined
+
+    def _schedule(self, job, work, client, cost):
+        """Hand a job to the scheduler and wake a worker to run whichever job comes next"""
+        self.scheduler.push((job, work), client, cost)
+        self._executor.submit(self._run_next)
+
+    def admit(self, key=None, **metadata):
+        """Register a job without running it; returns (job, joined)
+
+        For callers that drive the work themselves (the asyncio server):
+        they run the job and must call finish(job) afterwards. With a key,
+        an unfinished job with the same key is joined as in submit_or_join.
+        """
+        with self._lock:
+            if key is not None:
+                job = self._in_flight.get(key)
+                if job is not None:
+                    job.holders += 1
+                    self.coalesced += 1
+                    return job, True
+            job = self._admit(metadata)
+            if key is not None:
+                job.coalesce_key = key
+                self._in_flight[key] = job
+        return job, False
+
+    def _admit(self, metadata):
+        """Admit and register a new job (caller holds the lock and starts it)"""
+        self._evict_expired()
+        if self._unfinished >= self.queue_limit:
+            self.rejected += 1
+            raise JobQueueFull(f"{self._unfinished} jobs already pending (limit {self.queue_limit})")
+        job = Job(uuid.uuid4().hex, metadata)
+        self._jobs[job.id] = job
+        self._unfinished += 1
+        self.submitted += 1
+        return job
+
+    def get(self, job_id):
+        """Look up a job by id; None when unknown or already evicted"""
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        """Forget a finished job early once every request sharing it has the result"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                job.holders -= 1
+                if job.holders <= 0:
+                    del self._jobs[job_id]
+
+    def _run_next(self):
+        # One executor task per scheduled job, so there is always one to take
+        job, work = self.scheduler.pop().item
+        self._run(job, work)
+
+    def _run(self, job, work):
+        try:
+            execute_job(job, work)
+        finally:
+            self.finish(job)
+
+    def finish(self, job):
+        """Release a finished job's queue slot and coalescing key, then wake its waiters"""
+        with self._lock:
+            self._unfinished -= 1
+            if job.coalesce_key is not None and self._in_flight.get(job.coalesce_key) is job:
+                del self._in_flight[job.coalesce_key]
+            if job.status == COMPLETED:
+                self.completed += 1
+            else:
+                self.failed += 1
+        job._set_done()
+
+    def _evict_expired(self):
+        """Drop finished jobs older than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.evicted += len(expired)
+
+    def stats(self):
+        """Queue depth and lifetime counters"""
+        with self._lock:
+            self._evict_expired()
+            running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+            return {
+                "workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "ttl_seconds": self.ttl_seconds,
+                "queued": self._unfinished - running,
+                "running": running,
+                "retained": len(self._jobs),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "evicted": self.evicted,
+                "coalesced": self.coalesced,
+                "coalescing": len(self._in_flight),
+                "scheduler": self.scheduler.stats(),
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+def create_job_manager(on_dispatch=None):
+    """Build the job manager and its scheduler from environment configuration
+
+    on_dispatch(entry) is called as each job leaves the queue (see job_scheduler).
+    """
+    return JobManager(
+        max_workers=int(os.environ.get("JOB_WORKERS", DEFAULT_JOB_WORKERS)),
+        queue_limit=int(os.environ.get("JOB_QUEUE_LIMIT", DEFAULT_JOB_QUEUE_LIMIT)),
+        ttl_seconds=float(os.environ.get("JOB_TTL", DEFAULT_JOB_TTL)),
+        scheduler=create_scheduler(on_dispatch),
+    )
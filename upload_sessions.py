@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Resumable Upload Sessions
+Large recordings arrive in chunks appended at explicit offsets and are spooled to disk
+An interrupted client asks for the current offset and continues from there
+"""
+
+import os
+import json
+import time
+import uuid
+import tempfile
+import threading
+from audio_io import decode_audio_with_stats, IncrementalDecoder, AudioDecodeError
+from transcription_jobs import TranscriptionError
+
+DEFAULT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "audio_to_text_uploads")
+DEFAULT_MAX_UPLOAD_BYTES = 2 * 1024 ** 3  # 2 GB
+DEFAULT_UPLOAD_TTL = 24 * 60 * 60  # idle sessions are dropped after a day
+DEFAULT_MAX_EARLY_DECODERS = 8    # each one is an ffmpeg process and two threads
+DEFAULT_EXPIRE_INTERVAL = 300.0   # seconds between sweeps for idle sessions
+COPY_BLOCK_BYTES = 256 * 1024
+
+class UploadSession:
+    """One upload in progress: its settings, spool file and optional early decoder"""
+
+    def __init__(self, upload_id, spool_dir, filename, options, size=None, created_at=None):
+        self.id = upload_id
+        self.filename = filename
+        self.options = options  # language, chunk_seconds, workers
+        self.size = size
+        self.created_at = created_at or time.time()
+        self.updated_at = self.created_at
+        self.path = os.path.join(spool_dir, f"{upload_id}.part")
+        self.meta_path = os.path.join(spool_dir, f"{upload_id}.json")
+        self.finalized = False
+        self.decoder = None
+        self.lock = threading.Lock()
+
+    @property
+    def offset(self):
+        """Bytes received so far (the spool file is the source of truth)"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def to_dict(self):
+        return {
+            "upload_id": self.id,
+            "filename": self.filename,
+            "offset": self.offset,
+            "size": self.size,
+            "early_decode": self.decoder is not None,
+            "finalized": self.finalized,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def save(self):
+        """Persist the session settings so an upload can resume after a server restart"""
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"upload_id": self.id, "filename": self.filename, "options": self.options,
+                       "size": self.size, "created_at": self.created_at}, f)
+
+    def remove(self):
+        """Delete the spool and settings files and stop any early decoder"""
+        if self.decoder is not None:
+            self.decoder.abort()
+            self.decoder = None
+        for path in (self.path, self.meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class UploadSessionStore:
+    """Creates, appends to and hands over upload sessions spooled under one directory
+
+    At most max_early_decoders sessions decode while uploading; past that,
+    early_decode is ignored and the spool file is decoded at finalize. A
+    background thread calls expire_idle() every expire_interval seconds
+    (0 leaves it to create()).
+    """
+
+    def __init__(self, spool_dir=DEFAULT_SPOOL_DIR, max_bytes=DEFAULT_MAX_UPLOAD_BYTES,
+                 ttl_seconds=DEFAULT_UPLOAD_TTL, decoder=None, max_early_decoders=DEFAULT_MAX_EARLY_DECODERS,
+                 expire_interval=DEFAULT_EXPIRE_INTERVAL):
+        self.spool_dir = spool_dir
+        self.decoder = decoder  # a DecoderPool for spool files that were not decoded early
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_early_decoders = max_early_decoders
+        self.expire_interval = expire_interval
+        os.makedirs(spool_dir, exist_ok=True)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._early_lock = threading.Lock()  # serializes the count-then-start of early decoders
+        self._closed = threading.Event()
+        self.created = 0
+        self.finalized = 0
+        self.expired = 0
+        self.bytes_received = 0
+        self.early_decoded = 0
+        self.early_decode_refused = 0
+        if expire_interval:
+            threading.Thread(target=self._sweep, name="upload-expiry", daemon=True).start()
+
+    def create(self, filename, options, size=None, early_decode=False):
+        """Open a new session; early_decode starts decoding chunks as they arrive"""
+        if size is not None and size > self.max_bytes:
+            raise TranscriptionError(f"Upload of {size} bytes exceeds the {self.max_bytes} byte limit",
+                                     "UPLOAD_TOO_LARGE", 413)
+        self.expire_idle()
+        session = UploadSession(uuid.uuid4().hex, self.spool_dir, filename, options, size)
+        open(session.path, "wb").close()
+        session.save()
+        with self._early_lock:
+            with self._lock:
+                running = self._early_decoders()
+            if early_decode and running < self.max_early_decoders:
+                try:
+                    session.decoder = IncrementalDecoder(filename)
+                except AudioDecodeError:
+                    session.decoder = None  # decode from the spool file at finalize instead
+            elif early_decode:
+                with self._lock:
+                    self.early_decode_refused += 1
+            with self._lock:
+                self._sessions[session.id] = session
+                self.created += 1
+        return session
+
+    def _early_decoders(self):
+        """Sessions with an early decoder running (lock held)"""
+        return sum(1 for session in self._sessions.values() if session.decoder is not None)
+
+    def get(self, upload_id):
+        """Look up a session, reloading it from the spool directory after a restart"""
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is not None:
+                return session
+            if not all(c in "0123456789abcdef" for c in upload_id):
+                return None
+            meta_path = os.path.join(self.spool_dir, f"{upload_id}.json")
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                return None
+            session = UploadSession(upload_id, self.spool_dir, meta["filename"], meta["options"],
+                                    meta.get("size"), meta.get("created_at"))
+            if not os.path.exists(session.path):
+                return None
+            session.updated_at = os.path.getmtime(session.path)
+            self._sessions[upload_id] = session
+            return session
+
+    def append(self, session, offset, stream):
+        """Append a chunk that starts at offset; returns the new offset
+
+        A chunk cut short by a dropped connection keeps the bytes that did
+        arrive, so the client resumes from the offset reported afterwards.
+        """
+        with session.lock:
+            if session.finalized:
+                raise TranscriptionError("Upload already finalized", "UPLOAD_FINALIZED", 409)
+            current = session.offset
+            if offset != current:
+                raise TranscriptionError(f"Upload offset is {current}, not {offset}", "OFFSET_MISMATCH", 409)
+
+            received = 0
+            try:
+                with open(session.path, "ab") as spool:
+                    for block in iter(lambda: stream.read(COPY_BLOCK_BYTES), b""):
+                        if current + received + len(block) > (session.size or self.max_bytes):
+                            raise TranscriptionError("Chunk runs past the upload size limit",
+                                                     "UPLOAD_TOO_LARGE", 413)
+                        spool.write(block)
+                        received += len(block)
+                        if session.decoder is not None:
+                            try:
+                                session.decoder.feed(block)
+                            except AudioDecodeError:
+                                session.decoder.abort()
+                                session.decoder = None
+            finally:
+                session.updated_at = time.time()
+                with self._lock:
+                    self.bytes_received += received
+            return current + received
+
+    def finalize(self, session):
+        """Close the session for writing and return a decode function for the spooled audio
+
+        The function returns (audio_data, normalization stats) and removes
+        the spool files once it has run. Callers also discard() the session
+        when its job ends, which covers a job that fails before decoding.
+        """
+        with session.lock:
+            if session.finalized:
+                raise TranscriptionError("Upload already finalized", "UPLOAD_FINALIZED", 409)
+            received = session.offset
+            if received == 0:
+                raise TranscriptionError("No data uploaded", "EMPTY_FILE", 400)
+            if session.size is not None and received != session.size:
+                raise TranscriptionError(f"Upload incomplete: {received} of {session.size} bytes received",
+                                         "UPLOAD_INCOMPLETE", 409)
+            session.finalized = True
+            session.updated_at = time.time()
+        with self._lock:
+            self.finalized += 1
+
+        def decode(sample_rate=None, sample_width=None):
+            decoder, session.decoder = session.decoder, None
+            try:
+                if decoder is not None:
+                    try:
+                        result = decoder.finish(sample_rate, sample_width)
+                        with self._lock:
+                            self.early_decoded += 1
+                        return result
+                    except AudioDecodeError:
+                        pass  # fall back to decoding the spool file from the start
+                decode_file = self.decoder.decode if self.decoder else decode_audio_with_stats
+                return decode_file(session.path, session.filename, sample_rate, sample_width)
+            finally:
+                self.discard(session)
+        return decode
+
+    def reopen(self, session):
+        """Undo finalize when the transcription could not be queued, so the client can retry"""
+        with session.lock:
+            session.finalized = False
+        with self._lock:
+            self.finalized -= 1
+
+    def discard(self, session):
+        """Drop a session and its spool files (safe to call more than once)"""
+        with self._lock:
+            self._sessions.pop(session.id, None)
+        session.remove()
+
+    def expire_idle(self):
+        """Remove sessions, including ones left on disk by an earlier run, idle for longer than the TTL
+
+        A finalized session counts from finalize, so one whose job never
+        released it is reaped too.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.spool_dir):
+            upload_id, extension = os.path.splitext(name)
+            if extension != ".json":
+                continue
+            session = self.get(upload_id)
+            if session is None:
+                continue
+            if session.updated_at < cutoff:
+                self.discard(session)
+                with self._lock:
+                    self.expired += 1
+
+    def _sweep(self):
+        while not self._closed.wait(self.expire_interval):
+            try:
+                self.expire_idle()
+            except OSError:
+                pass  # the spool directory is unreadable for now; try again next time
+
+    def close(self):
+        """Stop the expiry thread"""
+        self._closed.set()
+
+    def stats(self):
+        """Open sessions and lifetime counters"""
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "created": self.created,
+                "finalized": self.finalized,
+                "expired": self.expired,
+                "bytes_received": self.bytes_received,
+                "early_decoded": self.early_decoded,
+                "early_decoders": self._early_decoders(),
+                "max_early_decoders": self.max_early_decoders,
+                "early_decode_refused": self.early_decode_refused,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+def create_upload_store(decoder=None):
+    """Build the upload session store from environment configuration
+
+    UPLOAD_SPOOL_DIR         where partial uploads are kept (default: system temp dir)
+    MAX_UPLOAD_BYTES         largest upload a session accepts (default 2 GB)
+    UPLOAD_TTL               seconds an idle upload is kept (default 86400)
+    MAX_EARLY_DECODERS       sessions decoding while they upload (default 8, 0 never)
+    UPLOAD_EXPIRE_INTERVAL   seconds between sweeps for idle uploads (default 300, 0 only on create)
+    """
+    return UploadSessionStore(
+        spool_dir=os.environ.get("UPLOAD_SPOOL_DIR") or DEFAULT_SPOOL_DIR,
+        max_bytes=int(os.environ.get("MAX_UPLOAD_BYTES", DEFAULT_MAX_UPLOAD_BYTES)),
+        ttl_seconds=float(os.environ.get("UPLOAD_TTL", DEFAULT_UPLOAD_TTL)),
+        decoder=decoder,
+        max_early_decoders=int(os.environ.get("MAX_EARLY_DECODERS", DEFAULT_MAX_EARLY_DECODERS)),
+        expire_interval=float(os.environ.get("UPLOAD_EXPIRE_INTERVAL", DEFAULT_EXPIRE_INTERVAL)),
+    )
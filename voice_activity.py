@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Voice Activity Pre-Filter
+Vectorized frame-energy detection on decoded PCM before it is sent for recognition
+Rejects speech-free audio locally and trims leading and trailing dead air
+"""
+
+import numpy as np
+import speech_recognition as sr
+
+FRAME_MS = 30                # analysis window, shared with silence splitting in audio_chunking
+ABSOLUTE_FLOOR_DBFS = -45.0  # frames quieter than this are never speech
+ADAPTIVE_MARGIN_DB = 6.0     # speech must clear the noise floor by this much
+NOISE_PERCENTILE = 10        # frame level taken as the noise floor
+MIN_SPEECH_SECONDS = 0.2     # less active audio than this counts as no speech
+PADDING_SECONDS = 0.3        # kept around the detected speech when trimming
+
+class VoiceActivity:
+    """Outcome of the pre-filter for one recording"""
+
+    def __init__(self, has_speech, duration, speech_seconds, start, end):
+        self.has_speech = has_speech
+        self.duration = duration
+        self.speech_seconds = speech_seconds
+        self.start = start
+        self.end = end
+
+    @property
+    def saved_seconds(self):
+        """Audio that will not be sent to the recognizer"""
+        return self.duration if not self.has_speech else self.duration - (self.end - self.start)
+
+    def to_dict(self):
+        return {
+            "speech": self.has_speech,
+            "original_seconds": round(self.duration, 3),
+            "speech_seconds": round(self.speech_seconds, 3),
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+def frame_rms(audio_data, frame_ms=FRAME_MS):
+    """RMS of each whole analysis frame as a fraction of full scale, computed in one pass over the samples"""
+    width = audio_data.sample_width
+    if width == 1:
+        samples = np.frombuffer(audio_data.frame_data, dtype=np.int8).astype(np.float32) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(audio_data.frame_data, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(audio_data.frame_data, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:  # 24-bit: widen each sample to 32 bits
+        raw = np.frombuffer(audio_data.frame_data, dtype=np.uint8)
+        raw = raw[:len(raw) - len(raw) % 3].reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = padded.view("<i4").ravel().astype(np.float32) / 2147483648.0
+
+    frame_length = max(1, int(audio_data.sample_rate * frame_ms / 1000))
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+def frame_levels_dbfs(audio_data, frame_ms=FRAME_MS):
+    """RMS level of each analysis frame in dBFS"""
+    return 20 * np.log10(np.maximum(frame_rms(audio_data, frame_ms), 1e-10))
+
+def detect_voice_activity(audio_data, min_speech_seconds=MIN_SPEECH_SECONDS, padding_seconds=PADDING_SECONDS):
+    """Find the span of audio_data that contains speech-level energy
+
+    The threshold adapts to the recording: it sits a margin above the noise
+    floor, but never below an absolute floor and never above a margin under
+    the loudest frames, so steady signals are not mistaken for noise.
+    """
+    duration = len(audio_data.frame_data) / float(audio_data.sample_rate * audio_data.sample_width)
+    levels = frame_levels_dbfs(audio_data)
+    if len(levels) == 0:
+        return VoiceActivity(False, duration, 0.0, 0.0, 0.0)
+
+    noise_floor = np.percentile(levels, NOISE_PERCENTILE)
+    peak = levels.max()
+    threshold = max(ABSOLUTE_FLOOR_DBFS, min(noise_floor + ADAPTIVE_MARGIN_DB, peak - ADAPTIVE_MARGIN_DB))
+    active = np.flatnonzero(levels > threshold)
+
+    frame_seconds = FRAME_MS / 1000.0
+    speech_seconds = len(active) * frame_seconds
+    if speech_seconds < min_speech_seconds:
+        return VoiceActivity(False, duration, speech_seconds, 0.0, 0.0)
+
+    start = max(0.0, active[0] * frame_seconds - padding_seconds)
+    end = min(duration, (active[-1] + 1) * frame_seconds + padding_seconds)
+    return VoiceActivity(True, duration, speech_seconds, start, end)
+
+def trim_to_activity(audio_data, activity):
+    """Cut audio_data down to the detected speech span (whole samples only)"""
+    if not activity.has_speech or (activity.start <= 0 and activity.end >= activity.duration):
+        return audio_data
+    bytes_per_second = audio_data.sample_rate * audio_data.sample_width
+    start = int(activity.start * audio_data.sample_rate) * audio_data.sample_width
+    end = min(len(audio_data.frame_data), int(round(activity.end * bytes_per_second)))
+    end -= (end - start) % audio_data.sample_width
+    return sr.AudioData(audio_data.frame_data[start:end], audio_data.sample_rate, audio_data.sample_width)
+
+def prefilter(audio_data):
+    """Run the pre-filter; returns (trimmed audio or None when there is no speech, VoiceActivity)"""
+    activity = detect_voice_activity(audio_data)
+    if not activity.has_speech:
+        return None, activity
+    return trim_to_activity(audio_data, activity), activity